@@ -0,0 +1,253 @@
+"""
+    File: bench_etl.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: End-to-end benchmark of XetraETL (report 1) on synthetic Xetra
+            source files served by a mocked S3 (moto), a local directory
+            or memory. Reports wall time, rows/sec and peak RSS per stage
+            and appends the results to a JSON Lines file for trend
+            comparison.
+
+            Usage: python -m benchmarks.bench_etl [--isins N] [--days N]
+                       [--minutes N] [--mode batch|streaming|write-behind]
+                       [--storage s3|local|memory] [--output FILE]
+"""
+import os
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+import boto3
+import numpy as np
+import pandas as pd
+import yaml
+from moto import mock_aws
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.storage import LocalFileSystemBackend, MemoryBackend
+from xetra.common.metrics import RunMetrics, peak_rss_mb
+from xetra.common.trading_calendar import TradingCalendar
+from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
+from benchmarks.measure import measure, run_isolated
+from tests.xetra_data import generate_xetra_csv, xetra_key
+
+SRC_BUCKET = 'xetra-bench-src'
+TGT_BUCKET = 'xetra-bench-tgt'
+ENDPOINT_URL = 'https://s3.eu-central-1.amazonaws.com'
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'configs',
+                           'xetra_report1_config.yaml')
+# Xetra trading hours -> one source file per hour
+HOURS = range(8, 17)
+
+
+def _git_revision():
+    """
+    Returns the current git commit (None outside of a git checkout)
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _create_storage(storage: str, bucket: str, metrics: RunMetrics,
+                    local_dir: str):
+    """
+    Returns the storage backend of a bucket (S3 -> mocked by moto)
+    """
+    if storage == 's3':
+        return S3BucketConnector('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY',
+                                 ENDPOINT_URL, bucket, metrics=metrics)
+    if storage == 'local':
+        return LocalFileSystemBackend(os.path.join(local_dir, bucket),
+                                      metrics=metrics)
+    return MemoryBackend(metrics=metrics)
+
+
+def _upload_source(storage_src, dates: list, n_isins: int, minutes: int):
+    """
+    Generates and uploads the hourly source files of the dates
+
+    Returns:
+        Tuple of (number of files, number of rows, size in MB)
+    """
+    files, rows, size = 0, 0, 0
+    for date in dates:
+        for hour in HOURS:
+            content = generate_xetra_csv(date, hour, n_isins=n_isins,
+                                         minutes=minutes)
+            storage_src.write(xetra_key(date, hour), content)
+            files += 1
+            rows += content.count(b'\n') - 1
+            size += len(content)
+    return files, rows, size / 2**20
+
+
+def _stage(name: str, func, rows_in: int = None):
+    """
+    Runs one stage and returns its result and its measurements
+    """
+    result, elapsed, peak = measure(func)
+    rows_out = len(result) if isinstance(result, pd.DataFrame) else None
+    rows = rows_in if rows_in is not None else rows_out
+    return result, {
+        'stage': name,
+        'seconds': round(elapsed, 4),
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rows_per_sec': round(rows / elapsed) if rows and elapsed else None,
+        'peak_rss_increase_mb': round(peak, 1)
+    }
+
+
+def run_benchmark(n_isins: int, days: int, minutes: int, mode: str,
+                  storage: str = 's3', staged: bool = False):
+    """
+    Runs the ETL once on freshly generated data (called in a fresh process
+    by run_isolated())
+
+    Returns:
+        Dict with the parameters and the measurements per stage
+    """
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'KEY1')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'KEY2')
+    with open(CONFIG_PATH, encoding='utf-8') as config_file:
+        config = yaml.safe_load(config_file)
+
+    # The last `days` trading days up to today + the day before for the
+    # previous closing prices -> the meta planning runs unpatched
+    calendar = TradingCalendar()
+    today = np.datetime64(datetime.today().date(), 'D')
+    dates = calendar.trading_days(today - 3 * days - 10, today)[-(days + 1):] \
+        .astype(str).tolist()
+
+    with mock_aws(), tempfile.TemporaryDirectory() as local_dir:
+        s3_resource = boto3.resource(service_name='s3', endpoint_url=ENDPOINT_URL)
+        for bucket in (SRC_BUCKET, TGT_BUCKET):
+            s3_resource.create_bucket(Bucket=bucket, CreateBucketConfiguration={
+                'LocationConstraint': 'eu-central-1'})
+        s3_bucket_src = _create_storage(storage, SRC_BUCKET, None, local_dir)
+        files, source_rows, source_mb = _upload_source(s3_bucket_src, dates,
+                                                       n_isins, minutes)
+
+        metrics = RunMetrics()
+        s3_bucket_src.metrics = metrics
+        s3_bucket_tgt = _create_storage(storage, TGT_BUCKET, metrics, local_dir)
+        source_config = XetraSourceConfig(**{
+            **config['source'], 'src_first_extract_date': dates[1],
+            'src_streaming': mode != 'batch',
+            'src_staging_prefix': config['source'].get('src_staging_prefix')
+                                  if staged else None})
+        target_config = XetraTargetConfig(**{
+            **config['target'],
+            'tgt_write_behind': config['target'].get('tgt_write_behind', 2)
+                                if mode == 'write-behind' else 0,
+            'tgt_run_report': False, 'tgt_metrics_textfile': None})
+        meta_config = config['meta']
+
+        # init -> reading the meta file & planning the dates
+        xetra_etl, stage = _stage('init', lambda: XetraETL(
+            s3_bucket_src, s3_bucket_tgt, meta_config['meta_key'], source_config,
+            target_config, meta_config.get('meta_state_key'),
+            meta_config.get('meta_format', 'csv'), calendar, metrics))
+        stages = [stage]
+        if staged:
+            # Converting the CSVs to staging files, read by all later stages
+            _, stage = _stage('stage', xetra_etl.stage_source, source_rows)
+            stages.append(stage)
+
+        if mode == 'batch':
+            data_frame, stage = _stage('extract', xetra_etl.extract)
+            stages.append(stage)
+            data_frame, stage = _stage(
+                'transform', lambda: xetra_etl.transform_report1(data_frame),
+                len(data_frame))
+            stages.append(stage)
+            _, stage = _stage('load', lambda: xetra_etl.load(data_frame),
+                              len(data_frame))
+            stages.append(stage)
+        elif mode == 'streaming':
+            data_frame, stage = _stage('extract_transform',
+                                       xetra_etl.extract_transform_report1_by_day,
+                                       source_rows)
+            stages.append(stage)
+            _, stage = _stage('load', lambda: xetra_etl.load(data_frame),
+                              len(data_frame))
+            stages.append(stage)
+        else:
+            _, stage = _stage('etl', xetra_etl.etl_report1, source_rows)
+            stages.append(stage)
+
+        target_mb = sum(obj.size for obj in s3_bucket_tgt.list('')) / 2**20
+
+    total = sum(stage['seconds'] for stage in stages)
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpus': os.cpu_count(),
+        'mode': mode,
+        'storage': storage,
+        'staged': staged,
+        'isins': n_isins,
+        'days': days,
+        'minutes_per_file': minutes,
+        'source_files': files,
+        'source_rows': source_rows,
+        'source_mb': round(source_mb, 1),
+        'target_mb': round(target_mb, 2),
+        'total_seconds': round(total, 4),
+        'rows_per_sec': round(source_rows / total) if total else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': stages,
+        # Metrics recorded by the ETL itself (see RunMetrics)
+        'etl_stages': metrics.report()['stages']
+    }
+
+
+def main():
+    """
+    Entry point of the benchmark
+    """
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of XetraETL.')
+    parser.add_argument('--isins', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--minutes', type=int, default=60,
+                        help='Trading minutes per hourly source file.')
+    parser.add_argument('--mode', nargs='+', default=['batch', 'streaming'],
+                        choices=['batch', 'streaming', 'write-behind'])
+    parser.add_argument('--storage', default='s3', choices=['s3', 'local', 'memory'],
+                        help='Storage of the source & target files.')
+    parser.add_argument('--staged', action='store_true',
+                        help='Stage the source files first (timed separately).')
+    parser.add_argument('--output', default=os.path.join(
+        os.path.dirname(__file__), 'results', 'bench_etl.jsonl'),
+        help='JSON Lines file the results are appended to.')
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    for mode in args.mode:
+        result = run_isolated(run_benchmark, args.isins, args.days,
+                              args.minutes, mode, args.storage, args.staged)
+        with open(args.output, 'a', encoding='utf-8') as output:
+            output.write(json.dumps(result) + '\n')
+
+        print(f'{mode} ({args.storage}): {result["source_rows"]:,} rows in {result["source_files"]} '
+              f'files ({result["source_mb"]} MB), {result["total_seconds"]:.2f} s, '
+              f'{result["rows_per_sec"]:,} rows/s, peak RSS {result["peak_rss_mb"]} MB')
+        print(f'  {"stage":<18} {"time s":>8} {"rows/s":>12} {"peak RSS MB":>12}')
+        for stage in result['stages']:
+            rows_per_sec = f'{stage["rows_per_sec"]:,}' if stage['rows_per_sec'] else '-'
+            print(f'  {stage["stage"]:<18} {stage["seconds"]:>8.3f} {rows_per_sec:>12} '
+                  f'{stage["peak_rss_increase_mb"]:>12.1f}')
+    print(f'Results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+    File: bench_meta_dates.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Benchmarks the date list computation of MetaProcess against the
+            former set based return_date_list on a long meta history.
+
+            Usage: python -m benchmarks.bench_meta_dates [--years N [N ...]]
+"""
+import os
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import boto3
+import numpy as np
+import pandas as pd
+from moto import mock_aws
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.meta_process import MetaProcess
+from xetra.common.constants import MetaProcessFormat
+
+BUCKET = 'xetra-bench'
+ENDPOINT_URL = 'https://s3.eu-central-1.amazonaws.com'
+
+
+def return_date_list_legacy(first_date: str, df_meta: pd.DataFrame):
+    """
+    The former date list computation (without reading the meta file)
+    """
+    start = datetime.strptime(first_date, '%Y-%m-%d').date() - timedelta(days=1)
+    today = datetime.today().date()
+    dates = [start + timedelta(days=x) for x in range(0, (today - start).days + 1)]
+    src_dates = set(pd.to_datetime(
+        df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]).dt.date)
+    dates_missing = set(dates[1:]) - src_dates
+    if not dates_missing:
+        return '2200-01-01', []
+    min_date = min(dates_missing) - timedelta(days=1)
+    return ((min_date + timedelta(days=1)).strftime('%Y-%m-%d'),
+            [date.strftime('%Y-%m-%d') for date in dates if date >= min_date])
+
+
+def generate_meta(years: int, gap_ratio: float = 0.002, seed: int = 0):
+    """
+    Generates a meta file of years of processed dates with a few gaps
+
+    Returns:
+        first_date (str): First processed date
+        df_meta (pd.DataFrame): Meta file with one row per processed date
+    """
+    rng = np.random.default_rng(seed)
+    today = np.datetime64(datetime.today().date(), 'D')
+    dates = np.arange(today - 365 * years, today + 1, dtype='datetime64[D]')
+    dates = dates[rng.random(len(dates)) >= gap_ratio]
+    df_meta = pd.DataFrame({
+        MetaProcessFormat.META_SOURCE_DATE_COL.value: dates.astype(str),
+        MetaProcessFormat.META_PROCESS_COL.value: '2021-04-19 10:00:00'})
+    return str(dates[0]), df_meta
+
+
+def _time(func, repeat: int):
+    """
+    Returns the best wall time of func in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """
+    Entry point of the benchmark
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the meta date list.')
+    parser.add_argument('--years', type=int, nargs='+', default=[10, 20, 40])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'KEY1')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'KEY2')
+    with mock_aws():
+        boto3.resource(service_name='s3', endpoint_url=ENDPOINT_URL)\
+            .create_bucket(Bucket=BUCKET, CreateBucketConfiguration={
+                'LocationConstraint': 'eu-central-1'})
+        s3_bucket = S3BucketConnector('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY',
+                                      ENDPOINT_URL, BUCKET)
+
+        print(f'{"years":>5} {"gaps":>5} {"legacy ms":>10} {"csv ms":>8} '
+              f'{"ranges ms":>10} {"compute ms":>11}')
+        for years in args.years:
+            first_date, df_meta = generate_meta(years)
+            s3_bucket.write_df_to_s3(df_meta, 'meta.csv', 'csv')
+            MetaProcess.compact_meta_file('meta.csv', 'meta.parquet', s3_bucket)
+
+            def legacy():
+                return return_date_list_legacy(first_date,
+                                               s3_bucket.read_csv_to_df('meta.csv'))
+
+            def current(meta_key, meta_format):
+                meta = MetaProcess(meta_key, s3_bucket, meta_format)
+                return meta.date_list(first_date), meta.missing_ranges(first_date)
+
+            # Same result for both file formats and the former computation
+            (min_date, dates), gaps = current('meta.parquet', 'parquet')
+            assert (min_date, dates) == legacy()
+            assert (min_date, dates) == current('meta.csv', 'csv')[0]
+
+            meta = MetaProcess('meta.parquet', s3_bucket, 'parquet').load()
+            legacy_ms = _time(legacy, args.repeat) * 1000
+            csv_ms = _time(lambda: current('meta.csv', 'csv'), args.repeat) * 1000
+            ranges_ms = _time(lambda: current('meta.parquet', 'parquet'),
+                              args.repeat) * 1000
+            compute_ms = _time(lambda: (meta.date_list(first_date),
+                                        meta.missing_ranges(first_date)),
+                               args.repeat) * 1000
+            print(f'{years:>5} {len(gaps):>5} {legacy_ms:>10.1f} {csv_ms:>8.1f} '
+                  f'{ranges_ms:>10.1f} {compute_ms:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+    File: bench_parquet_writer.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Benchmarks the parquet writer options of
+            S3BucketConnector.write_df_to_s3 (write time, file size and
+            read time of a single-ISIN scan) on a synthetic report 1.
+
+            Usage: python -m benchmarks.bench_parquet_writer [--isins N]
+                       [--days N]
+"""
+import os
+import argparse
+import time
+from io import BytesIO
+
+import boto3
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from moto import mock_aws
+
+from xetra.common.s3 import S3BucketConnector
+from benchmarks.measure import measure
+
+BUCKET = 'xetra-bench'
+ENDPOINT_URL = 'https://s3.eu-central-1.amazonaws.com'
+
+SETTINGS = {
+    'default': {},
+    'snappy': {'compression': 'snappy'},
+    'lz4': {'compression': 'lz4'},
+    'zstd-3': {'compression': 'zstd', 'compression_level': 3},
+    'zstd-9': {'compression': 'zstd', 'compression_level': 9},
+    'zstd-3 sorted': {'compression': 'zstd', 'compression_level': 3,
+                      'row_group_size': 100_000, 'use_dictionary': True,
+                      'write_statistics': True, 'sort_by': ['ISIN', 'Date']},
+    'zstd-3 sorted 250k': {'compression': 'zstd', 'compression_level': 3,
+                           'row_group_size': 250_000, 'use_dictionary': True,
+                           'write_statistics': True, 'sort_by': ['ISIN', 'Date']},
+    'zstd-3 sorted no stats': {'compression': 'zstd', 'compression_level': 3,
+                               'row_group_size': 100_000, 'use_dictionary': True,
+                               'write_statistics': False,
+                               'sort_by': ['ISIN', 'Date']},
+    # A column list disables dictionary encoding for all other columns
+    'zstd-3 sorted dict ISIN': {'compression': 'zstd', 'compression_level': 3,
+                                'row_group_size': 100_000,
+                                'use_dictionary': ['ISIN'],
+                                'write_statistics': True,
+                                'sort_by': ['ISIN', 'Date']},
+}
+
+
+def generate_report(n_isins: int, days: int, seed: int = 0):
+    """
+    Generates a report 1 shaped DataFrame, ordered by date like a backfill
+    of daily reports
+
+    Returns:
+        report (pd.DataFrame): Synthetic report 1
+    """
+    rng = np.random.default_rng(seed)
+    isins = np.array([f'DE{i:010d}' for i in range(n_isins)])
+    dates = pd.date_range('2021-01-04', periods=days, freq='B').strftime('%Y-%m-%d')
+    size = n_isins * len(dates)
+    prices = rng.lognormal(3, 1, size).round(2)
+    return pd.DataFrame({
+        'ISIN': np.tile(isins, len(dates)),
+        'Date': np.repeat(dates.to_numpy(), n_isins),
+        'opening_price_eur': prices,
+        'closing_price_eur': (prices * rng.normal(1, 0.01, size)).round(2),
+        'minimum_price_eur': (prices * 0.98).round(2),
+        'maximum_price_eur': (prices * 1.02).round(2),
+        'daily_traded_volume': rng.integers(0, 100_000, size),
+        'change_prev_closing_%': rng.normal(0, 2, size).round(2)
+    })
+
+
+def main():
+    """
+    Entry point of the benchmark
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the parquet writer.')
+    parser.add_argument('--isins', type=int, default=3000)
+    parser.add_argument('--days', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    report = generate_report(args.isins, args.days)
+    isin = report['ISIN'].iloc[args.isins // 2]
+    print(f'{len(report):,} report rows, {args.isins} ISINs, {args.days} days')
+
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'KEY1')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'KEY2')
+    with mock_aws():
+        s3_resource = boto3.resource(service_name='s3', endpoint_url=ENDPOINT_URL)
+        s3_resource.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={
+            'LocationConstraint': 'eu-central-1'})
+        s3_bucket = S3BucketConnector('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY',
+                                      ENDPOINT_URL, BUCKET)
+        print(f'{"setting":<24} {"write s":>8} {"size MB":>8} {"read s":>8} '
+              f'{"scan s":>8} {"scan groups":>12}')
+        for name, options in SETTINGS.items():
+            key = 'bench.parquet'
+            write_s = min(measure(s3_bucket.write_df_to_s3, report, key,
+                                  'parquet', options)[1]
+                          for _ in range(args.repeat))
+            data = s3_resource.Object(BUCKET, key).get()['Body'].read()
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                pd.read_parquet(BytesIO(data))
+            read_s = (time.perf_counter() - start) / args.repeat
+
+            # Single ISIN scan -> row groups are skipped by their statistics
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                pq.read_table(BytesIO(data), filters=[('ISIN', '==', isin)])
+            scan_s = (time.perf_counter() - start) / args.repeat
+            metadata = pq.ParquetFile(BytesIO(data)).metadata
+            groups = sum(
+                1 for i in range(metadata.num_row_groups)
+                if not metadata.row_group(i).column(0).is_stats_set
+                or metadata.row_group(i).column(0).statistics.min <= isin
+                <= metadata.row_group(i).column(0).statistics.max)
+            print(f'{name:<24} {write_s:>8.3f} {len(data) / 2**20:>8.2f} '
+                  f'{read_s:>8.3f} {scan_s:>8.3f} '
+                  f'{groups:>5}/{metadata.num_row_groups:<6}')
+
+
+if __name__ == '__main__':
+    main()
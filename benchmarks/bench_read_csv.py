@@ -0,0 +1,92 @@
+"""
+    File: bench_read_csv.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Benchmarks S3BucketConnector.read_csv_to_df against the former
+            decode + StringIO read path (parse time and peak RSS).
+
+            Usage: python -m benchmarks.bench_read_csv [--isins N]
+"""
+import os
+import argparse
+from io import StringIO
+
+import boto3
+import pandas as pd
+from moto import mock_aws
+
+from xetra.common.s3 import S3BucketConnector
+from benchmarks.measure import measure, run_isolated
+from tests.xetra_data import generate_xetra_csv, xetra_key
+
+BUCKET = 'xetra-bench'
+ENDPOINT_URL = 'https://s3.eu-central-1.amazonaws.com'
+
+
+def read_legacy(s3_bucket: S3BucketConnector, key: str, encoding: str = 'utf-8'):
+    """
+    The former read path: bytes -> str -> StringIO -> pandas
+    """
+    # pylint: disable=protected-access
+    csv_obj = s3_bucket._bucket.Object(key=key).get()\
+                            .get('Body').read().decode(encoding)
+    return pd.read_csv(StringIO(csv_obj))
+
+
+def read_current(s3_bucket: S3BucketConnector, key: str):
+    """
+    The current read path of S3BucketConnector
+    """
+    return s3_bucket.read_csv_to_df(key)
+
+
+def _measure(variant: str, n_isins: int):
+    """
+    Runs one read (called in a fresh process by run_isolated())
+
+    Returns:
+        Tuple of (file size in MB, parse time in s, peak RSS increase in MB)
+    """
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'KEY1')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'KEY2')
+    with mock_aws():
+        boto3.resource(service_name='s3', endpoint_url=ENDPOINT_URL)\
+            .create_bucket(Bucket=BUCKET, CreateBucketConfiguration={
+                'LocationConstraint': 'eu-central-1'})
+        s3_bucket = S3BucketConnector('AWS_ACCESS_KEY_ID',
+                                      'AWS_SECRET_ACCESS_KEY',
+                                      ENDPOINT_URL, BUCKET)
+        key = xetra_key('2021-04-15', 8)
+        content = generate_xetra_csv('2021-04-15', 8, n_isins=n_isins)
+        s3_bucket._bucket.put_object(Body=content, Key=key)  # pylint: disable=protected-access
+        size_mb = len(content) / 2**20
+        del content
+
+        func = read_legacy if variant == 'legacy' else read_current
+        _, elapsed, peak = measure(func, s3_bucket, key)
+    return size_mb, elapsed, peak
+
+
+def main():
+    """
+    Entry point of the benchmark
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the CSV read path.')
+    parser.add_argument('--isins', type=int, nargs='+', default=[1000, 3000, 6000],
+                        help='Number of instruments per file (controls size).')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"variant":<8} {"size MB":>8} {"time s":>8} {"peak RSS MB":>12}')
+    for n_isins in args.isins:
+        for variant in ('legacy', 'current'):
+            runs = [run_isolated(_measure, variant, n_isins)
+                    for _ in range(args.repeat)]
+            size_mb = runs[0][0]
+            elapsed = min(run[1] for run in runs)
+            peak = min(run[2] for run in runs)
+            print(f'{variant:<8} {size_mb:>8.1f} {elapsed:>8.3f} {peak:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+    File: bench_transform.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Benchmarks XetraETL.transform_report1 against the former
+            multi-pass transformation on synthetic Xetra data.
+
+            Usage: python -m benchmarks.bench_transform [--isins N] [--days N]
+                       [--processes N [N ...]]
+"""
+import argparse
+from unittest.mock import patch
+
+import pandas as pd
+
+from xetra.common.meta_process import MetaProcess
+from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig
+from benchmarks.measure import measure
+from tests.report1_reference import SOURCE_CONFIG, TARGET_CONFIG, \
+    generate_source, transform_report1_legacy
+
+
+def make_etl(extract_date: str, source_config: XetraSourceConfig = SOURCE_CONFIG):
+    """
+    Creates a XetraETL instance without any S3 access
+    """
+    with patch.object(MetaProcess, 'date_list',
+                      return_value=[extract_date, []]):
+        return XetraETL(None, None, None, source_config, TARGET_CONFIG)
+
+
+def main():
+    """
+    Entry point of the benchmark
+    """
+    parser = argparse.ArgumentParser(description='Benchmark transform_report1.')
+    parser.add_argument('--isins', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--processes', type=int, nargs='*', default=[2, 4],
+                        help='Process counts for the ISIN-sharded aggregation.')
+    args = parser.parse_args()
+
+    df_src, extract_date = generate_source(args.isins, args.days)
+    print(f'{len(df_src):,} source rows, {args.isins} ISINs, {args.days} days')
+
+    variants = [('legacy', lambda df: transform_report1_legacy(df, extract_date))]
+    for engine in ('pandas', 'numpy'):
+        xetra_etl = make_etl(extract_date,
+                             SOURCE_CONFIG._replace(src_agg_engine=engine))
+        variants.append((engine, xetra_etl.transform_report1))
+    for processes in args.processes:
+        xetra_etl = make_etl(extract_date, SOURCE_CONFIG._replace(
+            src_agg_engine='numpy', src_agg_processes=processes))
+        variants.append((f'numpy x{processes}', xetra_etl.transform_report1))
+
+    df_exp = variants[0][1](df_src.copy())
+    print(f'{"variant":<10} {"time s":>8} {"peak RSS MB":>12}')
+    for variant, func in variants:
+        pd.testing.assert_frame_equal(df_exp, func(df_src.copy()))
+        runs = [measure(func, df_src.copy())[1:] for _ in range(args.repeat)]
+        print(f'{variant:<10} {min(run[0] for run in runs):>8.3f} '
+              f'{min(run[1] for run in runs):>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
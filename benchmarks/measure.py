@@ -0,0 +1,58 @@
+"""
+    File: measure.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Helpers for measuring wall time and peak memory in the benchmarks.
+"""
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import psutil
+
+
+def measure(func, *args, interval: float = 0.005, **kwargs):
+    """
+    Runs func and samples the RSS of the process in a background thread
+
+    Parameters:
+        func: Function to be measured
+        interval (float): Sampling interval in seconds
+
+    Returns:
+        Tuple of (return value, wall time in s, peak RSS increase in MB)
+    """
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+
+    def _sample():
+        while not done.wait(interval):
+            peak[0] = max(peak[0], process.memory_info().rss)
+
+    sampler = threading.Thread(target=_sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+    peak[0] = max(peak[0], process.memory_info().rss)
+    return result, elapsed, (peak[0] - baseline) / 2**20
+
+
+def run_isolated(func, *args):
+    """
+    Runs func in a fresh process, so peak memory isn't skewed by memory
+    the allocator kept from a previous run
+
+    Returns:
+        Return value of func
+    """
+    with ProcessPoolExecutor(max_workers=1,
+                             mp_context=get_context('spawn')) as executor:
+        return executor.submit(func, *args).result()
@@ -15,6 +15,11 @@ import logging.config
 import yaml             # For parsing our YAML configuration file
 
 from xetra.common.s3 import S3BucketConnector
+from xetra.common.storage import LocalFileSystemBackend
+from xetra.common.meta_process import MetaProcess
+from xetra.common.metrics import RunMetrics
+from xetra.common.constants import MetaProcessFormat
+from xetra.common.trading_calendar import TradingCalendar
 from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
 
 
@@ -25,6 +30,14 @@ def main():
     # Parsing the YAML Configuration File
     parser = argparse.ArgumentParser(description='Run the Xetra ETL job.')
     parser.add_argument('config', help='A configuration file in YAML format.')
+    parser.add_argument('--sync-only', action='store_true',
+                        help='Only sync the source dates to source.src_mirror_dir.')
+    parser.add_argument('--stage-only', action='store_true',
+                        help='Only convert the source dates to staging files '
+                             '(source.src_staging_prefix).')
+    parser.add_argument('--compact-meta', action='store_true',
+                        help='Only migrate the meta file (one row per date) to '
+                             'the compact meta file meta.meta_ranges_key.')
     args = parser.parse_args()
 
     # Safely open the configuration file
@@ -39,27 +52,68 @@ def main():
     # Reading S3 Configuration
     s3_config = config['s3']
 
-    # Creating the S3BucketConnector instances based on the configurations
-    s3_bucket_src = S3BucketConnector(
-        access_key=s3_config['access_key'],
-        secret_key=s3_config['secret_key'],
-        endpoint_url=s3_config['src_endpoint_url'],
-        bucket=s3_config['src_bucket'],
-        region_name=s3_config['src_region']
-    )
-    s3_bucket_trg = S3BucketConnector(
-        access_key=s3_config['access_key'],
-        secret_key=s3_config['secret_key'],
-        endpoint_url=s3_config['tgt_endpoint_url'],
-        bucket=s3_config['tgt_bucket'],
-        region_name=s3_config['tgt_region']
-    )
+    # Metrics per stage of the run, shared by the connectors and the ETL
+    metrics = RunMetrics()
+
+    # Creating the storage backends based on the configurations:
+    # a local directory if configured, the S3 bucket otherwise
+    if s3_config.get('src_local_dir'):
+        s3_bucket_src = LocalFileSystemBackend(
+            root_dir=s3_config['src_local_dir'],
+            cache_dir=s3_config.get('src_cache_dir'),
+            cache_max_mb=s3_config.get('src_cache_max_mb', 1024),
+            metrics=metrics
+        )
+    else:
+        s3_bucket_src = S3BucketConnector(
+            access_key=s3_config['access_key'],
+            secret_key=s3_config['secret_key'],
+            endpoint_url=s3_config['src_endpoint_url'],
+            bucket=s3_config['src_bucket'],
+            region_name=s3_config['src_region'],
+            cache_dir=s3_config.get('src_cache_dir'),
+            cache_max_mb=s3_config.get('src_cache_max_mb', 1024),
+            metrics=metrics
+        )
+    if s3_config.get('tgt_local_dir'):
+        s3_bucket_trg = LocalFileSystemBackend(
+            root_dir=s3_config['tgt_local_dir'],
+            metrics=metrics
+        )
+    else:
+        s3_bucket_trg = S3BucketConnector(
+            access_key=s3_config['access_key'],
+            secret_key=s3_config['secret_key'],
+            endpoint_url=s3_config['tgt_endpoint_url'],
+            bucket=s3_config['tgt_bucket'],
+            region_name=s3_config['tgt_region'],
+            part_size_mb=s3_config.get('tgt_part_size_mb', 8),
+            upload_workers=s3_config.get('tgt_upload_workers', 4),
+            metrics=metrics
+        )
 
     # Reading configurations for the respective buckets
     source_config = XetraSourceConfig(**config['source'])       # Source
     target_config = XetraTargetConfig(**config['target'])       # Target
     meta_config = config['meta']                                # Meta Config
 
+    meta_format = meta_config.get('meta_format', MetaProcessFormat.META_FILE_FORMAT.value)
+    # Exchange calendar -> non-trading days are neither extracted nor tracked
+    calendar = TradingCalendar(**config['calendar']) if config.get('calendar') \
+        else None
+    if args.compact_meta:
+        # One-off migration of a meta file with one row per date to
+        # processed ranges, meta_key is switched to the ranges file after
+        if meta_format != MetaProcessFormat.META_FILE_FORMAT.value \
+                or not meta_config.get('meta_ranges_key'):
+            parser.error("--compact-meta requires meta.meta_format 'csv' "
+                         'and meta.meta_ranges_key')
+        ranges = MetaProcess.compact_meta_file(meta_config['meta_key'],
+                                               meta_config['meta_ranges_key'],
+                                               s3_bucket_trg, calendar)
+        logger.info('Xetra meta file compacted into %s ranges', ranges)
+        return
+
     # Create a XetraETL class instance
     logger.info('Xetra ETL Job Started')
     xetra_etl = XetraETL(
@@ -67,9 +121,27 @@ def main():
         s3_bucket_trg,
         meta_config['meta_key'],
         source_config,
-        target_config
+        target_config,
+        meta_config.get('meta_state_key'),
+        meta_format,
+        calendar,
+        metrics
     )
 
+    if args.sync_only:
+        # Mirroring the source dates for later runs
+        if xetra_etl.sync_source() is None:
+            parser.error('--sync-only requires source.src_mirror_dir')
+        logger.info('Xetra source sync completed')
+        return
+    if args.stage_only:
+        # Staging the source dates for later runs
+        xetra_etl.sync_source()
+        if xetra_etl.stage_source() is None:
+            parser.error('--stage-only requires source.src_staging_prefix')
+        logger.info('Xetra source staging completed')
+        return
+
     # Running ETL Job for Xetra Report 1
     xetra_etl.etl_report1()
     logger.info('Xetra ETL Job Completed')
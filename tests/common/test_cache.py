@@ -0,0 +1,146 @@
+"""
+    File: test_cache.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the LocalFileCache class.
+"""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from xetra.common.cache import LocalFileCache
+
+
+class TestLocalFileCacheMethods(unittest.TestCase):
+    """
+    Testing the LocalFileCache Class
+    """
+
+    def setUp(self):
+        """
+        Setting up the test environment
+        """
+        self.cache_dir = tempfile.mkdtemp()
+        self.df_exp = pd.DataFrame({'col1': ['A', 'B'], 'col2': [1.5, 2.5]})
+        self.df_exp['col3'] = pd.Categorical(['X', 'Y'])
+
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+
+    def test_put_get_ok(self):
+        """
+        Tests the put and get methods for a cached and a missing entry
+        """
+        # Test init
+        cache = LocalFileCache(self.cache_dir, 2**20)
+
+        # Method execution
+        cache.put(self.df_exp, 'bucket', 'key.csv', '"etag1"')
+        df_result = cache.get('bucket', 'key.csv', '"etag1"')
+        df_missing = cache.get('bucket', 'key.csv', '"etag2"')
+
+        # Tests after method execution
+        pd.testing.assert_frame_equal(self.df_exp, df_result)
+        self.assertIsNone(df_missing)
+
+
+    def test_evict_lru(self):
+        """
+        Tests that the least recently used entry is evicted when the cache
+        gets too large
+        """
+        # Test init
+        cache = LocalFileCache(self.cache_dir, 2**30)
+        for key in ['key1', 'key2', 'key3']:
+            cache.put(self.df_exp, key)
+        # key1 is the least recently written, but key2 the least recently used
+        os.utime(cache.path('key2'), (time.time() - 20, time.time() - 20))
+        os.utime(cache.path('key3'), (time.time() - 10, time.time() - 10))
+        cache.get('key1')
+        cache.max_bytes = os.path.getsize(cache.path('key1')) * 2
+
+        # Method execution
+        with self.assertLogs() as logm:
+            cache.evict()
+
+        # Tests after method execution
+        self.assertIn('Evicting cache file', logm.output[0])
+        self.assertIsNotNone(cache.get('key1'))
+        self.assertIsNone(cache.get('key2'))
+        self.assertIsNotNone(cache.get('key3'))
+
+
+    def test_get_corrupt_entry(self):
+        """
+        Tests that an unreadable entry is a miss and removed
+        """
+        # Test init
+        cache = LocalFileCache(self.cache_dir, 2**20)
+        cache.put(self.df_exp, 'key1')
+        with open(cache.path('key1'), 'r+b') as file:
+            file.truncate(20)
+
+        # Method execution
+        with self.assertLogs(level='WARNING'):
+            df_result = cache.get('key1')
+
+        # Tests after method execution
+        self.assertIsNone(df_result)
+        self.assertFalse(os.path.exists(cache.path('key1')))
+        cache.put(self.df_exp, 'key1')
+        pd.testing.assert_frame_equal(self.df_exp, cache.get('key1'))
+
+
+    def test_put_error(self):
+        """
+        Tests that a failed write is logged and leaves no file behind
+        """
+        # Test init
+        cache = LocalFileCache(self.cache_dir, 2**20)
+
+        # Method execution
+        with patch('xetra.common.cache.feather.write_feather',
+                   side_effect=OSError('No space left on device')), \
+                self.assertLogs(level='WARNING') as logm:
+            result = cache.put(self.df_exp, 'key1')
+
+        # Tests after method execution
+        self.assertFalse(result)
+        self.assertIn('No space left on device', logm.output[0])
+        self.assertEqual([], os.listdir(self.cache_dir))
+        self.assertIsNone(cache.get('key1'))
+
+
+    def test_put_evicts_only_if_exceeded(self):
+        """
+        Tests that put() only scans the cache once the running total
+        exceeds max_bytes
+        """
+        # Test init
+        cache = LocalFileCache(self.cache_dir, 2**30)
+        cache.put(self.df_exp, 'key1')
+        entry_size = os.path.getsize(cache.path('key1'))
+        cache.max_bytes = entry_size * 2
+
+        # Method execution
+        with patch.object(LocalFileCache, 'evict') as evict:
+            # Replacing an entry doesn't change the total
+            cache.put(self.df_exp, 'key1')
+            cache.put(self.df_exp, 'key2')
+            calls_within_max = evict.call_count
+            cache.put(self.df_exp, 'key3')
+
+        # Tests after method execution
+        self.assertEqual(0, calls_within_max)
+        self.assertEqual(1, evict.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@
 """
 import os
 import unittest
+from unittest.mock import patch
 from io import StringIO
 from datetime import datetime, timedelta
 
@@ -19,8 +20,10 @@ from moto import mock_aws
 
 from xetra.common.s3 import S3BucketConnector
 from xetra.common.meta_process import MetaProcess
+from xetra.common.trading_calendar import TradingCalendar
 from xetra.common.constants import MetaProcessFormat
-from xetra.common.custom_exceptions import WrongMetaFileException
+from xetra.common.custom_exceptions import WrongMetaFileException, \
+    MetaFileConflictException, WrongFormatException
 
 
 class TestMetaProcessMethods(unittest.TestCase):
@@ -328,7 +331,7 @@ class TestMetaProcessMethods(unittest.TestCase):
         first_date = self.dates[1]
 
         # Method execution
-        with self.assertRaises(KeyError):
+        with self.assertRaises(WrongMetaFileException):
             MetaProcess.return_date_list(first_date, meta_key, self.s3_bucket_meta)
 
         # Cleanup after test
@@ -384,5 +387,239 @@ class TestMetaProcessMethods(unittest.TestCase):
         )
 
 
+    def test_meta_process_load_once(self):
+        """
+        Tests that the meta file is read once for the date list and the
+        updates of a run and written once per commit
+        """
+        # Expected results
+        meta_exp = [self.dates[3], self.dates[2], self.dates[1]]
+
+        # Test init
+        meta_key = 'meta.csv'
+        MetaProcess.update_meta_file([self.dates[3]], meta_key, self.s3_bucket_meta)
+        meta = MetaProcess(meta_key, self.s3_bucket_meta)
+
+        # Method execution
+        with patch.object(self.s3_bucket_meta, 'read_csv_to_df',
+                          wraps=self.s3_bucket_meta.read_csv_to_df) as read_mock:
+            min_date, _ = meta.date_list(self.dates[3])
+            meta.add_dates([self.dates[2]])
+            meta.commit()
+            meta.add_dates([self.dates[1]])
+            meta.commit()
+
+        # Test after method execution
+        self.assertEqual(1, read_mock.call_count)
+        self.assertEqual(self.dates[2], min_date)
+        df_meta = pd.read_csv(StringIO(self.s3_bucket.Object(key=meta_key).get()
+                                       .get('Body').read().decode('utf-8')))
+        self.assertEqual(meta_exp,
+                         list(df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+        self.assertIn(datetime.strptime(self.dates[1], '%Y-%m-%d').date(),
+                      meta.processed_dates)
+
+
+    def test_meta_process_commit_conflict(self):
+        """
+        Tests that a meta file modified (or created) by another process
+        since it was loaded isn't overwritten
+        """
+        # Test init
+        meta_key = 'meta.csv'
+        meta_new = MetaProcess(meta_key, self.s3_bucket_meta).load()
+        MetaProcess.update_meta_file([self.dates[3]], meta_key, self.s3_bucket_meta)
+        meta_old = MetaProcess(meta_key, self.s3_bucket_meta).load()
+        MetaProcess.update_meta_file([self.dates[2]], meta_key, self.s3_bucket_meta)
+
+        # Method execution
+        for meta in (meta_new, meta_old):
+            meta.add_dates([self.dates[1]])
+            with self.assertRaises(MetaFileConflictException):
+                meta.commit()
+
+        # Test after method execution
+        df_meta = pd.read_csv(StringIO(self.s3_bucket.Object(key=meta_key).get()
+                                       .get('Body').read().decode('utf-8')))
+        self.assertEqual([self.dates[3], self.dates[2]],
+                         list(df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+
+
+    def test_meta_process_ranges(self):
+        """
+        Tests the compact meta file format with processed date ranges
+        """
+        # Expected results
+        ranges_exp = [[self.dates[7], self.dates[5]], [self.dates[3], self.dates[1]]]
+        min_date_exp = self.dates[4]
+
+        # Test init
+        meta_key = 'meta.parquet'
+        meta_format = MetaProcessFormat.META_RANGES_FILE_FORMAT.value
+        meta = MetaProcess(meta_key, self.s3_bucket_meta, meta_format)
+
+        # Method execution -> re-processed dates don't add rows
+        meta.add_dates([self.dates[7], self.dates[6], self.dates[3]])
+        meta.add_dates([self.dates[5], self.dates[2], self.dates[1], self.dates[3]])
+        meta.commit()
+        meta_loaded = MetaProcess(meta_key, self.s3_bucket_meta, meta_format)
+        min_date, date_list = meta_loaded.date_list(self.dates[6])
+
+        # Test after method execution
+        df_meta = self.s3_bucket_meta.read_parquet_to_df(meta_key)
+        self.assertEqual(ranges_exp, df_meta[[
+            MetaProcessFormat.META_RANGE_START_COL.value,
+            MetaProcessFormat.META_RANGE_END_COL.value]].values.tolist())
+        self.assertEqual(min_date_exp, min_date)
+        self.assertEqual(self.dates[5::-1], date_list)
+        self.assertEqual(meta.processed_dates, meta_loaded.processed_dates)
+
+
+    def test_missing_ranges(self):
+        """
+        Tests the missing_ranges method with gaps at the start, in between
+        and at the end
+        """
+        # Expected results
+        missing_exp = [(self.dates[7], self.dates[7]), (self.dates[4], self.dates[3]),
+                       (self.dates[0], self.dates[0])]
+
+        # Test init
+        meta_key = 'meta.csv'
+        MetaProcess.update_meta_file([self.dates[1], self.dates[6], self.dates[2],
+                                      self.dates[5], self.dates[1]],
+                                     meta_key, self.s3_bucket_meta)
+        meta = MetaProcess(meta_key, self.s3_bucket_meta)
+
+        # Method execution
+        missing_result = meta.missing_ranges(self.dates[7])
+        missing_none = meta.missing_ranges(self.dates[2], self.dates[1])
+
+        # Test after method execution
+        self.assertEqual(missing_exp, missing_result)
+        self.assertEqual([], missing_none)
+
+
+    def test_meta_process_trading_calendar(self):
+        """
+        Tests that only trading days are planned and tracked with a trading
+        calendar and that ranges span the non-trading days
+        """
+        # Expected results -> Fri 2021-04-16 & Mon 2021-04-19 form one range
+        ranges_exp = [['2021-04-15', '2021-04-19']]
+        missing_exp = [('2021-04-14', '2021-04-14'), ('2021-04-21', '2021-04-23')]
+
+        # Test init -> 2021-04-20 is a holiday
+        meta_key = 'meta.parquet'
+        calendar = TradingCalendar(holidays=['2021-04-20'])
+        meta = MetaProcess(meta_key, self.s3_bucket_meta,
+                           MetaProcessFormat.META_RANGES_FILE_FORMAT.value, calendar)
+
+        # Method execution
+        meta.add_dates(['2021-04-15', '2021-04-16', '2021-04-19'])
+        meta.commit()
+        missing_result = meta.missing_ranges('2021-04-14', '2021-04-25')
+        with patch('xetra.common.meta_process.datetime') as datetime_mock:
+            datetime_mock.today.return_value = datetime(2021, 4, 25)
+            datetime_mock.strptime = datetime.strptime
+            min_date, date_list = meta.date_list('2021-04-17')
+
+        # Test after method execution
+        df_meta = self.s3_bucket_meta.read_parquet_to_df(meta_key)
+        self.assertEqual(ranges_exp, df_meta[[
+            MetaProcessFormat.META_RANGE_START_COL.value,
+            MetaProcessFormat.META_RANGE_END_COL.value]].values.tolist())
+        self.assertEqual(missing_exp, missing_result)
+        self.assertEqual('2021-04-21', min_date)
+        self.assertEqual(['2021-04-19', '2021-04-21', '2021-04-22', '2021-04-23'],
+                         date_list)
+
+
+    def test_compact_meta_file(self):
+        """
+        Tests collapsing a meta file with one row per date into ranges
+        """
+        # Expected results
+        ranges_exp = 2
+
+        # Test init
+        meta_key = 'meta.csv'
+        ranges_key = 'meta.parquet'
+        MetaProcess.update_meta_file([self.dates[7], self.dates[6], self.dates[3]],
+                                     meta_key, self.s3_bucket_meta)
+        MetaProcess.update_meta_file([self.dates[6], self.dates[2]],
+                                     meta_key, self.s3_bucket_meta)
+
+        # Method execution
+        result = MetaProcess.compact_meta_file(meta_key, ranges_key,
+                                               self.s3_bucket_meta)
+
+        # Test after method execution
+        meta = MetaProcess(ranges_key, self.s3_bucket_meta,
+                           MetaProcessFormat.META_RANGES_FILE_FORMAT.value)
+        self.assertEqual(ranges_exp, result)
+        self.assertEqual(MetaProcess(meta_key, self.s3_bucket_meta).processed_dates,
+                         meta.processed_dates)
+        self.assertEqual(MetaProcess.return_date_list(self.dates[7], meta_key,
+                                                      self.s3_bucket_meta),
+                         meta.date_list(self.dates[7]))
+
+
+    def test_meta_process_wrong_format(self):
+        """
+        Tests the MetaProcess constructor with a wrong meta file format
+        """
+        with self.assertRaises(WrongFormatException):
+            MetaProcess('meta.json', self.s3_bucket_meta, 'json')
+
+
+    def test_prev_prices_write_read(self):
+        """
+        Tests writing and reading the persisted previous prices, also
+        without any prices and without a state file
+        """
+        # Expected Results
+        prices_exp = pd.Series({'AT0000A0E9W5': 20.58, 'DE0005140008': 7.51})
+        as_of_exp = '2021-04-18'
+
+        # Test init
+        state_key = 'prev_prices.parquet'
+        empty_key = 'prev_prices_empty.parquet'
+
+        # Method execution
+        MetaProcess.write_prev_prices(prices_exp, as_of_exp, state_key,
+                                      self.s3_bucket_meta)
+        MetaProcess.write_prev_prices(pd.Series(dtype='float64'), as_of_exp,
+                                      empty_key, self.s3_bucket_meta)
+        as_of_result, prices_result = MetaProcess.read_prev_prices(
+            state_key, self.s3_bucket_meta)
+        as_of_empty, prices_empty = MetaProcess.read_prev_prices(
+            empty_key, self.s3_bucket_meta)
+        as_of_missing, prices_missing = MetaProcess.read_prev_prices(
+            'no_state.parquet', self.s3_bucket_meta)
+
+        # Test after method execution
+        self.assertEqual(as_of_exp, as_of_result)
+        self.assertEqual(prices_exp.to_dict(), prices_result.to_dict())
+        self.assertEqual(as_of_exp, as_of_empty)
+        self.assertTrue(prices_empty.empty)
+        self.assertIsNone(as_of_missing)
+        self.assertIsNone(prices_missing)
+
+        # Cleanup after test
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': state_key
+                    },
+                    {
+                        'Key': empty_key
+                    }
+                ]
+            }
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+"""
+    File: test_metrics.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the RunMetrics class.
+"""
+import os
+import json
+import tempfile
+import unittest
+
+from xetra.common.metrics import RunMetrics
+
+
+class TestRunMetricsMethods(unittest.TestCase):
+    """
+    Testing the RunMetrics Class
+    """
+
+    def test_stage(self):
+        """
+        Tests that the calls of a stage are summed up and passed to the hooks
+        """
+        # Expected results
+        calls_exp = 2
+        rows_in_exp = 30
+        rows_out_exp = 3
+        hook_stages_exp = ['transform', 'transform', 'upload']
+
+        # Test init
+        metrics = RunMetrics()
+        hook_stages = []
+        metrics.add_hook(lambda stage, values: hook_stages.append(stage))
+        metrics.add_hook(lambda stage, values: 1 / 0)
+
+        # Method execution
+        with self.assertLogs() as logm:
+            for rows in (10, 20):
+                with metrics.stage('transform', rows_in=rows) as record:
+                    record['rows_out'] = 1 if rows == 10 else 2
+            metrics.add('upload', seconds=0.5, bytes=100, objects=1)
+
+        # Tests after method execution
+        stages = metrics.stages()
+        self.assertEqual(['transform', 'upload'], list(stages))
+        self.assertEqual(calls_exp, stages['transform']['calls'])
+        self.assertEqual(rows_in_exp, stages['transform']['rows_in'])
+        self.assertEqual(rows_out_exp, stages['transform']['rows_out'])
+        self.assertEqual(100, stages['upload']['bytes'])
+        self.assertGreater(stages['upload']['peak_rss_mb'], 0)
+        self.assertEqual(hook_stages_exp, hook_stages)
+        # Failing hooks don't fail the run
+        self.assertIn('Metrics hook failed: division by zero', logm.output[0])
+
+
+    def test_report_and_prometheus(self):
+        """
+        Tests the JSON run report and the Prometheus textfile
+        """
+        # Expected results
+        sample_exp = 'xetra_etl_stage_bytes{report="report1",stage="download"} 2048'
+
+        # Test init
+        metrics = RunMetrics()
+        metrics.add('download', seconds=0.25, bytes=2048, objects=2)
+
+        # Method execution
+        report = json.loads(metrics.to_json(status='succeeded'))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'xetra.prom')
+            metrics.write_prometheus_textfile(path, report='report1')
+            with open(path, encoding='utf-8') as file:
+                textfile = file.read()
+            files = os.listdir(temp_dir)
+
+        # Tests after method execution
+        self.assertEqual('succeeded', report['status'])
+        self.assertEqual(2, report['stages']['download']['objects'])
+        self.assertEqual(0.25, report['stages']['download']['seconds'])
+        self.assertIn(sample_exp, textfile.splitlines())
+        self.assertIn('# TYPE xetra_etl_stage_seconds gauge', textfile)
+        # No temporary file is left behind
+        self.assertEqual(['xetra.prom'], files)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+    File: test_mirror.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the StorageMirror class.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from xetra.common.mirror import StorageMirror
+from xetra.common.storage import MemoryBackend
+
+
+class TestStorageMirrorMethods(unittest.TestCase):
+    """
+    Testing the StorageMirror Class
+    """
+
+    def setUp(self):
+        """
+        Setting up the test environment
+        """
+        self.mirror_dir = tempfile.mkdtemp()
+        self.source = MemoryBackend()
+        for key in ['2021-04-17/a.csv', '2021-04-17/b.csv', '2021-04-18/a.csv',
+                    '2021-04-19/a.csv']:
+            self.source.write(key, f'col1\n{key}\n'.encode('utf-8'))
+        self.mirror = StorageMirror(self.source, self.mirror_dir)
+
+
+    def tearDown(self):
+        """
+        Tear down the test environment after the unit tests
+        """
+        shutil.rmtree(self.mirror_dir)
+
+
+    def test_sync(self):
+        """
+        Tests that only the objects of the prefixes are mirrored
+        """
+        # Expected results
+        keys_exp = ['2021-04-17/a.csv', '2021-04-17/b.csv', '2021-04-18/a.csv']
+
+        # Method execution
+        result = self.mirror.sync(['2021-04-17', '2021-04-18'], max_workers=2)
+
+        # Tests after method execution
+        self.assertEqual(3, result['downloaded'])
+        self.assertEqual(0, result['skipped'])
+        self.assertEqual(keys_exp, self.mirror.local.list_files_in_prefix(''))
+        self.assertEqual(self.source.read(keys_exp[0]),
+                         self.mirror.local.read(keys_exp[0]))
+        self.assertEqual(3, self.mirror.metrics.stages()['sync']['objects'])
+
+
+    def test_sync_changes(self):
+        """
+        Tests that a sync only downloads new & changed objects, and deletes
+        the files of removed objects
+        """
+        # Test init
+        self.mirror.sync(['2021-04-17', '2021-04-18'])
+        self.source.write('2021-04-17/a.csv', b'col1\nchanged\n')
+        self.source.delete('2021-04-17/b.csv')
+        # Locally modified -> downloaded again
+        with open(os.path.join(self.mirror_dir, '2021-04-18', 'a.csv'), 'ab') as file:
+            file.write(b'x\n')
+
+        # Method execution
+        result = self.mirror.sync(['2021-04-17', '2021-04-18', '2021-04-19'])
+        result_rerun = self.mirror.sync(['2021-04-17', '2021-04-18', '2021-04-19'])
+
+        # Tests after method execution
+        self.assertEqual({'downloaded': 3, 'skipped': 0, 'deleted': 1,
+                          'bytes': 57}, result)
+        self.assertEqual({'downloaded': 0, 'skipped': 3, 'deleted': 0,
+                          'bytes': 0}, result_rerun)
+        self.assertEqual(b'col1\nchanged\n',
+                         self.mirror.local.read('2021-04-17/a.csv'))
+        self.assertFalse(self.mirror.local.exists('2021-04-17/b.csv'))
+        self.assertEqual(self.source.read('2021-04-18/a.csv'),
+                         self.mirror.local.read('2021-04-18/a.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
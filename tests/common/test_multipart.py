@@ -0,0 +1,183 @@
+"""
+    File: test_multipart.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the S3MultipartWriter class.
+"""
+import os
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+import boto3
+import pandas as pd
+from moto import mock_aws
+
+from xetra.common.multipart import S3MultipartWriter, MIN_PART_SIZE
+
+
+class TestS3MultipartWriterMethods(unittest.TestCase):
+    """
+    Testing the S3MultipartWriter Class
+    """
+
+    def setUp(self):
+        """
+        Setup the test environment
+        """
+        # Mocking S3 connection start
+        self.mock_s3 = mock_aws()
+        self.mock_s3.start()
+
+        # Creating S3 Access Keys as environment variables
+        os.environ['AWS_ACCESS_KEY_ID'] = 'KEY1'
+        os.environ['AWS_SECRET_ACCESS_KEY'] = 'KEY2'
+
+        # Creating a bucket on the mocked s3
+        self.s3_bucket_name = 'test-bucket'
+        self.client = boto3.client(service_name='s3', region_name='eu-central-1')
+        self.client.create_bucket(Bucket=self.s3_bucket_name,
+                                  CreateBucketConfiguration={
+                                      'LocationConstraint': 'eu-central-1'
+                                  })
+
+
+    def tearDown(self):
+        """
+        Tear down the test environment after the unit tests
+        """
+        # Mocking S3 connection stop
+        self.mock_s3.stop()
+
+
+    def test_write_small(self):
+        """
+        Tests that content smaller than a part is sent with one put_object
+        """
+        # Expected results
+        key_exp = 'small.csv'
+        content_exp = b'col1,col2\nA,B\n'
+
+        # Method execution
+        with S3MultipartWriter(self.client, self.s3_bucket_name, key_exp) as out:
+            out.write(content_exp[:5])
+            out.write(content_exp[5:])
+
+        # Tests after method execution
+        response = self.client.get_object(Bucket=self.s3_bucket_name, Key=key_exp)
+        self.assertEqual(content_exp, response['Body'].read())
+        self.assertNotIn('-', response['ETag'])
+
+
+    def test_write_multipart(self):
+        """
+        Tests that larger content is uploaded in parts
+        """
+        # Expected results
+        key_exp = 'large.bin'
+        content_exp = os.urandom(2 * MIN_PART_SIZE + 1000)
+        parts_exp = 3
+
+        # Method execution
+        with S3MultipartWriter(self.client, self.s3_bucket_name, key_exp,
+                               part_size=MIN_PART_SIZE, max_workers=2) as out:
+            for start in range(0, len(content_exp), 2**20):
+                out.write(content_exp[start:start + 2**20])
+            self.assertEqual(len(content_exp), out.tell())
+
+        # Tests after method execution
+        response = self.client.get_object(Bucket=self.s3_bucket_name, Key=key_exp)
+        self.assertEqual(content_exp, response['Body'].read())
+        self.assertTrue(response['ETag'].strip('"').endswith(f'-{parts_exp}'))
+
+
+    def test_write_parquet(self):
+        """
+        Tests pandas writing a parquet file directly into the writer
+        """
+        # Expected results
+        key_exp = 'test.parquet'
+        df_exp = pd.DataFrame({'col1': range(1000), 'col2': ['A', 'B'] * 500})
+
+        # Method execution
+        with S3MultipartWriter(self.client, self.s3_bucket_name, key_exp) as out:
+            df_exp.to_parquet(out, index=False)
+
+        # Tests after method execution
+        data = self.client.get_object(Bucket=self.s3_bucket_name,
+                                      Key=key_exp)['Body'].read()
+        pd.testing.assert_frame_equal(df_exp, pd.read_parquet(BytesIO(data)))
+
+
+    def test_write_error_aborts(self):
+        """
+        Tests that no object and no incomplete upload is left after an error
+        """
+        # Test init
+        key_exp = 'failed.bin'
+
+        # Method execution
+        with self.assertRaises(RuntimeError):
+            with S3MultipartWriter(self.client, self.s3_bucket_name, key_exp,
+                                   part_size=MIN_PART_SIZE) as out:
+                out.write(os.urandom(MIN_PART_SIZE + 1))
+                raise RuntimeError('Serialization failed')
+
+        # Tests after method execution
+        objects = self.client.list_objects_v2(Bucket=self.s3_bucket_name)
+        uploads = self.client.list_multipart_uploads(Bucket=self.s3_bucket_name)
+        self.assertNotIn('Contents', objects)
+        self.assertNotIn('Uploads', uploads)
+
+
+
+    def test_write_part_error_raised_early(self):
+        """
+        Tests that a failed part upload is raised by the next write instead
+        of after all parts have been sent
+        """
+        # Test init
+        key_exp = 'failed.bin'
+        calls = []
+        def upload_part_failing(**kwargs):
+            calls.append(kwargs['PartNumber'])
+            raise RuntimeError('Upload failed')
+
+        # Method execution
+        with patch.object(self.client, 'upload_part', side_effect=upload_part_failing):
+            with self.assertRaises(RuntimeError):
+                with S3MultipartWriter(self.client, self.s3_bucket_name, key_exp,
+                                       part_size=MIN_PART_SIZE,
+                                       max_workers=1) as out:
+                    for _ in range(5):
+                        out.write(bytes(MIN_PART_SIZE))
+
+        # Tests after method execution
+        self.assertEqual([1], calls)
+        uploads = self.client.list_multipart_uploads(Bucket=self.s3_bucket_name)
+        self.assertNotIn('Uploads', uploads)
+
+
+    def test_unclosed_writer_no_requests(self):
+        """
+        Tests that a garbage collected writer neither completes nor aborts
+        its upload
+        """
+        # Test init
+        out = S3MultipartWriter(self.client, self.s3_bucket_name, 'unclosed.bin',
+                                part_size=MIN_PART_SIZE)
+        out.write(bytes(MIN_PART_SIZE + 1))
+
+        # Method execution
+        with patch.object(self.client, 'abort_multipart_upload') as abort, \
+                patch.object(self.client, 'complete_multipart_upload') as complete:
+            out.__del__()
+
+        # Tests after method execution
+        self.assertTrue(out.closed)
+        abort.assert_not_called()
+        complete.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
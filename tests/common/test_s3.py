@@ -9,11 +9,15 @@
                 - Section 5 & 6
 """
 import os
+import shutil
+import tempfile
 import unittest
+from unittest.mock import patch
 from io import StringIO, BytesIO
 
 import boto3
 import pandas as pd
+import pyarrow.parquet as pq
 from moto import mock_aws       # mock_s3 is deprecated. Use mock_aws instead
 
 from xetra.common.s3 import S3BucketConnector
@@ -118,6 +122,85 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         self.assertTrue(not list_result)
 
 
+    def test_list_files_in_prefixes_ok(self):
+        """
+        Tests the list_files_in_prefixes method for several prefixes,
+        one of them without any files, listed in parallel
+        """
+        # Expected results
+        prefixes_exp = ['2021-04-15', '2021-04-16', '2021-04-17']
+        keys_exp = {
+            '2021-04-15': ['2021-04-15/test1.csv', '2021-04-15/test2.csv'],
+            '2021-04-16': [],
+            '2021-04-17': ['2021-04-17/test1.csv']
+        }
+
+        # Test init
+        csv_content = """col1,col2
+        valA, valB"""
+        keys = [key for keys in keys_exp.values() for key in keys]
+        keys.append('2021-04-14/test1.csv')
+        for key in keys:
+            self.s3_bucket.put_object(Body=csv_content, Key=key)
+
+        # Method execution
+        with patch.object(self.s3_bucket_conn, '_list_keys',
+                          wraps=self.s3_bucket_conn._list_keys) as list_keys:
+            result = self.s3_bucket_conn.list_files_in_prefixes(prefixes_exp,
+                                                                max_workers=2)
+
+        # Tests after method execution
+        self.assertEqual(keys_exp, result)
+        self.assertEqual(prefixes_exp, list(result))
+        # The prefix without any files isn't listed
+        listed_prefixes = sorted(call.args[0] for call in list_keys.call_args_list)
+        self.assertEqual(['2021-04-15', '2021-04-17'], listed_prefixes)
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(Delete={
+            'Objects': [{'Key': key} for key in keys]
+        })
+
+
+    def test_list_files_in_prefixes_top_level_key(self):
+        """
+        Tests the list_files_in_prefixes method for a prefix that is
+        equal to a top-level key
+        """
+        # Expected results
+        keys_exp = {'report': ['report'], 'xetra/': ['xetra/test1.csv']}
+
+        # Test init
+        for key in ['report', 'xetra/test1.csv']:
+            self.s3_bucket.put_object(Body=b'col1', Key=key)
+
+        # Method execution
+        result = self.s3_bucket_conn.list_files_in_prefixes(['report', 'xetra/'])
+
+        # Tests after method execution
+        self.assertEqual(keys_exp, result)
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(Delete={
+            'Objects': [{'Key': 'report'}, {'Key': 'xetra/test1.csv'}]
+        })
+
+
+    def test_list_files_in_prefixes_empty(self):
+        """
+        Tests the list_files_in_prefixes method for an empty prefix list
+        and for prefixes that don't exist
+        """
+        # Method execution
+        result_empty = self.s3_bucket_conn.list_files_in_prefixes([])
+        result_missing = self.s3_bucket_conn.list_files_in_prefixes(
+            ['no-prefix/'])
+
+        # Tests after method execution
+        self.assertEqual({}, result_empty)
+        self.assertEqual({'no-prefix/': []}, result_missing)
+
+
     def test_read_csv_to_df_ok(self):
         """
         Tests the read_csv_to_df method for reading one .csv file from
@@ -158,6 +241,173 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
             }
         )
 
+    def test_read_csv_to_df_encoding(self):
+        """
+        Tests the read_csv_to_df method for a .csv file that is not
+        encoded in UTF-8
+        """
+        # Expected Results
+        key_exp = 'test_latin1.csv'
+        val_exp = 'Bäckerei'
+
+        # Test init
+        csv_content = f'col1,col2\n{val_exp},val2'.encode('latin-1')
+        self.s3_bucket.put_object(Body=csv_content, Key=key_exp)
+
+        # Method execution
+        df_result = self.s3_bucket_conn.read_csv_to_df(key_exp,
+                                                       encoding='latin-1')
+
+        # Tests after method execution
+        self.assertEqual(val_exp, df_result['col1'][0])
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+    def test_read_csv_to_df_dtype_engines(self):
+        """
+        Tests the read_csv_to_df method with explicit column types for
+        the c and the pyarrow engine
+        """
+        # Expected Results
+        key_exp = 'test_dtypes.csv'
+        dtype_exp = {'col1': 'category', 'col2': 'float32', 'col3': 'int64',
+                     'col4': 'str'}
+
+        # Test init
+        csv_content = 'col1,col2,col3,col4\nA,1.5,3,2021-04-15\nB,2.5,4,2021-04-16'
+        self.s3_bucket.put_object(Body=csv_content, Key=key_exp)
+
+        for engine in ['c', 'pyarrow']:
+            # Method execution
+            df_result = self.s3_bucket_conn.read_csv_to_df(
+                key_exp, dtype=dtype_exp, engine=engine)
+
+            # Tests after method execution
+            self.assertIsInstance(df_result['col1'].dtype, pd.CategoricalDtype)
+            self.assertEqual(['A', 'B'], list(df_result['col1']))
+            self.assertEqual('float32', df_result['col2'].dtype)
+            self.assertEqual('int64', df_result['col3'].dtype)
+            self.assertEqual('2021-04-15', df_result['col4'][0])
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+
+    def test_read_csv_to_df_usecols(self):
+        """
+        Tests the read_csv_to_df method when only some columns are parsed
+        """
+        # Expected Results
+        key_exp = 'test_usecols.csv'
+        usecols_exp = ['col1', 'col3']
+
+        # Test init
+        csv_content = 'col1,col2,col3\nA,1.5,3\nB,2.5,4'
+        self.s3_bucket.put_object(Body=csv_content, Key=key_exp)
+
+        for engine in ['c', 'pyarrow']:
+            # Method execution
+            df_result = self.s3_bucket_conn.read_csv_to_df(
+                key_exp, engine=engine, usecols=usecols_exp)
+
+            # Tests after method execution
+            self.assertEqual(usecols_exp, list(df_result.columns))
+            self.assertEqual(2, df_result.shape[0])
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+
+    def test_read_csv_to_df_wrong_engine(self):
+        """
+        Tests the read_csv_to_df method with a wrong engine parameter
+        """
+        # Expected Results
+        engine_exp = 'wrong_engine'
+        log_exp = f'The CSV engine {engine_exp} is not supported!'
+
+        # Method execution
+        with self.assertLogs() as logm:
+            with self.assertRaises(WrongFormatException):
+                self.s3_bucket_conn.read_csv_to_df('test.csv', engine=engine_exp)
+            # Log test after method execution
+            self.assertIn(log_exp, logm.output[0])
+
+    def test_read_csv_to_df_cache(self):
+        """
+        Tests the read_csv_to_df method with a local cache: the second read
+        must not download the file, a changed file must be read again
+        """
+        # Expected Results
+        key_exp = 'prefix/test_cache.csv'
+        log_exp = f'Cache hit for file {key_exp}'
+
+        # Test init
+        cache_dir = tempfile.mkdtemp()
+        s3_bucket_cached = S3BucketConnector(self.s3_access_key,
+                                             self.s3_secret_key,
+                                             self.s3_endpoint_url,
+                                             self.s3_bucket_name,
+                                             cache_dir=cache_dir)
+        self.s3_bucket.put_object(Body='col1,col2\nval1,val2', Key=key_exp)
+        s3_bucket_cached.list_files_in_prefixes(['prefix/'])
+
+        # Method execution
+        df_first = s3_bucket_cached.read_csv_to_df(key_exp)
+        client = s3_bucket_cached._s3.meta.client  # pylint: disable=protected-access
+        with patch.object(client, 'get_object',
+                          side_effect=AssertionError('downloaded')):
+            with self.assertLogs() as logm:
+                df_second = s3_bucket_cached.read_csv_to_df(key_exp)
+                # Log test after method execution
+                self.assertIn(log_exp, logm.output[1])
+        # New version of the file -> new ETag
+        self.s3_bucket.put_object(Body='col1,col2\nval3,val4', Key=key_exp)
+        s3_bucket_cached.list_files_in_prefixes(['prefix/'])
+        df_third = s3_bucket_cached.read_csv_to_df(key_exp)
+
+        # Tests after method execution
+        pd.testing.assert_frame_equal(df_first, df_second)
+        self.assertEqual('val3', df_third['col1'][0])
+
+        # Cleanup after tests
+        shutil.rmtree(cache_dir)
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+
     def test_write_df_to_s3_empty(self):
         """
         Tests the write_df_to_s3() method with an empty DataFrame as input
@@ -266,6 +516,98 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         )
 
 
+    def test_write_df_to_s3_parquet_options(self):
+        """
+        Tests the write_df_to_s3() method with parquet writer options
+        """
+        # Expected Results
+        key_exp = 'test.parquet'
+        df_exp = pd.DataFrame([['A', '2021-04-17', 1.0], ['A', '2021-04-18', 2.0],
+                               ['B', '2021-04-17', 3.0]],
+                              columns=['isin', 'date', 'price'])
+        codec_exp = 'ZSTD'
+        row_groups_exp = 2
+
+        # Test init
+        df_input = df_exp.iloc[[2, 1, 0]]
+        parquet_options = {
+            'compression': 'zstd',
+            'compression_level': 5,
+            'row_group_size': 2,
+            'use_dictionary': ['isin'],
+            'write_statistics': ['isin', 'date'],
+            'sort_by': ['isin', 'date']
+        }
+
+        # Method execution
+        result = self.s3_bucket_conn.write_df_to_s3(df_input, key_exp, 'parquet',
+                                                    parquet_options)
+
+        # Tests after method execution
+        data = self.s3_bucket.Object(key=key_exp).get().get('Body').read()
+        metadata = pq.ParquetFile(BytesIO(data)).metadata
+        self.assertTrue(result)
+        self.assertTrue(df_exp.equals(pd.read_parquet(BytesIO(data))))
+        self.assertEqual(row_groups_exp, metadata.num_row_groups)
+        self.assertEqual(codec_exp, metadata.row_group(0).column(0).compression)
+        # Statistics only for the listed columns
+        self.assertTrue(metadata.row_group(0).column(0).is_stats_set)
+        self.assertFalse(metadata.row_group(0).column(2).is_stats_set)
+        # Options of the caller are not consumed
+        self.assertIn('sort_by', parquet_options)
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+
+    def test_read_write_metrics(self):
+        """
+        Tests that listing, reading and writing files is recorded in the
+        metrics of the connector
+        """
+        # Expected Results
+        key_exp = 'prefix/test.csv'
+        df_exp = pd.DataFrame([['A', 'B'], ['C', 'D']],
+                              columns=['col1', 'col2'])
+        size_exp = len(df_exp.to_csv(index=False).encode('utf-8'))
+
+        # Method execution
+        self.s3_bucket_conn.write_df_to_s3(df_exp, key_exp, 'csv')
+        self.s3_bucket_conn.list_files_in_prefix('prefix/')
+        self.s3_bucket_conn.read_csv_to_df(key_exp)
+
+        # Tests after method execution
+        stages = self.s3_bucket_conn.metrics.stages()
+        self.assertEqual(['serialize', 'upload', 'list', 'download', 'parse'],
+                         list(stages))
+        self.assertEqual(len(df_exp), stages['serialize']['rows_in'])
+        self.assertEqual(size_exp, stages['serialize']['bytes'])
+        self.assertEqual(size_exp, stages['upload']['bytes'])
+        self.assertEqual(1, stages['upload']['objects'])
+        self.assertEqual(1, stages['list']['objects'])
+        self.assertEqual(size_exp, stages['download']['bytes'])
+        self.assertEqual(len(df_exp), stages['parse']['rows_out'])
+
+        # Cleanup after tests
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+
     def test_write_df_to_s3_wrong_format(self):
         """
         Tests the write_df_to_s3() method with a wrong file format parameter
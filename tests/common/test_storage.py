@@ -0,0 +1,193 @@
+"""
+    File: test_storage.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the LocalFileSystemBackend and
+            MemoryBackend classes.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from xetra.common.storage import StorageBackend, LocalFileSystemBackend, \
+    MemoryBackend
+from xetra.common.custom_exceptions import ObjectNotFoundException, \
+    PreconditionFailedException
+
+
+class StorageBackendTests:
+    """
+    Tests shared by the storage backends (self.storage set by setUp())
+    """
+
+    def test_list_stat_exists(self):
+        """
+        Tests listing the keys of a prefix and the metadata of a key
+        """
+        # Expected results
+        keys_exp = ['2021-04-17/b.csv', '2021-04-17/c.csv']
+
+        # Test init
+        for key in ['2021-04-17/c.csv', '2021-04-17/b.csv', '2021-04-18/a.csv']:
+            self.storage.write(key, b'col1\n1\n')
+
+        # Method execution
+        result = self.storage.list_files_in_prefix('2021-04-17')
+        result_prefixes = self.storage.list_files_in_prefixes(
+            ['2021-04-17', '2021-04-19', '2021-04-18/'], max_workers=2)
+
+        # Tests after method execution
+        self.assertEqual(keys_exp, result)
+        self.assertEqual({'2021-04-17': keys_exp, '2021-04-19': [],
+                          '2021-04-18/': ['2021-04-18/a.csv']}, result_prefixes)
+        self.assertEqual(7, self.storage.stat(keys_exp[0]).size)
+        self.assertTrue(self.storage.exists(keys_exp[0]))
+        self.assertFalse(self.storage.exists('2021-04-17/x.csv'))
+        with self.assertRaises(ObjectNotFoundException):
+            self.storage.stat('2021-04-17/x.csv')
+
+
+    def test_read_write_df(self):
+        """
+        Tests writing and reading CSV and Parquet files
+        """
+        # Expected results
+        df_exp = pd.DataFrame([['A', 1.5], ['B', 2.5]], columns=['col1', 'col2'])
+
+        # Method execution
+        self.storage.write_df_to_s3(df_exp, 'dir/test.csv', 'csv')
+        self.storage.write_df_to_s3(df_exp, 'dir/test.parquet', 'parquet')
+        df_csv = self.storage.read_csv_to_df('dir/test.csv', engine='pyarrow')
+        df_csv_c = self.storage.read_csv_to_df('dir/test.csv', engine='c')
+        df_parquet = self.storage.read_parquet_to_df('dir/test.parquet')
+
+        # Tests after method execution
+        self.assertTrue(df_exp.equals(df_csv))
+        self.assertTrue(df_exp.equals(df_csv_c))
+        self.assertTrue(df_exp.equals(df_parquet))
+        self.assertEqual(b'col1,col2\nA,1.5\nB,2.5\n', self.storage.read('dir/test.csv'))
+        self.assertEqual(self.storage.stat('dir/test.csv').etag,
+                         self.storage.get_etag('dir/test.csv'))
+        with self.assertRaises(ObjectNotFoundException):
+            self.storage.read_parquet_to_df('dir/missing.parquet')
+
+
+    def test_write_conditions(self):
+        """
+        Tests that conditional writes fail if the condition isn't met
+        """
+        # Test init
+        etag = self.storage.write('meta.csv', b'version 1')
+
+        # Method execution & tests after method execution
+        with self.assertRaises(PreconditionFailedException):
+            self.storage.write('meta.csv', b'version 2', if_none_match='*')
+        new_etag = self.storage.write('meta.csv', b'version 2 ', if_match=etag)
+        with self.assertRaises(PreconditionFailedException):
+            self.storage.write('meta.csv', b'version 3', if_match=etag)
+        self.assertNotEqual(etag, new_etag)
+        self.assertEqual(b'version 2 ', self.storage.read('meta.csv'))
+        self.storage.write('new.csv', b'', if_none_match='*')
+        self.assertEqual(b'', self.storage.read('new.csv'))
+
+
+class TestLocalFileSystemBackendMethods(StorageBackendTests, unittest.TestCase):
+    """
+    Testing the LocalFileSystemBackend Class
+    """
+
+    def setUp(self):
+        """
+        Setting up the test environment
+        """
+        self.root_dir = tempfile.mkdtemp()
+        self.storage = LocalFileSystemBackend(self.root_dir)
+
+
+    def tearDown(self):
+        """
+        Tear down the test environment after the unit tests
+        """
+        shutil.rmtree(self.root_dir)
+
+
+    def test_write_no_partial_file(self):
+        """
+        Tests that a failed write leaves neither the file nor a temporary
+        file behind
+        """
+        # Test init
+        def write_failing(out):
+            out.write(b'partial')
+            raise OSError('Serialization failed')
+
+        # Method execution
+        with self.assertRaises(OSError):
+            self.storage.write('dir/test.csv', write_failing)
+
+        # Tests after method execution
+        self.assertEqual([], os.listdir(os.path.join(self.root_dir, 'dir')))
+        with self.assertRaises(ValueError):
+            self.storage.stat('../outside.csv')
+
+
+    def test_read_csv_cache_write_error(self):
+        """
+        Tests that a failed cache write doesn't fail the read
+        """
+        # Test init
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        storage = LocalFileSystemBackend(self.root_dir, cache_dir=cache_dir)
+        storage.write('test.csv', b'col1,col2\nA,1.5\n')
+
+        # Method execution
+        with patch('xetra.common.cache.feather.write_feather',
+                   side_effect=OSError('No space left on device')), \
+                self.assertLogs(level='WARNING'):
+            df_result = storage.read_csv_to_df('test.csv')
+
+        # Tests after method execution
+        self.assertEqual(['A'], list(df_result['col1']))
+        self.assertEqual([], os.listdir(cache_dir))
+
+
+class TestStorageBackendMethods(unittest.TestCase):
+    """
+    Testing the StorageBackend base Class
+    """
+
+    def test_incomplete_backend(self):
+        """
+        Tests that a backend without all primitives can't be created
+        """
+        # Test init
+        class ListOnlyBackend(StorageBackend):
+            def list(self, prefix: str):
+                return []
+
+        # Method execution & tests after method execution
+        with self.assertRaises(TypeError):
+            StorageBackend('base')
+        with self.assertRaises(TypeError):
+            ListOnlyBackend('list-only')
+
+
+class TestMemoryBackendMethods(StorageBackendTests, unittest.TestCase):
+    """
+    Testing the MemoryBackend Class
+    """
+
+    def setUp(self):
+        """
+        Setting up the test environment
+        """
+        self.storage = MemoryBackend()
+
+
+if __name__ == '__main__':
+    unittest.main()
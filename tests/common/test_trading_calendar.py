@@ -0,0 +1,63 @@
+"""
+    File: test_trading_calendar.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the TradingCalendar class.
+"""
+import unittest
+
+import numpy as np
+
+from xetra.common.trading_calendar import TradingCalendar, CALENDAR_DAYS
+
+
+class TestTradingCalendarMethods(unittest.TestCase):
+    """
+    Testing the TradingCalendar Class
+    """
+
+    def setUp(self):
+        """
+        Setting up the test environment
+        """
+        # Good Friday & Easter Monday 2021
+        self.calendar = TradingCalendar(holidays=['2021-04-02', '2021-04-05'])
+
+
+    def test_trading_days(self):
+        """
+        Tests that weekends and holidays aren't trading days
+        """
+        # Expected results
+        days_exp = ['2021-04-01', '2021-04-06', '2021-04-07']
+
+        # Method execution
+        days_result = self.calendar.trading_days('2021-04-01', '2021-04-07')
+
+        # Tests after method execution
+        self.assertEqual(days_exp, days_result.astype(str).tolist())
+        self.assertEqual(7, len(CALENDAR_DAYS.trading_days('2021-04-01', '2021-04-07')))
+        self.assertFalse(self.calendar.is_trading_day('2021-04-03'))
+
+
+    def test_count_and_roll(self):
+        """
+        Tests counting trading days and rolling to trading days
+        """
+        # Test init
+        dates = np.array(['2021-04-02', '2021-04-06'], dtype='datetime64[D]')
+
+        # Method execution & tests after method execution
+        self.assertEqual([0, 1], self.calendar.count(
+            dates, np.array(['2021-04-05', '2021-04-06'], dtype='datetime64[D]')).tolist())
+        self.assertEqual(0, self.calendar.count('2021-04-07', '2021-04-06'))
+        self.assertEqual(['2021-04-06', '2021-04-06'],
+                         self.calendar.roll_forward(dates).astype(str).tolist())
+        self.assertEqual(['2021-04-01', '2021-04-06'],
+                         self.calendar.roll_backward(dates).astype(str).tolist())
+        self.assertEqual(['2021-04-01', '2021-04-01'],
+                         self.calendar.previous_trading_day(dates).astype(str).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+    File: test_write_behind.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the unit tests for the WriteBehindQueue class.
+"""
+import threading
+import unittest
+
+from xetra.common.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueueMethods(unittest.TestCase):
+    """
+    Testing the WriteBehindQueue Class
+    """
+
+    def test_put_in_order(self):
+        """
+        Tests that the jobs run in submission order and are flushed on close
+        """
+        # Expected results
+        result_exp = list(range(20))
+
+        # Method execution
+        result = []
+        with WriteBehindQueue(max_size=3) as loader:
+            for value in result_exp:
+                loader.put(result.append, value)
+
+        # Tests after method execution
+        self.assertEqual(result_exp, result)
+
+
+    def test_put_bounded(self):
+        """
+        Tests that put() blocks while the queue is full
+        """
+        # Test init
+        release = threading.Event()
+        loader = WriteBehindQueue(max_size=1)
+        loader.put(release.wait)    # running
+        loader.put(lambda: None)    # waiting -> queue full
+
+        # Method execution
+        producer = threading.Thread(target=loader.put, args=(lambda: None,))
+        producer.start()
+        producer.join(timeout=0.2)
+
+        # Tests after method execution
+        self.assertTrue(producer.is_alive())
+        release.set()
+        producer.join()
+        loader.close()
+
+
+    def test_put_error(self):
+        """
+        Tests that the jobs after a failed job are skipped and the error is
+        raised to the caller
+        """
+        # Expected results
+        result_exp = ['data 1']
+
+        # Test init
+        def fail():
+            raise OSError('Upload failed')
+
+        # Method execution
+        result = []
+        loader = WriteBehindQueue(max_size=5)
+        loader.put(result.append, 'data 1')
+        loader.put(fail)
+        loader.put(result.append, 'meta 2')
+        with self.assertLogs() as logm:
+            with self.assertRaises(OSError):
+                loader.flush()
+            self.assertIn('Write-behind job failed: Upload failed', logm.output[0])
+        with self.assertRaises(OSError):
+            loader.put(result.append, 'data 3')
+        with self.assertRaises(OSError):
+            loader.close()
+
+        # Tests after method execution
+        self.assertEqual(result_exp, result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+    File: report1_reference.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Reference implementation of report 1 (the former multi-pass
+            transformation) and synthetic source data, shared by the
+            tests and the benchmarks.
+"""
+import pandas as pd
+
+from xetra.transformers.xetra_transformer import XetraSourceConfig, XetraTargetConfig
+from tests.xetra_data import generate_xetra_frame
+
+SOURCE_CONFIG = XetraSourceConfig(
+    src_first_extract_date='2021-04-01',
+    src_columns=['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice',
+                 'EndPrice', 'MinPrice', 'MaxPrice', 'TradedVolume'],
+    src_col_date='Date',
+    src_col_isin='ISIN',
+    src_col_time='Time',
+    src_col_start_price='StartPrice',
+    src_col_min_price='MinPrice',
+    src_col_max_price='MaxPrice',
+    src_col_traded_vol='TradedVolume'
+)
+TARGET_CONFIG = XetraTargetConfig(
+    tgt_col_isin='isin',
+    tgt_col_date='date',
+    tgt_col_op_price='opening_price_eur',
+    tgt_col_clos_price='closing_price_eur',
+    tgt_col_min_price='minimum_price_eur',
+    tgt_col_max_price='maximum_price_eur',
+    tgt_col_dail_trad_vol='daily_traded_volume',
+    tgt_col_ch_prev_clos='change_prev_closing_%',
+    tgt_key='report1/xetra_daily_report1_',
+    tgt_key_date_format='%Y%m%d_%H%M%S',
+    tgt_format='parquet'
+)
+
+
+def transform_report1_legacy(data_frame: pd.DataFrame, extract_date: str,
+                             src_args: XetraSourceConfig = SOURCE_CONFIG,
+                             tgt_args: XetraTargetConfig = TARGET_CONFIG):
+    """
+    The former report 1 transformation: two sorts and transforms for the
+    opening/closing price, a groupby aggregation and a sort + groupby
+    for the previous day's price
+    """
+    data_frame = data_frame.loc[:, src_args.src_columns]
+    data_frame.dropna(inplace=True)
+    keys = [src_args.src_col_isin, src_args.src_col_date]
+    data_frame[tgt_args.tgt_col_op_price] = data_frame \
+        .sort_values(by=[src_args.src_col_time]) \
+            .groupby(keys)[src_args.src_col_start_price].transform('first')
+    data_frame[tgt_args.tgt_col_clos_price] = data_frame \
+        .sort_values(by=[src_args.src_col_time]) \
+            .groupby(keys)[src_args.src_col_start_price].transform('last')
+    data_frame.rename(columns={
+        src_args.src_col_min_price: tgt_args.tgt_col_min_price,
+        src_args.src_col_max_price: tgt_args.tgt_col_max_price,
+        src_args.src_col_traded_vol: tgt_args.tgt_col_dail_trad_vol
+        }, inplace=True)
+    data_frame = data_frame.groupby(keys, as_index=False).agg({
+        tgt_args.tgt_col_op_price: 'min',
+        tgt_args.tgt_col_clos_price: 'min',
+        tgt_args.tgt_col_min_price: 'min',
+        tgt_args.tgt_col_max_price: 'max',
+        tgt_args.tgt_col_dail_trad_vol: 'sum'})
+    data_frame[tgt_args.tgt_col_ch_prev_clos] = data_frame \
+        .sort_values(by=[src_args.src_col_date]) \
+            .groupby([src_args.src_col_isin])[tgt_args.tgt_col_op_price].shift(1)
+    data_frame[tgt_args.tgt_col_ch_prev_clos] = (
+        data_frame[tgt_args.tgt_col_op_price]
+        - data_frame[tgt_args.tgt_col_ch_prev_clos]) \
+        / data_frame[tgt_args.tgt_col_ch_prev_clos] * 100
+    data_frame = data_frame.round(decimals=2)
+    return data_frame[data_frame[src_args.src_col_date] >= extract_date] \
+        .reset_index(drop=True)
+
+
+def generate_source(n_isins: int, days: int, hours: int = 9,
+                    minutes: int = 60, fill_ratio: float = 0.6):
+    """
+    Generates the concatenated source data of several trading days
+
+    Returns:
+        Tuple of (source DataFrame, extract_date)
+    """
+    dates = pd.bdate_range('2021-04-01', periods=days).strftime('%Y-%m-%d')
+    frames = [generate_xetra_frame(date, hour, n_isins=n_isins, minutes=minutes,
+                                   fill_ratio=fill_ratio)
+              for date in dates for hour in range(8, 8 + hours)]
+    return pd.concat(frames, ignore_index=True), dates[1]
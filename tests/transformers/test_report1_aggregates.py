@@ -0,0 +1,186 @@
+"""
+    File: test_report1_aggregates.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains Unit Tests for the Report1Aggregator class
+"""
+import unittest
+
+import pandas as pd
+
+from xetra.common.custom_exceptions import WrongFormatException
+from xetra.transformers.report1_aggregates import Report1Aggregator
+from xetra.transformers.xetra_transformer import XetraSourceConfig, XetraTargetConfig
+from tests.report1_reference import generate_source
+
+
+class TestReport1AggregatorMethods(unittest.TestCase):
+    """
+    Testing the Report1Aggregator Class.
+    """
+
+    def setUp(self):
+        """
+        Setting up the testing environment
+        """
+        conf_dict_src = {
+            'src_first_extract_date': '2021-04-01',
+            'src_columns': ['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice',
+                            'EndPrice', 'MinPrice', 'MaxPrice', 'TradedVolume'],
+            'src_col_date': 'Date',
+            'src_col_isin': 'ISIN',
+            'src_col_time': 'Time',
+            'src_col_start_price': 'StartPrice',
+            'src_col_min_price': 'MinPrice',
+            'src_col_max_price': 'MaxPrice',
+            'src_col_traded_vol': 'TradedVolume'
+        }
+        conf_dict_tgt = {
+            'tgt_col_isin': 'isin',
+            'tgt_col_date': 'date',
+            'tgt_col_op_price': 'opening_price_eur',
+            'tgt_col_clos_price': 'closing_price_eur',
+            'tgt_col_min_price': 'minimum_price_eur',
+            'tgt_col_max_price': 'maximum_price_eur',
+            'tgt_col_dail_trad_vol': 'daily_traded_volume',
+            'tgt_col_ch_prev_clos': 'change_prev_closing_%',
+            'tgt_key': 'report1/xetra_daily_report1_',
+            'tgt_key_date_format': '%Y%m%d_%H%M%S',
+            'tgt_format': 'parquet'
+        }
+        self.source_config = XetraSourceConfig(**conf_dict_src)
+        self.target_config = XetraTargetConfig(**conf_dict_tgt)
+        self.aggregator = Report1Aggregator(self.source_config,
+                                            self.target_config)
+
+        # Source rows (in file order) with two ISINs, unsorted times and
+        # the same time in two different files
+        columns_src = ['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice',
+                       'EndPrice', 'MinPrice', 'MaxPrice', 'TradedVolume']
+        data = [
+            ['AT0000A0E9W5', 'SANT', '2021-04-17', '14:00', 18.27, 21.19, 18.27, 21.34, 455],
+            ['AT0000A0E9W5', 'SANT', '2021-04-17', '13:00', 20.21, 18.27, 18.21, 20.42, 633],
+            ['DE0005140008', 'DBK', '2021-04-17', '09:00', 7.51, 7.61, 7.49, 7.65, 100],
+            ['AT0000A0E9W5', 'SANT', '2021-04-18', '08:00', 19.27, 21.14, 19.27, 21.14, 1220],
+            ['DE0005140008', 'DBK', '2021-04-17', '09:00', 7.55, 7.62, 7.50, 7.66, 50],
+            ['AT0000A0E9W5', 'SANT', '2021-04-18', '07:00', 20.58, 19.27, 18.89, 20.58, 9066],
+            ['DE0005140008', 'DBK', '2021-04-17', '11:00', None, 7.70, 7.60, 7.71, 80]
+        ]
+        self.df_src = pd.DataFrame(data, columns=columns_src)
+        columns_agg = ['ISIN', 'Date', 'opening_price_eur', 'closing_price_eur',
+                       'minimum_price_eur', 'maximum_price_eur',
+                       'daily_traded_volume']
+        data_agg = [
+            ['AT0000A0E9W5', '2021-04-17', 20.21, 18.27, 18.21, 21.34, 1088],
+            ['AT0000A0E9W5', '2021-04-18', 20.58, 19.27, 18.89, 21.14, 10286],
+            ['DE0005140008', '2021-04-17', 7.51, 7.55, 7.49, 7.66, 150]
+        ]
+        self.df_agg = pd.DataFrame(data_agg, columns=columns_agg)
+
+
+    def test_partial_finalize(self):
+        """
+        Tests the partial and finalize methods on all source rows
+        """
+        # Method execution
+        df_result = self.aggregator.finalize(self.aggregator.partial(self.df_src))
+
+        # Test after method execution
+        pd.testing.assert_frame_equal(self.df_agg, df_result)
+
+
+    def test_merge_per_file(self):
+        """
+        Tests that merging the partials of single files gives the same
+        result in any grouping
+        """
+        # Test init
+        partials = [self.aggregator.partial(self.df_src.loc[i:i])
+                    for i in self.df_src.index]
+
+        # Method execution
+        df_flat = self.aggregator.merge(partials)
+        df_left = self.aggregator.merge([self.aggregator.merge(partials[:3]),
+                                         self.aggregator.merge(partials[3:])])
+        df_right = self.aggregator.merge([partials[0],
+                                          self.aggregator.merge(partials[1:])])
+
+        # Test after method execution
+        for df_result in [df_flat, df_left, df_right]:
+            pd.testing.assert_frame_equal(
+                self.df_agg, self.aggregator.finalize(df_result))
+
+
+    def test_merge_empty_partial(self):
+        """
+        Tests merging with a partial of a file without valid rows
+        """
+        # Test init
+        partials = [self.aggregator.partial(self.df_src.loc[6:6]),
+                    self.aggregator.partial(self.df_src.loc[:5])]
+
+        # Method execution
+        df_result = self.aggregator.finalize(self.aggregator.merge(partials))
+
+        # Test after method execution
+        self.assertTrue(partials[0].empty)
+        pd.testing.assert_frame_equal(self.df_agg, df_result)
+
+
+    def test_partial_numpy_engine(self):
+        """
+        Tests that the numpy engine gives the same partial aggregates as the
+        pandas engine, also for categorical source columns
+        """
+        # Test init
+        aggregator_np = Report1Aggregator(
+            self.source_config._replace(src_agg_engine='numpy'),
+            self.target_config)
+        df_categorical = self.df_src.astype({'ISIN': 'category',
+                                             'Date': 'category'})
+        df_synthetic, _ = generate_source(n_isins=40, days=3, hours=2,
+                                          fill_ratio=0.3)
+
+        for df_input in [self.df_src, df_categorical, df_synthetic]:
+            # Method execution
+            df_exp = self.aggregator.partial(df_input)
+            df_result = aggregator_np.partial(df_input)
+
+            # Test after method execution
+            pd.testing.assert_frame_equal(df_exp, df_result)
+
+        # Empty input -> same (empty) result
+        pd.testing.assert_frame_equal(
+            self.aggregator.partial(self.df_src.loc[6:6]),
+            aggregator_np.partial(self.df_src.loc[6:6]))
+
+
+    def test_partial_sharded(self):
+        """
+        Tests that the partial aggregates computed on ISIN shards in a
+        process pool are the same as the ones of a single process
+        """
+        # Test init
+        df_synthetic, _ = generate_source(n_isins=40, days=2, hours=1,
+                                          fill_ratio=0.3)
+        df_exp = self.aggregator.finalize(self.aggregator.partial(df_synthetic))
+
+        # Method execution
+        df_result = self.aggregator.finalize(
+            self.aggregator.partial_sharded(df_synthetic, 3))
+
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+
+
+    def test_wrong_engine(self):
+        """
+        Tests the constructor with a wrong aggregation engine
+        """
+        with self.assertRaises(WrongFormatException):
+            Report1Aggregator(self.source_config._replace(src_agg_engine='wrong'),
+                              self.target_config)
+
+
+if __name__ == '__main__':
+    unittest.main()
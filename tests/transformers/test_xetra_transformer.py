@@ -9,6 +9,9 @@
                 - Section 5 & 6
 """
 import os
+import json
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch
 from io import BytesIO
@@ -19,7 +22,10 @@ from moto import mock_aws
 
 from xetra.common.s3 import S3BucketConnector
 from xetra.common.meta_process import MetaProcess
+from xetra.common.metrics import RunMetrics
+from xetra.common.storage import MemoryBackend
 from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
+from tests.report1_reference import generate_source, transform_report1_legacy
 
 class TestXetraETLMethods(unittest.TestCase):
     """
@@ -157,7 +163,7 @@ class TestXetraETLMethods(unittest.TestCase):
         extract_date_list = []
 
         # Method execution
-        with patch.object(MetaProcess, "return_date_list",
+        with patch.object(MetaProcess, "date_list",
         return_value = [extract_date, extract_date_list]):
             xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
                                 self.meta_key, self.source_config,
@@ -172,8 +178,10 @@ class TestXetraETLMethods(unittest.TestCase):
         """
         Tests the extract method when there ARE files to be extracted
         """
-        # Expected results
-        df_exp = self.df_src.loc[1:8].reset_index(drop=True)
+        # Expected results -> only the columns used by report 1
+        df_exp = self.df_src.loc[1:8, ['ISIN', 'Date', 'Time', 'StartPrice',
+                                       'MinPrice', 'MaxPrice', 'TradedVolume']]\
+            .reset_index(drop=True)
 
         # Test init
         extract_date = '2021-04-17'
@@ -181,7 +189,7 @@ class TestXetraETLMethods(unittest.TestCase):
                              '2021-04-19', '2021-04-20']
 
         # Method execution
-        with patch.object(MetaProcess, "return_date_list",
+        with patch.object(MetaProcess, "date_list",
         return_value=[extract_date, extract_date_list]):
             xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
                          self.meta_key, self.source_config, self.target_config)
@@ -191,6 +199,101 @@ class TestXetraETLMethods(unittest.TestCase):
         self.assertTrue(df_exp.equals(df_result))
 
 
+    def test_extract_files_concurrent(self):
+        """
+        Tests the extract method when the files are read with a thread pool
+        """
+        # Expected results -> only the columns used by report 1
+        df_exp = self.df_src.loc[1:8, ['ISIN', 'Date', 'Time', 'StartPrice',
+                                       'MinPrice', 'MaxPrice', 'TradedVolume']]\
+            .reset_index(drop=True)
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18',
+                             '2021-04-19', '2021-04-20']
+        source_config = self.source_config._replace(src_max_workers=4)
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, source_config, self.target_config)
+            df_result = xetra_etl.extract()
+
+        # Test after method execution -> same order as the serial read
+        self.assertTrue(df_exp.equals(df_result))
+
+
+    def test_extract_transform_dtypes(self):
+        """
+        Tests the extract and transform_report1 methods with explicit
+        source column types for both CSV engines
+        """
+        # Expected results
+        df_exp = self.df_report
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18',
+                             '2021-04-19']
+        src_dtypes = {'ISIN': 'category', 'Mnemonic': 'category',
+                      'Date': 'category', 'Time': 'str',
+                      'StartPrice': 'float64', 'EndPrice': 'float64',
+                      'MinPrice': 'float64', 'MaxPrice': 'float64',
+                      'TradedVolume': 'int64'}
+
+        for engine in ['c', 'pyarrow']:
+            source_config = self.source_config._replace(
+                src_dtypes=src_dtypes, src_csv_engine=engine)
+
+            # Method execution
+            with patch.object(MetaProcess, "date_list",
+            return_value=[extract_date, extract_date_list]):
+                xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                             self.meta_key, source_config, self.target_config)
+                df_extract = xetra_etl.extract()
+                df_result = xetra_etl.transform_report1(df_extract)
+
+            # Test after method execution
+            self.assertIsInstance(df_extract['ISIN'].dtype, pd.CategoricalDtype)
+            self.assertTrue(df_exp.equals(df_result))
+
+
+    def test_extract_transform_inferred_types(self):
+        """
+        Tests the extract and transform_report1 methods without explicit
+        source column types -> both CSV engines infer the same types
+        (Date & Time as strings)
+        """
+        # Expected results
+        df_exp = self.df_report
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18',
+                             '2021-04-19']
+        df_extracts = []
+
+        for engine in ['c', 'pyarrow']:
+            source_config = self.source_config._replace(src_csv_engine=engine)
+
+            # Method execution
+            with patch.object(MetaProcess, "date_list",
+            return_value=[extract_date, extract_date_list]):
+                xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                             self.meta_key, source_config, self.target_config)
+                df_extract = xetra_etl.extract()
+                df_extracts.append(df_extract.copy())
+                df_result = xetra_etl.transform_report1(df_extract)
+
+            # Test after method execution
+            self.assertEqual('2021-04-16', df_extract['Date'][0])
+            self.assertEqual('15:00', df_extract['Time'][0])
+            self.assertTrue(df_exp.equals(df_result))
+        pd.testing.assert_frame_equal(df_extracts[0], df_extracts[1])
+
+
     def test_transform_report1_emptydf(self):
         """
         Tests the transform_report1 method with an empty DataFrame as input
@@ -204,7 +307,7 @@ class TestXetraETLMethods(unittest.TestCase):
         df_input = pd.DataFrame()
 
         # Method execution
-        with patch.object(MetaProcess, "return_date_list",
+        with patch.object(MetaProcess, "date_list",
         return_value=[extract_date, extract_date_list]):
             xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
                          self.meta_key, self.source_config, self.target_config)
@@ -233,7 +336,7 @@ class TestXetraETLMethods(unittest.TestCase):
         df_input = self.df_src.loc[1:8].reset_index(drop=True)
 
         # Method execution
-        with patch.object(MetaProcess, "return_date_list",
+        with patch.object(MetaProcess, "date_list",
         return_value=[extract_date, extract_date_list]):
             xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
                          self.meta_key, self.source_config, self.target_config)
@@ -248,6 +351,91 @@ class TestXetraETLMethods(unittest.TestCase):
         self.assertTrue(df_exp.equals(df_result))
 
 
+    def test_transform_report1_legacy_regression(self):
+        """
+        Tests that transform_report1 gives exactly the same output as the
+        former multi-pass transformation on synthetic data (both engines)
+        """
+        # Test init
+        df_input, extract_date = generate_source(n_isins=60, days=4, hours=2,
+                                                 fill_ratio=0.3)
+        df_exp = transform_report1_legacy(df_input.copy(), extract_date,
+                                          self.source_config, self.target_config)
+
+        for engine in ['pandas', 'numpy']:
+            source_config = self.source_config._replace(src_agg_engine=engine)
+
+            # Method execution
+            with patch.object(MetaProcess, "date_list",
+            return_value=[extract_date, []]):
+                xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                             self.meta_key, source_config, self.target_config)
+                df_result = xetra_etl.transform_report1(df_input.copy())
+
+            # Test after method execution
+            pd.testing.assert_frame_equal(df_exp, df_result)
+
+
+    def test_extract_transform_report1_by_day(self):
+        """
+        Tests the extract_transform_report1_by_day method against the
+        result of extract + transform_report1
+        """
+        # Expected results
+        df_exp = self.df_report
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18',
+                             '2021-04-19', '2021-04-20']
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, self.source_config, self.target_config)
+            with self.assertLogs():
+                df_result = xetra_etl.extract_transform_report1_by_day()
+
+            # ISIN that isn't traded every day -> price carried over
+            self.s3_bucket_src.write_df_to_s3(pd.DataFrame(
+                [['DE0005140008', 'DBK', '2021-04-16', '09:00',
+                  7.51, 7.61, 7.49, 7.65, 100]], columns=self.df_src.columns),
+                '2021-04-16/2021-04-16_BINS_XETR09_DBK.csv', 'csv')
+            self.s3_bucket_src.write_df_to_s3(pd.DataFrame(
+                [['DE0005140008', 'DBK', '2021-04-19', '10:00',
+                  7.91, 7.81, 7.79, 7.95, 200]], columns=self.df_src.columns),
+                '2021-04-19/2021-04-19_BINS_XETR10_DBK.csv', 'csv')
+            df_result_2 = xetra_etl.extract_transform_report1_by_day()
+            df_exp_2 = xetra_etl.transform_report1(xetra_etl.extract())
+
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+        pd.testing.assert_frame_equal(
+            df_exp_2.sort_values(['ISIN', 'Date']).reset_index(drop=True),
+            df_result_2.sort_values(['ISIN', 'Date']).reset_index(drop=True))
+
+
+    def test_extract_transform_report1_by_day_no_file(self):
+        """
+        Tests the extract_transform_report1_by_day method when there are
+        NO files to be extracted
+        """
+        # Test init
+        extract_date = '2200-01-02'
+        extract_date_list = ['2200-01-01', '2200-01-02']
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, self.source_config, self.target_config)
+            df_result = xetra_etl.extract_transform_report1_by_day()
+
+        # Test after method execution
+        self.assertTrue(df_result.empty)
+
+
     def test_load(self):
         """
         Tests the load method
@@ -264,7 +452,7 @@ class TestXetraETLMethods(unittest.TestCase):
         df_input = self.df_report
 
         # Method execution
-        with patch.object(MetaProcess, "return_date_list",
+        with patch.object(MetaProcess, "date_list",
         return_value=[extract_date, extract_date_list]):
             xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
                          self.meta_key, self.source_config, self.target_config)
@@ -297,6 +485,38 @@ class TestXetraETLMethods(unittest.TestCase):
         )
 
 
+    def test_load_partitioned(self):
+        """
+        Tests the load method writing one file per date
+        """
+        # Expected results
+        keys_exp = [
+            'report1/date=2021-04-18/xetra_daily_report1_2021-04-18.parquet',
+            'report1/date=2021-04-19/xetra_daily_report1_2021-04-19.parquet'
+        ]
+
+        # Test init -> 2021-04-17 is not in the meta update list
+        extract_date = '2021-04-18'
+        extract_date_list = ['2021-04-17', '2021-04-18', '2021-04-19']
+        target_config = self.target_config._replace(tgt_partitioned=True)
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, self.source_config, target_config)
+            xetra_etl.load(self.df_report)
+
+        # Test after method execution
+        tgt_files = self.s3_bucket_tgt.list_files_in_prefix('report1/')
+        self.assertEqual(keys_exp, tgt_files)
+        for count, tgt_file in enumerate(tgt_files):
+            data = self.tgt_bucket.Object(key=tgt_file).get().get('Body').read()
+            df_result = pd.read_parquet(BytesIO(data))
+            self.assertTrue(self.df_report.loc[count + 1:count + 1]
+                            .reset_index(drop=True).equals(df_result))
+
+
     def test_etl_report1(self):
         """
         Tests the etl_report1 method
@@ -311,7 +531,7 @@ class TestXetraETLMethods(unittest.TestCase):
                              '2021-04-18', '2021-04-19']
 
         # Method execution
-        with patch.object(MetaProcess, "return_date_list",
+        with patch.object(MetaProcess, "date_list",
         return_value=[extract_date, extract_date_list]):
             xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
                          self.meta_key, self.source_config, self.target_config)
@@ -340,5 +560,328 @@ class TestXetraETLMethods(unittest.TestCase):
         )
 
 
+    def test_etl_report1_write_behind(self):
+        """
+        Tests the etl_report1 method loading each day in the background
+        """
+        # Expected results
+        state_key = 'meta/prev_prices.parquet'
+        meta_exp = ['2021-04-17', '2021-04-18', '2021-04-19', '2021-04-20']
+        keys_exp = [f'report1/date={date}/xetra_daily_report1_{date}.parquet'
+                    for date in meta_exp[:3]]
+
+        # Test init -> 2021-04-20 has no source files
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18',
+                             '2021-04-19', '2021-04-20']
+        source_config = self.source_config._replace(src_streaming=True)
+        target_config = self.target_config._replace(tgt_partitioned=True,
+                                                    tgt_write_behind=1)
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, source_config, target_config, state_key)
+            xetra_etl.etl_report1()
+
+        # Test after method execution
+        tgt_files = self.s3_bucket_tgt.list_files_in_prefix('report1/')
+        self.assertEqual(keys_exp, tgt_files)
+        df_result = pd.concat([self.s3_bucket_tgt.read_parquet_to_df(key)
+                               for key in tgt_files], ignore_index=True)
+        self.assertTrue(self.df_report.equals(df_result))
+
+        df_meta_result = self.s3_bucket_tgt.read_csv_to_df(self.meta_key)
+        self.assertEqual(meta_exp, list(df_meta_result['source_date']))
+        as_of_date, _ = MetaProcess.read_prev_prices(state_key, self.s3_bucket_tgt)
+        self.assertEqual(meta_exp[-1], as_of_date)
+
+
+    def test_etl_report1_run_report(self):
+        """
+        Tests the run report with the metrics per stage of etl_report1
+        """
+        # Expected results
+        stages_exp = {'meta', 'extract', 'list', 'download', 'parse',
+                      'transform', 'load', 'serialize', 'upload'}
+        rows_in_exp = len(self.df_src) - 1
+        rows_out_exp = len(self.df_report)
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17',
+                             '2021-04-18', '2021-04-19']
+        metrics = RunMetrics()
+        self.s3_bucket_src.metrics = metrics
+        self.s3_bucket_tgt.metrics = metrics
+        source_config = self.source_config._replace(src_streaming=True)
+
+        # Method execution
+        with tempfile.TemporaryDirectory() as temp_dir:
+            textfile = os.path.join(temp_dir, 'xetra_report1.prom')
+            target_config = self.target_config._replace(
+                tgt_run_report=True, tgt_metrics_textfile=textfile)
+            with patch.object(MetaProcess, "date_list",
+            return_value=[extract_date, extract_date_list]):
+                xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                             self.meta_key, source_config, target_config,
+                             metrics=metrics)
+                xetra_etl.etl_report1()
+            textfile_exists = os.path.exists(textfile)
+
+        # Test after method execution
+        report_files = self.s3_bucket_tgt.list_files_in_prefix('report1/_run_reports/')
+        self.assertEqual(1, len(report_files))
+        report = json.loads(self.tgt_bucket.Object(key=report_files[0])
+                            .get().get('Body').read())
+        self.assertEqual('succeeded', report['status'])
+        self.assertEqual(['2021-04-17', '2021-04-18', '2021-04-19'], report['dates'])
+        self.assertTrue(stages_exp <= set(report['stages']))
+        self.assertEqual(rows_in_exp, report['stages']['extract']['rows_out'])
+        self.assertEqual(rows_in_exp, report['stages']['transform']['rows_in'])
+        self.assertEqual(rows_out_exp, report['stages']['transform']['rows_out'])
+        self.assertEqual(rows_out_exp, report['stages']['load']['rows_in'])
+        self.assertEqual(rows_in_exp, report['stages']['download']['objects'])
+        self.assertTrue(textfile_exists)
+
+
+    def test_etl_report1_memory_backend(self):
+        """
+        Tests the etl_report1 method on in-memory storages (no S3)
+        """
+        # Expected results
+        meta_exp = ['2021-04-17', '2021-04-18', '2021-04-19']
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17',
+                             '2021-04-18', '2021-04-19']
+        src_storage = MemoryBackend()
+        tgt_storage = MemoryBackend()
+        for key in self.s3_bucket_src.list_files_in_prefix(''):
+            src_storage.write(key, self.s3_bucket_src.read(key))
+        target_config = self.target_config._replace(tgt_partitioned=True)
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(src_storage, tgt_storage, self.meta_key,
+                                 self.source_config, target_config)
+            xetra_etl.etl_report1()
+
+        # Test after method execution
+        tgt_files = tgt_storage.list_files_in_prefix('report1/')
+        df_result = pd.concat([tgt_storage.read_parquet_to_df(key)
+                               for key in tgt_files], ignore_index=True)
+        self.assertTrue(self.df_report.equals(df_result))
+        df_meta_result = tgt_storage.read_csv_to_df(self.meta_key)
+        self.assertEqual(meta_exp, list(df_meta_result['source_date']))
+
+
+    def test_etl_report1_mirror(self):
+        """
+        Tests that etl_report1 syncs the source dates to the mirror and
+        extracts them from it
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17',
+                             '2021-04-18', '2021-04-19']
+
+        # Expected results -> only the files of the dates to extract
+        mirror_keys_exp = [key for date in extract_date_list for key in
+                           self.s3_bucket_src.list_files_in_prefix(date)]
+        source_config = self.source_config._replace(src_streaming=True)
+        target_config = self.target_config._replace(tgt_partitioned=True)
+
+        # Method execution
+        with tempfile.TemporaryDirectory() as mirror_dir, \
+                patch.object(MetaProcess, "date_list",
+                             return_value=[extract_date, extract_date_list]):
+            source_config = source_config._replace(src_mirror_dir=mirror_dir)
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                                 self.meta_key, source_config, target_config)
+            xetra_etl.etl_report1()
+            mirror_keys = xetra_etl.mirror.local.list_files_in_prefix('')
+            # Rerun -> nothing is downloaded again
+            sync_result = xetra_etl.sync_source()
+
+        # Test after method execution
+        tgt_files = self.s3_bucket_tgt.list_files_in_prefix('report1/')
+        df_result = pd.concat([self.s3_bucket_tgt.read_parquet_to_df(key)
+                               for key in tgt_files], ignore_index=True)
+        self.assertTrue(self.df_report.equals(df_result))
+        self.assertEqual(mirror_keys_exp, mirror_keys)
+        self.assertEqual(0, sync_result['downloaded'])
+        self.assertEqual(len(mirror_keys_exp), sync_result['skipped'])
+        self.assertIs(xetra_etl.mirror.local, xetra_etl.s3_bucket_src)
+
+
+    def test_stage_source(self):
+        """
+        Tests that the CSVs of each date are staged into one sorted Parquet
+        file, only once, and again after a source file changed
+        """
+        # Expected results
+        df_exp = pd.DataFrame(
+            [['AT0000A0E9W5', 'SANT', '2021-04-19', '07:00', 23.58, 23.58, 23.58, 23.58, 1035],
+             ['AT0000A0E9W5', 'SANT', '2021-04-19', '08:00', 23.58, 24.22, 23.31, 24.34, 1028],
+             ['AT0000A0E9W5', 'SANT', '2021-04-19', '09:00', 24.22, 22.21, 22.21, 25.01, 1523],
+             ['DE0005190003', 'BMW', '2021-04-19', '08:30', 80.10, 80.20, 80.00, 80.30, 100]],
+            columns=self.df_src.columns)
+
+        # Test init
+        extract_date = '2021-04-18'
+        extract_date_list = ['2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_staging_prefix='staging/')
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                                 self.meta_key, source_config, self.target_config)
+            result = xetra_etl.stage_source()
+            result_rerun = xetra_etl.stage_source()
+            staged_keys = self.s3_bucket_tgt.list_files_in_prefix('staging/2021-04-19/')
+            # A new file of a date -> the date is staged again
+            self.s3_bucket_src.write_df_to_s3(
+                df_exp.loc[3:3], '2021-04-19/2021-04-19_BINS_XETR08b.csv', 'csv')
+            result_changed = xetra_etl.stage_source()
+            restaged_keys = self.s3_bucket_tgt.list_files_in_prefix('staging/2021-04-19/')
+            files_by_date = xetra_etl._list_source_files()
+
+        # Tests after method execution
+        self.assertEqual({'staged': 3, 'skipped': 0}, result)
+        self.assertEqual({'staged': 0, 'skipped': 3}, result_rerun)
+        self.assertEqual({'staged': 1, 'skipped': 2}, result_changed)
+        self.assertEqual(1, len(staged_keys))
+        self.assertEqual(1, len(restaged_keys))
+        self.assertNotEqual(staged_keys, restaged_keys)
+        self.assertEqual(restaged_keys, files_by_date['2021-04-19'])
+        df_result = self.s3_bucket_tgt.read_parquet_to_df(restaged_keys[0])
+        self.assertTrue(df_exp.equals(df_result))
+
+
+    def test_etl_report1_staging(self):
+        """
+        Tests that etl_report1 reads the staging files, in batch & streaming
+        mode, with the same report as from the CSVs. The source is listed
+        once per run and the staged CSVs aren't cached.
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17',
+                             '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_staging_prefix='staging/')
+        target_config = self.target_config._replace(tgt_partitioned=True)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        s3_bucket_src = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                          self.s3_endpoint_url,
+                                          self.s3_bucket_name_src,
+                                          cache_dir=cache_dir)
+
+        for streaming in [False, True]:
+            # Method execution
+            metrics = RunMetrics()
+            with patch.object(MetaProcess, "date_list",
+            return_value=[extract_date, extract_date_list]), \
+                    patch.object(s3_bucket_src, 'list_files_in_prefixes',
+                                 wraps=s3_bucket_src.list_files_in_prefixes) \
+                    as list_source:
+                xetra_etl = XetraETL(
+                    s3_bucket_src, self.s3_bucket_tgt, self.meta_key,
+                    source_config._replace(src_streaming=streaming),
+                    target_config, metrics=metrics)
+                xetra_etl.etl_report1()
+
+            # Tests after method execution
+            tgt_files = self.s3_bucket_tgt.list_files_in_prefix('report1/')
+            df_result = pd.concat([self.s3_bucket_tgt.read_parquet_to_df(key)
+                                   for key in tgt_files], ignore_index=True)
+            self.assertTrue(self.df_report.equals(df_result))
+            # One staging file per date with source files
+            self.assertEqual(4, len(self.s3_bucket_tgt.list_files_in_prefix('staging/')))
+            self.assertEqual(4, metrics.stages()['extract']['objects'])
+            self.assertEqual(1, list_source.call_count)
+            self.assertEqual([], os.listdir(cache_dir))
+
+
+    def test_etl_report1_write_behind_error(self):
+        """
+        Tests that a date isn't committed to the meta file if writing its
+        data fails
+        """
+        # Expected results
+        meta_exp = ['2021-04-17']
+
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18',
+                             '2021-04-19']
+        source_config = self.source_config._replace(src_streaming=True)
+        target_config = self.target_config._replace(tgt_partitioned=True,
+                                                    tgt_write_behind=2)
+        write_df_to_s3 = self.s3_bucket_tgt.write_df_to_s3
+
+        def write_failing(data_frame, key, *args, **kwargs):
+            if '2021-04-18' in key:
+                raise OSError('Upload failed')
+            return write_df_to_s3(data_frame, key, *args, **kwargs)
+
+        # Method execution
+        with patch.object(MetaProcess, "date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, source_config, target_config)
+            with patch.object(self.s3_bucket_tgt, 'write_df_to_s3',
+                              side_effect=write_failing):
+                with self.assertRaises(OSError):
+                    xetra_etl.etl_report1()
+
+        # Test after method execution
+        df_meta_result = self.s3_bucket_tgt.read_csv_to_df(self.meta_key)
+        self.assertEqual(meta_exp, list(df_meta_result['source_date']))
+
+
+    def test_etl_report1_prev_prices_state(self):
+        """
+        Tests that the prices persisted by a run are used by the next run
+        instead of extracting the day before its extract date
+        """
+        # Expected results
+        state_key = 'meta/prev_prices.parquet'
+        df_exp = self.df_report.loc[2:2].reset_index(drop=True)
+
+        # Test init
+        runs = [
+            ['2021-04-17', ['2021-04-16', '2021-04-17', '2021-04-18']],
+            ['2021-04-19', ['2021-04-18', '2021-04-19']]
+        ]
+
+        # Method execution -> first run without a persisted state
+        with patch.object(MetaProcess, "date_list", return_value=runs[0]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, self.source_config, self.target_config,
+                         state_key)
+            xetra_etl.etl_report1()
+        as_of_date, prev_prices = MetaProcess.read_prev_prices(
+            state_key, self.s3_bucket_tgt)
+
+        # Method execution -> second run using the persisted state
+        with patch.object(MetaProcess, "date_list", return_value=runs[1]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_tgt,
+                         self.meta_key, self.source_config, self.target_config,
+                         state_key)
+            df_result = xetra_etl.transform_report1(xetra_etl.extract())
+
+        # Test after method execution
+        self.assertEqual('2021-04-18', as_of_date)
+        self.assertEqual({'AT0000A0E9W5': 20.58}, prev_prices.to_dict())
+        self.assertEqual(['2021-04-19'], xetra_etl.extract_date_list)
+        self.assertTrue(df_exp.equals(df_result))
+
+
 if __name__ == '__main__':
     unittest.main()
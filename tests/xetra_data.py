@@ -0,0 +1,93 @@
+"""
+    File: xetra_data.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Generates synthetic source files in the shape of the
+            Deutsche Boerse Xetra data set for the tests and benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Column layout of the original Xetra source files
+XETRA_COLUMNS = ['ISIN', 'Mnemonic', 'SecurityDesc', 'SecurityType',
+                 'Currency', 'SecurityID', 'Date', 'Time', 'StartPrice',
+                 'MaxPrice', 'MinPrice', 'EndPrice', 'NumberOfTrades',
+                 'TradedVolume']
+
+
+def generate_xetra_frame(date: str, hour: int, n_isins: int = 2000,
+                         minutes: int = 60, fill_ratio: float = 0.6,
+                         seed: int = 0):
+    """
+    Generates the data of one hourly Xetra source file
+
+    Parameters:
+        date (str): Trading date (YYYY-MM-DD)
+        hour (int): Trading hour of the file
+        n_isins (int): Number of instruments
+        minutes (int): Number of trading minutes in the file
+        fill_ratio (float): Share of instruments traded in a minute
+        seed (int): Seed of the random number generator
+
+    Returns:
+        data_frame: Pandas DataFrame with the Xetra source columns
+    """
+    rng = np.random.default_rng([seed, hour, int(date.replace('-', ''))])
+
+    # Picking the traded instruments for each minute
+    traded = rng.random((minutes, n_isins)) < fill_ratio
+    minute_idx, isin_idx = np.nonzero(traded)
+    n_rows = len(isin_idx)
+
+    # Prices: random walk around a base price per instrument
+    base = 5 + (np.arange(n_isins) * 7919 % 500)
+    start = base[isin_idx] * (1 + rng.normal(0, 0.01, n_rows))
+    end = start * (1 + rng.normal(0, 0.002, n_rows))
+    high = np.maximum(start, end) * (1 + rng.random(n_rows) * 0.002)
+    low = np.minimum(start, end) * (1 - rng.random(n_rows) * 0.002)
+
+    isins = np.array([f'DE000{i:07d}' for i in range(n_isins)])
+    mnemonics = np.array([f'X{i:04d}' for i in range(n_isins)])
+    times = np.array([f'{hour:02d}:{m:02d}' for m in range(minutes)])
+
+    return pd.DataFrame({
+        'ISIN': isins[isin_idx],
+        'Mnemonic': mnemonics[isin_idx],
+        'SecurityDesc': 'SYNTHETIC STOCK',
+        'SecurityType': 'Common stock',
+        'Currency': 'EUR',
+        'SecurityID': 2500000 + isin_idx,
+        'Date': date,
+        'Time': times[minute_idx],
+        'StartPrice': start.round(2),
+        'MaxPrice': high.round(2),
+        'MinPrice': low.round(2),
+        'EndPrice': end.round(2),
+        'NumberOfTrades': rng.integers(1, 50, n_rows),
+        'TradedVolume': rng.integers(1, 5000, n_rows)
+    }, columns=XETRA_COLUMNS)
+
+
+def generate_xetra_csv(date: str, hour: int, **kwargs):
+    """
+    Generates one hourly Xetra source file as CSV bytes
+
+    Parameters:
+        date (str): Trading date (YYYY-MM-DD)
+        hour (int): Trading hour of the file
+        kwargs: Passed on to generate_xetra_frame()
+
+    Returns:
+        CSV content as bytes
+    """
+    return generate_xetra_frame(date, hour, **kwargs) \
+        .to_csv(index=False).encode('utf-8')
+
+
+def xetra_key(date: str, hour: int):
+    """
+    Returns the source key of an hourly Xetra file, e.g.
+    2021-04-15/2021-04-15_BINS_XETR08.csv
+    """
+    return f'{date}/{date}_BINS_XETR{hour:02d}.csv'
@@ -0,0 +1,181 @@
+"""
+    File: cache.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the LocalFileCache class, an on-disk LRU cache of
+            parsed DataFrames in Arrow IPC (feather) format.
+"""
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+
+import pandas as pd
+from pyarrow import feather
+
+
+class LocalFileCache:
+    """
+    On-disk cache of DataFrames, addressed by a hash of the given key parts
+    (e.g. bucket, key, ETag and read options).
+
+    Entries are stored as Arrow IPC files, so a hit is read memory-mapped
+    without any parsing. The least recently used entries are evicted when
+    the total size exceeds max_bytes. The total is kept as a running sum,
+    the directory is only scanned at start and when it exceeds max_bytes.
+    Unreadable entries (e.g. truncated by a killed process) are misses
+    and removed.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Constructor for LocalFileCache
+
+        Parameters:
+            cache_dir (str): Directory of the cache files
+            max_bytes (int): Max. total size of the cache files
+        """
+        self._logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+
+    def path(self, *key_parts):
+        """
+        Returns the cache file path for the key parts
+
+        Parameters:
+            key_parts: Values identifying the cached content
+        """
+        digest = hashlib.sha256(
+            '\0'.join(str(part) for part in key_parts).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.arrow')
+
+
+    def get(self, *key_parts):
+        """
+        Reads a DataFrame from the cache
+
+        Parameters:
+            key_parts: Values identifying the cached content
+
+        Returns:
+            data_frame: Cached Pandas DataFrame, None if not cached
+        """
+        path = self.path(*key_parts)
+        try:
+            data_frame = feather.read_feather(path, memory_map=True)
+            # Updating the modification time -> used as last access for LRU
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as error:  # pylint: disable=broad-except
+            # Corrupt entry -> a miss, the file is parsed and cached again
+            self._logger.warning('Removing unreadable cache file %s: %s',
+                                 path, error)
+            self._remove(path)
+            return None
+        return data_frame
+
+
+    def put(self, data_frame: pd.DataFrame, *key_parts):
+        """
+        Writes a DataFrame to the cache and evicts the least recently used
+        entries if the cache is too large. Errors (e.g. a full disk) are
+        logged, as the cache is optional.
+
+        Parameters:
+            data_frame (pd.DataFrame): DataFrame to be cached
+            key_parts: Values identifying the cached content
+
+        Returns:
+            True if the DataFrame has been cached
+        """
+        path = self.path(*key_parts)
+        try:
+            if self._write(data_frame, path):
+                self.evict()
+        except Exception as error:  # pylint: disable=broad-except
+            self._logger.warning('Caching file %s failed: %s', path, error)
+            return False
+        return True
+
+
+    def _write(self, data_frame: pd.DataFrame, path: str):
+        """
+        Helper function for self.put()
+
+        Returns:
+            True if the total size of the cache exceeds max_bytes
+        """
+        # Writing to a temporary file first -> readers never see partial files
+        file_desc, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(file_desc)
+        try:
+            feather.write_feather(data_frame, tmp_path, compression='uncompressed')
+            size = os.path.getsize(tmp_path)
+            with self._lock:
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                self._total_bytes += size - replaced
+                exceeded = self._total_bytes > self.max_bytes
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return exceeded
+
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the total size of
+        the cache is not greater than max_bytes
+        """
+        with self._lock:
+            # Scanning -> also counts the entries of other processes
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._logger.info('Evicting cache file %s', path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._total_bytes = total
+
+
+    def _entries(self):
+        """
+        Returns a list of (modification time, size, path) of the entries
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.arrow'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+
+    def _remove(self, path: str):
+        """
+        Removes an entry and subtracts its size from the running total
+        """
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            self._total_bytes -= size
@@ -13,12 +13,20 @@ from enum import Enum
 
 class S3FileTypes(Enum):
     """
-    Supported file types for S3BucketConnector
+    Supported file types for the storage backends (e.g. S3BucketConnector)
     """
     CSV = 'csv'
     PARQUET = 'parquet'
 
 
+class CsvEngines(Enum):
+    """
+    Supported CSV parsers for StorageBackend.read_csv_to_df()
+    """
+    C = 'c'
+    PYARROW = 'pyarrow'
+
+
 class MetaProcessFormat(Enum):
     """
     Formation for MetaProcess class
@@ -28,3 +36,33 @@ class MetaProcessFormat(Enum):
     META_SOURCE_DATE_COL = 'source_date'
     META_PROCESS_COL = 'datetime_of_processing'
     META_FILE_FORMAT = 'csv'
+    # Compact format: one row per range of consecutive processed dates
+    META_RANGE_START_COL = 'start_date'
+    META_RANGE_END_COL = 'end_date'
+    META_RANGES_FILE_FORMAT = 'parquet'
+
+
+class PrevPriceStateFormat(Enum):
+    """
+    Formation of the persisted previous prices per ISIN
+    """
+    STATE_ISIN_COL = 'isin'
+    STATE_PRICE_COL = 'prev_price'
+    STATE_AS_OF_COL = 'as_of_date'
+    STATE_FILE_FORMAT = 'parquet'
+
+
+class AggEngines(Enum):
+    """
+    Supported engines for the report 1 aggregation
+    """
+    PANDAS = 'pandas'
+    NUMPY = 'numpy'
+
+
+class Report1PartialFormat(Enum):
+    """
+    Helper columns of the partial aggregates for report 1
+    """
+    FIRST_TIME_COL = 'first_time'
+    LAST_TIME_COL = 'last_time'
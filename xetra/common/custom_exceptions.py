@@ -23,3 +23,29 @@ class WrongMetaFileException(Exception):
     
     Exception raised when the meta file is not in the correct format.
     """
+
+
+class MetaFileConflictException(Exception):
+    """
+    MetaFileConflictException Class
+
+    Exception raised when the meta file was modified by another process
+    since it was read.
+    """
+
+
+class ObjectNotFoundException(Exception):
+    """
+    ObjectNotFoundException Class
+
+    Exception raised when a key doesn't exist in a storage backend.
+    """
+
+
+class PreconditionFailedException(Exception):
+    """
+    PreconditionFailedException Class
+
+    Exception raised when a conditional write (if_match / if_none_match)
+    is rejected by a storage backend.
+    """
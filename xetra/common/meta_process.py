@@ -11,58 +11,373 @@
 import collections
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 
-from xetra.common.s3 import S3BucketConnector
-from xetra.common.constants import MetaProcessFormat
-from xetra.common.custom_exceptions import WrongMetaFileException
+from xetra.common.storage import StorageBackend
+from xetra.common.trading_calendar import TradingCalendar, CALENDAR_DAYS
+from xetra.common.constants import MetaProcessFormat, PrevPriceStateFormat
+from xetra.common.custom_exceptions import WrongMetaFileException, \
+    MetaFileConflictException, WrongFormatException, ObjectNotFoundException, \
+    PreconditionFailedException
+
+META_COLUMNS = [MetaProcessFormat.META_SOURCE_DATE_COL.value,
+                MetaProcessFormat.META_PROCESS_COL.value]
+RANGE_COLUMNS = [MetaProcessFormat.META_RANGE_START_COL.value,
+                 MetaProcessFormat.META_RANGE_END_COL.value,
+                 MetaProcessFormat.META_PROCESS_COL.value]
+
+
+def _to_date(value):
+    """
+    Converts a 'YYYY-MM-DD' string (or date) into a date
+    """
+    if isinstance(value, str):
+        return datetime.strptime(value, MetaProcessFormat.META_DATE_FORMAT.value).date()
+    return value
+
+
+def _ranges_to_arrays(ranges: list):
+    """
+    Returns the starts and ends of date ranges as datetime64[D] arrays
+    """
+    starts = np.array([rng[0] for rng in ranges], dtype='datetime64[D]')
+    ends = np.array([rng[1] for rng in ranges], dtype='datetime64[D]')
+    return starts, ends
+
+
+def _dates_to_ranges(dates: np.ndarray, processed: np.ndarray,
+                     calendar: TradingCalendar = CALENDAR_DAYS):
+    """
+    Collapses (unsorted, possibly duplicated) dates into ranges of
+    consecutive trading days, keeping the latest datetime of processing
+    per range
+
+    Parameters:
+        dates (np.ndarray): datetime64[D] dates
+        processed (np.ndarray): Datetime of processing per date
+        calendar (TradingCalendar): Trading calendar
+
+    Returns:
+        ranges (list): Sorted, non-overlapping [start, end, processed] ranges
+    """
+    if len(dates) == 0:
+        return []
+    order = np.argsort(dates, kind='stable')
+    dates = dates[order]
+    # A new range starts after every step over a (missing) trading day
+    range_ids = np.concatenate(
+        [[0], np.cumsum(calendar.count(dates[:-1] + 1, dates[1:] - 1) > 0)])
+    starts = dates[np.concatenate([[0], np.flatnonzero(np.diff(range_ids)) + 1])]
+    ends = dates[np.concatenate([np.flatnonzero(np.diff(range_ids)),
+                                 [len(dates) - 1]])]
+    processed = pd.Series(processed[order]).groupby(range_ids).max()
+    return [[start, end, proc] for start, end, proc in zip(
+        starts.astype(object), ends.astype(object), processed.tolist())]
+
+
+def _merge_ranges(ranges: list, calendar: TradingCalendar = None):
+    """
+    Merges overlapping and adjacent [start, end, datetime of processing]
+    date ranges, keeping the latest datetime of processing. Ranges are
+    adjacent if there is no trading day in between.
+
+    Returns:
+        ranges (list): Sorted, non-overlapping date ranges
+    """
+    calendar = calendar or CALENDAR_DAYS
+    merged = []
+    for start, end, processed in sorted(ranges, key=lambda rng: rng[0]):
+        if merged and (start <= merged[-1][1] + timedelta(days=1) or not calendar.count(
+                merged[-1][1] + timedelta(days=1), start - timedelta(days=1))):
+            merged[-1][1] = max(merged[-1][1], end)
+            merged[-1][2] = max(merged[-1][2], processed)
+        else:
+            merged.append([start, end, processed])
+    return merged
 
 class MetaProcess:
     """
     Class for working with the meta file.
+
+    An instance loads the meta file once, keeps the processed dates in
+    memory and writes all added dates back with one request per commit().
+    The write is conditional on the ETag of the loaded version, so a meta
+    file modified by another run in between is detected instead of
+    overwritten.
+
+    Meta file formats:
+        csv: One row per processed date (appended on every update)
+        parquet: One row per range of consecutive processed dates, so the
+                 file size depends on the gaps, not on the history
     """
 
-    @staticmethod   # No need to include 'self' as a parameter
-    def update_meta_file(extract_date_list: list, meta_key: str,
-                         s3_bucket_meta: S3BucketConnector):
+    def __init__(self, meta_key: str, s3_bucket_meta: StorageBackend,
+                 meta_format: str = MetaProcessFormat.META_FILE_FORMAT.value,
+                 calendar: TradingCalendar = None):
         """
-        Updates the meta file with the latest extract dates.
+        Constructor for MetaProcess
 
         Parameters:
-            extract_date_list (list): List of extract dates
             meta_key (str): Key to the meta file
-            s3_bucket_meta (S3BucketConnector): S3BucketConnector object
+            s3_bucket_meta (StorageBackend): Storage of the meta files
+            meta_format (str): Format of the meta file ('csv' or 'parquet')
+            calendar (TradingCalendar): Only trading days are planned and
+                                        tracked (None -> every day)
+        """
+        if meta_format not in (MetaProcessFormat.META_FILE_FORMAT.value,
+                               MetaProcessFormat.META_RANGES_FILE_FORMAT.value):
+            raise WrongFormatException(
+                f'The meta file format {meta_format} is not supported!')
+        self.meta_key = meta_key
+        self.s3_bucket_meta = s3_bucket_meta
+        self.meta_format = meta_format
+        self.calendar = calendar or CALENDAR_DAYS
+        # Sorted, non-overlapping [start, end, datetime of processing],
+        # all trading days from start to end are processed
+        self.processed_ranges = []
+        self._df_meta = None
+        self._etag = None
+        self._loaded = False
+
+
+    def load(self):
+        """
+        Reads the meta file (once)
+
+        Returns:
+            self (MetaProcess): The loaded MetaProcess
+        """
+        if self._loaded:
+            return self
+        self._loaded = True
+        try:
+            if self.meta_format == MetaProcessFormat.META_FILE_FORMAT.value:
+                df_meta = self.s3_bucket_meta.read_csv_to_df(self.meta_key)
+            else:
+                df_meta = self.s3_bucket_meta.read_parquet_to_df(self.meta_key)
+        except ObjectNotFoundException:
+            # No meta file exists -> nothing has been processed yet
+            self._df_meta = pd.DataFrame(columns=META_COLUMNS)
+            return self
+
+        if self.meta_format == MetaProcessFormat.META_FILE_FORMAT.value:
+            if collections.Counter(df_meta.columns) != collections.Counter(META_COLUMNS):
+                raise WrongMetaFileException
+            self._df_meta = df_meta
+            self.processed_ranges = _dates_to_ranges(
+                pd.to_datetime(df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value])
+                .to_numpy(dtype='datetime64[D]'),
+                df_meta[MetaProcessFormat.META_PROCESS_COL.value].to_numpy(),
+                self.calendar)
+        else:
+            if collections.Counter(df_meta.columns) != collections.Counter(RANGE_COLUMNS):
+                raise WrongMetaFileException
+            self.processed_ranges = _merge_ranges([
+                [_to_date(start), _to_date(end), processed] for start, end, processed
+                in df_meta.loc[:, RANGE_COLUMNS].itertuples(index=False)],
+                self.calendar)
+        self._etag = self.s3_bucket_meta.get_etag(self.meta_key)
+        return self
+
+
+    @property
+    def exists(self):
+        """
+        True if the loaded meta file exists
+        """
+        return self.load()._etag is not None
+
+
+    @property
+    def processed_dates(self):
+        """
+        Set of all processed (trading) dates
+        """
+        return {day for start, end, _ in self.load().processed_ranges
+                for day in self.calendar.trading_days(start, end).astype(object)}
+
+
+    def missing_ranges(self, first_date: str, last_date: str = None):
+        """
+        Returns the ranges of trading days that aren't processed
+        (vectorized, O(number of processed ranges))
+
+        Parameters:
+            first_date (str): First date to be checked
+            last_date (str): Last date to be checked (None -> today)
+
+        Returns:
+            missing_ranges (list): [(start, end)] of the missing dates
+        """
+        first = np.datetime64(first_date, 'D')
+        last = np.datetime64(last_date or datetime.today().date(), 'D')
+        starts, ends = _ranges_to_arrays(self.load().processed_ranges)
+
+        # The gaps are the complement of the sorted, non-overlapping ranges
+        gap_starts = np.maximum(np.concatenate([[first], ends + 1]), first)
+        gap_ends = np.minimum(np.concatenate([starts - 1, [last]]), last)
+        # Gaps are trimmed to trading days, gaps without any are dropped
+        gap_starts = self.calendar.roll_forward(gap_starts)
+        gap_ends = self.calendar.roll_backward(gap_ends)
+        keep = gap_starts <= gap_ends
+        return list(zip(gap_starts[keep].astype(str).tolist(),
+                        gap_ends[keep].astype(str).tolist()))
+
+
+    def _date_range(self, start: np.datetime64, end: np.datetime64):
+        """
+        Returns all trading days from start to end (inclusive) as
+        'YYYY-MM-DD' strings
+        """
+        return self.calendar.trading_days(start, end).astype(str).tolist()
+
+
+    def date_list(self, first_date: str):
+        """
+        Creating a list of (trading) dates based on the input first_date
+        and the processed dates of the meta file.
+
+        Parameters:
+            first_date (str): First date of the extract
+
+        Returns:
+            min_date (str): First date of the extract
+            return_date_list (list): List of all dates from the trading day
+                                     before min_date to today
         """
+        start = self.calendar.previous_trading_day(first_date)
+        today = np.datetime64(datetime.today().date(), 'D')
+
+        if not self.exists:
+            # No meta file found -> Create date list from (first_date - 1) to today
+            return first_date, self._date_range(start, today)
+
+        # Determining the earliest date that should be extracted
+        missing = self.missing_ranges(first_date, str(today))
+
+        if missing:
+            # Creating a list of dates from min_date until today
+            return_min_date = missing[0][0]
+            return_dates = self._date_range(
+                self.calendar.previous_trading_day(return_min_date), today)
+        else:
+            # Setting values for the earliest date and the list of dates
+            return_dates = []
+            return_min_date = datetime(2200, 1, 1).date()\
+                .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+
+        # Returning the earliest date and the list of dates to be processed
+        return return_min_date, return_dates
+
+
+    def add_dates(self, extract_date_list: list):
+        """
+        Marks dates as processed (in memory, see commit())
+
+        Parameters:
+            extract_date_list (list): List of extract dates
+        """
+        self.load()
         # Create an empty DataFrame using the meta file column names
-        df_new = pd.DataFrame(columns=[
-            MetaProcessFormat.META_SOURCE_DATE_COL.value,
-            MetaProcessFormat.META_PROCESS_COL.value])
+        df_new = pd.DataFrame(columns=META_COLUMNS)
 
         # Filling the date column with extract_date_list
         df_new[MetaProcessFormat.META_SOURCE_DATE_COL.value] = extract_date_list
 
         # Filling the processed column
-        df_new[MetaProcessFormat.META_PROCESS_COL.value] = datetime.today() \
+        processed = datetime.today() \
                 .strftime(MetaProcessFormat.META_PROCESS_DATE_FORMAT.value)
-        try:
-            # If meta file exists -> union DataFrame of old and new meta data is created
-            df_old = s3_bucket_meta.read_csv_to_df(meta_key)
-            if collections.Counter(df_old.columns) != collections.Counter(df_new.columns):
-                raise WrongMetaFileException
+        df_new[MetaProcessFormat.META_PROCESS_COL.value] = processed
 
-            df_all = pd.concat([df_old, df_new])
-        except s3_bucket_meta.session.client('s3').exceptions.NoSuchKey:
-            # No meta file exists -> only teh new data is used
-            df_all = df_new
+        if self.meta_format == MetaProcessFormat.META_FILE_FORMAT.value:
+            self._df_meta = pd.concat([self._df_meta, df_new]) \
+                if not self._df_meta.empty else df_new
+        self.processed_ranges = _merge_ranges(self.processed_ranges + [
+            [_to_date(extract_date), _to_date(extract_date), processed]
+            for extract_date in extract_date_list], self.calendar)
 
-        # Writing to S3
-        s3_bucket_meta.write_df_to_s3(df_all, meta_key,
-                                      MetaProcessFormat.META_FILE_FORMAT.value)
+
+    def to_ranges_df(self):
+        """
+        Returns the processed date ranges in the compact meta file format
+        """
+        return pd.DataFrame(
+            [[start.strftime(MetaProcessFormat.META_DATE_FORMAT.value),
+              end.strftime(MetaProcessFormat.META_DATE_FORMAT.value), processed]
+             for start, end, processed in self.load().processed_ranges],
+            columns=RANGE_COLUMNS)
+
+
+    def commit(self):
+        """
+        Writes the meta file, if it wasn't modified since it was loaded
+        """
+        self.load()
+        if self.meta_format == MetaProcessFormat.META_FILE_FORMAT.value:
+            df_meta = self._df_meta
+        else:
+            df_meta = self.to_ranges_df()
+        try:
+            # Only overwrite the loaded version / don't overwrite a file
+            # created in the meantime
+            self.s3_bucket_meta.write_df_to_s3(
+                df_meta, self.meta_key, self.meta_format,
+                if_match=self._etag, if_none_match=None if self._etag else '*')
+        except PreconditionFailedException as error:
+            raise MetaFileConflictException(
+                f'The meta file {self.meta_key} was modified by another process!'
+            ) from error
+        self._etag = self.s3_bucket_meta.get_etag(self.meta_key) or self._etag
         return True
 
 
     @staticmethod
-    def return_date_list(first_date: str, meta_key: str, s3_bucket_meta: S3BucketConnector):
+    def compact_meta_file(meta_key: str, ranges_key: str,
+                          s3_bucket_meta: StorageBackend,
+                          calendar: TradingCalendar = None):
+        """
+        Collapses a (csv) meta file with one row per date into the compact
+        format with one row per range of consecutive processed dates.
+
+        Parameters:
+            meta_key (str): Key to the meta file (one row per date)
+            ranges_key (str): Key to the compact meta file
+            s3_bucket_meta (StorageBackend): Storage of the meta files
+            calendar (TradingCalendar): Ranges span non-trading days
+                                        (None -> every day)
+
+        Returns:
+            ranges (int): Number of processed date ranges
+        """
+        meta = MetaProcess(meta_key, s3_bucket_meta, calendar=calendar).load()
+        compact = MetaProcess(ranges_key, s3_bucket_meta,
+                              MetaProcessFormat.META_RANGES_FILE_FORMAT.value,
+                              calendar).load()
+        compact.processed_ranges = _merge_ranges(compact.processed_ranges +
+                                                 meta.processed_ranges, calendar)
+        compact.commit()
+        return len(compact.processed_ranges)
+
+
+    @staticmethod   # No need to include 'self' as a parameter
+    def update_meta_file(extract_date_list: list, meta_key: str,
+                         s3_bucket_meta: StorageBackend):
+        """
+        Updates the meta file with the latest extract dates.
+
+        Parameters:
+            extract_date_list (list): List of extract dates
+            meta_key (str): Key to the meta file
+            s3_bucket_meta (StorageBackend): Storage of the meta files
+        """
+        meta = MetaProcess(meta_key, s3_bucket_meta)
+        meta.add_dates(extract_date_list)
+        return meta.commit()
+
+
+    @staticmethod
+    def return_date_list(first_date: str, meta_key: str, s3_bucket_meta: StorageBackend):
         """
         Creating a list of dates based on the input first_date and the 
         already processsed dates in the meta file.
@@ -70,56 +385,65 @@ class MetaProcess:
         Parameters:
             first_date (str): First date of the extract
             meta_key (str): Key to the meta file
-            s3_bucket_meta (S3BucketConnector): S3BucketConnector object
+            s3_bucket_meta (StorageBackend): Storage of the meta files
 
         Returns:
             min_date (str): First date of the extract
             return_date_list (list): List of all dates from min_date to today
         """
-        start = datetime.strptime(first_date,
-                                  MetaProcessFormat.META_DATE_FORMAT.value) \
-                                    .date() - timedelta(days=1)
-        today = datetime.today().date()
-        s3_client = s3_bucket_meta.session.client('s3')
+        return MetaProcess(meta_key, s3_bucket_meta).date_list(first_date)
+
+
+    @staticmethod
+    def write_prev_prices(prev_prices: pd.Series, as_of_date: str,
+                          state_key: str, s3_bucket_meta: StorageBackend):
+        """
+        Persists the latest price per ISIN, so the next run doesn't need
+        to extract the day before its first extract date
 
+        Parameters:
+            prev_prices (Series): ISIN -> latest price up to as_of_date
+            as_of_date (str): Last date covered by prev_prices
+            state_key (str): Key to the state file
+            s3_bucket_meta (StorageBackend): Storage of the meta files
+        """
+        df_state = pd.DataFrame({
+            PrevPriceStateFormat.STATE_ISIN_COL.value: prev_prices.index,
+            PrevPriceStateFormat.STATE_PRICE_COL.value: prev_prices.to_numpy()})
+        df_state[PrevPriceStateFormat.STATE_AS_OF_COL.value] = as_of_date
+
+        # An empty state (no prices yet) still records the as-of date
+        if df_state.empty:
+            df_state = pd.DataFrame({
+                PrevPriceStateFormat.STATE_ISIN_COL.value: [None],
+                PrevPriceStateFormat.STATE_PRICE_COL.value: [None],
+                PrevPriceStateFormat.STATE_AS_OF_COL.value: [as_of_date]})
+
+        s3_bucket_meta.write_df_to_s3(df_state, state_key,
+                                      PrevPriceStateFormat.STATE_FILE_FORMAT.value)
+        return True
+
+
+    @staticmethod
+    def read_prev_prices(state_key: str, s3_bucket_meta: StorageBackend):
+        """
+        Reads the persisted latest price per ISIN
+
+        Parameters:
+            state_key (str): Key to the state file
+            s3_bucket_meta (StorageBackend): Storage of the meta files
+
+        Returns:
+            as_of_date (str): Last date covered by the prices (None -> no state)
+            prev_prices (Series): ISIN -> latest price up to as_of_date
+        """
         try:
-            # If meta file exists, create return_date_list using its content
-            # Reading meta file
-            df_meta = s3_bucket_meta.read_csv_to_df(meta_key)
-
-            # Creating a list of dates from first_date until today
-            dates = [start + timedelta(days = x)
-                     for x in range(0, (today - start).days + 1)]
-
-            # Creating a set of all dates in meta file
-            src_dates = set(pd.to_datetime(
-                df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]
-                ).dt.date)
-            dates_missing = set(dates[1:]) - src_dates
-
-            if dates_missing:
-                # Determining the earliest date that should be extracted
-                min_date = min(set(dates[1:]) - src_dates) - timedelta(days = 1)
-                # Creating a list of dates from min_date until today
-                return_min_date = (min_date + timedelta(days = 1)) \
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-                return_dates = [
-                    date.strftime(MetaProcessFormat.META_DATE_FORMAT.value) \
-                        for date in dates if date >= min_date
-                    ]
-            else:
-                # Setting values for the earliest date and the list of dates
-                return_dates = []
-                return_min_date = datetime(2200, 1, 1).date()\
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-        except s3_client.exceptions.NoSuchKey:
-            # No meta file found -> Create date list from (first_date - 1) to today
-            return_min_date = first_date
-            return_dates = [
-                (start + timedelta(days = x)) \
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value) \
-                    for x in range(0, (today - start).days + 1)
-            ]
+            df_state = s3_bucket_meta.read_parquet_to_df(state_key)
+        except ObjectNotFoundException:
+            return None, None
 
-        # Returning the earliest date and the list of dates to be processed
-        return return_min_date, return_dates
+        as_of_date = df_state[PrevPriceStateFormat.STATE_AS_OF_COL.value].iloc[0]
+        df_state = df_state.dropna(subset=[PrevPriceStateFormat.STATE_ISIN_COL.value])
+        prev_prices = df_state.set_index(PrevPriceStateFormat.STATE_ISIN_COL.value)\
+            [PrevPriceStateFormat.STATE_PRICE_COL.value].rename_axis(None)
+        return as_of_date, prev_prices
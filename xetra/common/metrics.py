@@ -0,0 +1,212 @@
+"""
+    File: metrics.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the RunMetrics class, which collects the time, data
+            volume and peak memory per stage of an ETL run and exports them
+            as a JSON run report or a Prometheus textfile.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import resource
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+# Counters summed per stage (besides seconds and calls)
+COUNTERS = ('bytes', 'objects', 'rows_in', 'rows_out')
+
+
+def peak_rss_mb():
+    """
+    Returns the peak RSS (high-water mark) of the process in MB
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kB on Linux
+    return max_rss / 2**20 if sys.platform == 'darwin' else max_rss / 2**10
+
+
+class RunMetrics:
+    """
+    Collects metrics per named stage of a run, e.g. 'list', 'download',
+    'parse', 'transform', 'serialize', 'upload' and 'meta'.
+
+    Per stage the seconds, number of calls, bytes, objects and rows in/out
+    are summed over all calls, so the seconds of concurrent calls (thread
+    pools) add up to the busy time rather than the wall time. Stages may be
+    nested (e.g. 'download' within 'extract'). As RSS can't be attributed
+    to a stage, peak_rss_mb is the process high-water mark at the end of
+    the stage's last call; a stage raising it shows up as the first stage
+    with the new peak.
+
+    Hooks are called with (stage, values) after every recorded call, values
+    holding the increments of that call and the current peak RSS. They may
+    be called from worker threads; errors in hooks are logged and ignored.
+    Thread-safe.
+    """
+
+    def __init__(self):
+        """
+        Constructor for RunMetrics
+        """
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._hooks = []
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+
+
+    def add_hook(self, hook):
+        """
+        Registers a function called with (stage, values) after every call
+
+        Parameters:
+            hook: Function taking the stage name and a dict of values
+        """
+        self._hooks.append(hook)
+
+
+    @contextmanager
+    def stage(self, name: str, **counts):
+        """
+        Times the enclosed block as one call of the stage. The yielded dict
+        holds the counters of the call and can be updated within the block,
+        e.g. record['rows_out'] = len(data_frame).
+
+        Parameters:
+            name (str): Name of the stage
+            counts: Initial counters of the call (bytes, objects, rows_in, ...)
+        """
+        record = dict(counts)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.add(name, seconds=time.perf_counter() - start, **record)
+
+
+    def add(self, name: str, seconds: float = 0.0, calls: int = 1, **counts):
+        """
+        Records one call of a stage
+
+        Parameters:
+            name (str): Name of the stage
+            seconds (float): Duration of the call
+            calls (int): Number of calls recorded
+            counts: Counters of the call (bytes, objects, rows_in, rows_out)
+        """
+        values = {'seconds': seconds, 'calls': calls,
+                  **{counter: counts.get(counter, 0) or 0 for counter in COUNTERS},
+                  'peak_rss_mb': peak_rss_mb()}
+        with self._lock:
+            stage = self._stages.setdefault(
+                name, {'seconds': 0.0, 'calls': 0,
+                       **{counter: 0 for counter in COUNTERS},
+                       'peak_rss_mb': 0.0})
+            for field in ('seconds', 'calls') + COUNTERS:
+                stage[field] += values[field]
+            stage['peak_rss_mb'] = max(stage['peak_rss_mb'], values['peak_rss_mb'])
+
+        for hook in self._hooks:
+            try:
+                hook(name, values)
+            except Exception as error:     # pylint: disable=broad-except
+                self._logger.warning('Metrics hook failed: %s', error)
+
+
+    def stages(self):
+        """
+        Returns a copy of the metrics per stage (in the order of first use)
+        """
+        with self._lock:
+            return {name: dict(stage) for name, stage in self._stages.items()}
+
+
+    def report(self, **info):
+        """
+        Returns the run report
+
+        Parameters:
+            info: Additional entries of the report (e.g. status, dates)
+
+        Returns:
+            Dict with the run times, the peak RSS and the metrics per stage
+        """
+        stages = self.stages()
+        for stage in stages.values():
+            stage['seconds'] = round(stage['seconds'], 6)
+            stage['peak_rss_mb'] = round(stage['peak_rss_mb'], 1)
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self._start, 6),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            **info,
+            'stages': stages
+        }
+
+
+    def to_json(self, **info):
+        """
+        Returns the run report (see report()) as JSON bytes
+        """
+        return json.dumps(self.report(**info), indent=2).encode('utf-8')
+
+
+    def to_prometheus(self, prefix: str = 'xetra_etl', **labels):
+        """
+        Returns the metrics in the Prometheus text format, in base units
+        (seconds, bytes)
+
+        Parameters:
+            prefix (str): Prefix of the metric names
+            labels: Labels added to every sample (e.g. job='report1')
+        """
+        def sample(name: str, value, **sample_labels):
+            label_str = ','.join(f'{key}="{val}"' for key, val in
+                                 {**labels, **sample_labels}.items())
+            return f'{prefix}_{name}{{{label_str}}} {value}' if label_str \
+                else f'{prefix}_{name} {value}'
+
+        stages = self.stages()
+        lines = [
+            f'# HELP {prefix}_run_seconds Duration of the run',
+            f'# TYPE {prefix}_run_seconds gauge',
+            sample('run_seconds', round(time.perf_counter() - self._start, 6)),
+            f'# HELP {prefix}_peak_rss_bytes Peak RSS of the run',
+            f'# TYPE {prefix}_peak_rss_bytes gauge',
+            sample('peak_rss_bytes', int(peak_rss_mb() * 2**20)),
+            f'# HELP {prefix}_last_run_timestamp_seconds Start of the run',
+            f'# TYPE {prefix}_last_run_timestamp_seconds gauge',
+            sample('last_run_timestamp_seconds', int(self.started.timestamp()))
+        ]
+        for field in ('seconds', 'calls') + COUNTERS + ('peak_rss_mb',):
+            name = 'stage_peak_rss_bytes' if field == 'peak_rss_mb' \
+                else f'stage_{field}'
+            lines += [f'# HELP {prefix}_{name} {field} per stage of the run',
+                      f'# TYPE {prefix}_{name} gauge']
+            for stage_name, stage in stages.items():
+                value = int(stage[field] * 2**20) if field == 'peak_rss_mb' \
+                    else round(stage[field], 6)
+                lines.append(sample(name, value, stage=stage_name))
+        return '\n'.join(lines) + '\n'
+
+
+    def write_prometheus_textfile(self, path: str, **labels):
+        """
+        Writes the metrics to a file read by the node exporter's textfile
+        collector. The file is replaced atomically, so the collector never
+        reads a partial file.
+
+        Parameters:
+            path (str): Path of the .prom file
+            labels: Labels added to every sample
+        """
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus(**labels))
+        os.replace(temp_path, path)
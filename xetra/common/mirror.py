@@ -0,0 +1,141 @@
+"""
+    File: mirror.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the StorageMirror class, which mirrors prefixes of a
+            source storage (e.g. an S3 bucket) to a local directory.
+"""
+import json
+import time
+import shutil
+import logging
+
+from xetra.common.metrics import RunMetrics
+from xetra.common.storage import StorageBackend, LocalFileSystemBackend, \
+    map_concurrently
+from xetra.common.custom_exceptions import ObjectNotFoundException
+
+
+class StorageMirror:
+    """
+    Local mirror of source prefixes, e.g. for repeated runs over the same
+    historic dates.
+
+    A manifest records size and ETag of the source object of each mirrored
+    file (and the ETag of the file itself), so a sync only downloads the
+    objects that are new or have changed since the last sync. Files whose
+    source objects have been deleted are removed. The mirror is read
+    through self.local, a LocalFileSystemBackend -> memory-mapped files.
+    """
+    MANIFEST_KEY = '.mirror_manifest.json'
+
+    def __init__(self, source: StorageBackend, mirror_dir: str,
+                 metrics: RunMetrics = None):
+        """
+        Constructor for StorageMirror
+
+        Parameters:
+            source (StorageBackend): Storage that is mirrored
+            mirror_dir (str): Local directory of the mirror
+            metrics (RunMetrics): Collects the sync metrics
+                                  (None -> those of the source)
+        """
+        self._logger = logging.getLogger(__name__)
+        self.source = source
+        self.metrics = metrics or source.metrics
+        self.local = LocalFileSystemBackend(mirror_dir, metrics=self.metrics)
+
+
+    def read_manifest(self):
+        """
+        Returns the manifest: dict of key -> {'size', 'etag', 'local_etag'}
+        """
+        try:
+            return json.loads(self.local.read(self.MANIFEST_KEY))
+        except ObjectNotFoundException:
+            return {}
+
+
+    def sync(self, prefixes: list, max_workers: int = 1):
+        """
+        Mirrors the objects of the prefixes to the local directory
+
+        Parameters:
+            prefixes (list): Prefixes to mirror (e.g. the extract dates)
+            max_workers (int): Max. number of parallel listings & downloads
+
+        Returns:
+            Dict with the numbers of downloaded, skipped & deleted files
+            and the downloaded bytes
+        """
+        self._logger.info('Syncing %s prefixes to %s', len(prefixes),
+                          self.local.root_dir)
+        manifest = self.read_manifest()
+        with self.metrics.stage('list') as record:
+            source_objects = [obj for objects in map_concurrently(
+                self.source.list, prefixes, max_workers) for obj in objects]
+            local_etags = {obj.key: obj.etag for objects in map_concurrently(
+                self.local.list, prefixes, max_workers) for obj in objects}
+            record['objects'] = len(source_objects)
+
+        # Unchanged -> same source size & ETag, and the local file hasn't
+        # been modified or deleted since it was downloaded
+        changed = [obj for obj in source_objects
+                   if manifest.get(obj.key, {}).get('size') != obj.size
+                   or manifest.get(obj.key, {}).get('etag') != obj.etag
+                   or manifest[obj.key].get('local_etag') != local_etags.get(obj.key)]
+        def download(obj):
+            manifest[obj.key] = {'size': obj.size, 'etag': obj.etag,
+                                 'local_etag': self._download(obj)}
+        try:
+            map_concurrently(download, changed, max_workers)
+        finally:
+            # Files downloaded before an error are kept (and recorded)
+            deleted = self._delete_removed(source_objects, local_etags, manifest)
+            self.local.write(self.MANIFEST_KEY,
+                             json.dumps(manifest, sort_keys=True).encode('utf-8'))
+
+        result = {'downloaded': len(changed),
+                  'skipped': len(source_objects) - len(changed),
+                  'deleted': deleted,
+                  'bytes': sum(obj.size for obj in changed)}
+        self._logger.info('Sync finished: %s', result)
+        return result
+
+
+    def _download(self, obj):
+        """
+        Helper function for self.sync()
+
+        Returns:
+            ETag of the local file
+        """
+        start = time.perf_counter()
+        body, _ = self.source.open(obj.key)
+        try:
+            etag = self.local.write(
+                obj.key, lambda out: shutil.copyfileobj(body, out, 2**20))
+        finally:
+            body.close()
+        self.metrics.add('sync', seconds=time.perf_counter() - start,
+                         bytes=obj.size, objects=1)
+        return etag
+
+
+    def _delete_removed(self, source_objects: list, local_etags: dict,
+                        manifest: dict):
+        """
+        Helper function for self.sync()
+
+        Deletes the local files of the synced prefixes that don't exist in
+        the source anymore
+
+        Returns:
+            Number of deleted files
+        """
+        source_keys = {obj.key for obj in source_objects}
+        removed = [key for key in local_etags if key not in source_keys]
+        for key in removed:
+            self.local.delete(key)
+            manifest.pop(key, None)
+        return len(removed)
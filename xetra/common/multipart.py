@@ -0,0 +1,221 @@
+"""
+    File: multipart.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the S3MultipartWriter class, a writable file object
+            that streams its content to S3 as a multipart upload.
+"""
+import io
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# S3 rejects parts (except the last one) smaller than 5 MiB
+MIN_PART_SIZE = 5 * 2**20
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Writable binary file object that uploads every part_size bytes as a part
+    of a multipart upload while the caller keeps writing.
+
+    At most max_workers parts are uploaded concurrently; write() blocks
+    when they are all busy, so memory is bounded by about
+    (max_workers + 1) * part_size. Content smaller than one part is sent
+    with a single put_object. A failed part upload is raised by the next
+    write(). On an error the multipart upload is aborted, so no incomplete
+    parts are left in the bucket. A writer that is garbage collected without
+    close() is neither completed nor aborted (no requests in a finalizer);
+    its parts are removed by the bucket's AbortIncompleteMultipartUpload
+    lifecycle rule.
+    """
+
+    def __init__(self, client, bucket: str, key: str,
+                 part_size: int = 8 * 2**20, max_workers: int = 4,
+                 conditions: dict = None, metrics=None):
+        """
+        Constructor for S3MultipartWriter
+
+        Parameters:
+            client: boto3 S3 client (thread-safe)
+            bucket (str): S3 bucket name
+            key (str): Key of the file in the S3 bucket
+            part_size (int): Size of the uploaded parts in bytes
+            max_workers (int): Max. number of concurrent part uploads
+            conditions (dict): IfMatch / IfNoneMatch of the final write
+            metrics (RunMetrics): Records the requests as 'upload' stage
+        """
+        super().__init__()
+        self._logger = logging.getLogger(__name__)
+        self._client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.conditions = conditions or {}
+        self.metrics = metrics
+        # ETag of the written object, set by close()
+        self.etag = None
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload_id = None
+        self._futures = []
+        # First error of the part uploads, raised by the next write()
+        self._error = None
+        self._executor = None
+        self._max_workers = max(max_workers, 1)
+        self._slots = threading.BoundedSemaphore(self._max_workers)
+
+
+    def writable(self):
+        return True
+
+
+    def tell(self):
+        return self._position
+
+
+    def write(self, data):
+        """
+        Buffers data and uploads every full part
+
+        Parameters:
+            data (bytes-like): Data to be written
+
+        Returns:
+            Number of bytes written
+        """
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._submit_part(part)
+        return len(data)
+
+
+    def _submit_part(self, part: bytes):
+        """
+        Uploads a part in the background (blocks while all workers are busy)
+
+        Parameters:
+            part (bytes): Content of the part
+        """
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key)['UploadId']
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        self._slots.acquire()
+        if self._error is not None:
+            # No more parts are serialized & sent after a failed upload
+            self._slots.release()
+            raise self._error
+        part_number = len(self._futures) + 1
+        future = self._executor.submit(self._upload_part, part, part_number)
+        future.add_done_callback(self._part_done)
+        self._futures.append(future)
+
+
+    def _part_done(self, future):
+        """
+        Records the error of a part upload, then releases its slot (which
+        drops the reference to the part)
+        """
+        if not future.cancelled() and future.exception() is not None \
+                and self._error is None:
+            self._error = future.exception()
+        self._slots.release()
+
+
+    def _upload_part(self, part: bytes, part_number: int):
+        """
+        Uploads a single part
+
+        Returns:
+            Dict with the ETag and the PartNumber of the part
+        """
+        start = time.perf_counter()
+        response = self._client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=part)
+        self._add_metrics(start, len(part))
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
+
+
+    def _add_metrics(self, start: float, size: int, objects: int = 0):
+        """
+        Records an upload request started at start (perf_counter)
+        """
+        if self.metrics is not None:
+            self.metrics.add('upload', seconds=time.perf_counter() - start,
+                             bytes=size, objects=objects)
+
+
+    def close(self):
+        """
+        Uploads the remaining data and completes the upload
+        """
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                start = time.perf_counter()
+                response = self._client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer),
+                    **self.conditions)
+                self._add_metrics(start, len(self._buffer), objects=1)
+            else:
+                if self._buffer:
+                    self._submit_part(bytes(self._buffer))
+                parts = [future.result() for future in self._futures]
+                start = time.perf_counter()
+                response = self._client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                    MultipartUpload={'Parts': parts}, **self.conditions)
+                self._add_metrics(start, 0, objects=1)
+            self.etag = response.get('ETag')
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._buffer = bytearray()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+            super().close()
+
+
+    def abort(self):
+        """
+        Aborts the multipart upload and discards the buffered data
+        """
+        if self._upload_id is not None:
+            for future in self._futures:
+                future.cancel()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+            self._logger.info('Aborting the upload of %s', self.key)
+            self._client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+            self._upload_id = None
+        self._buffer = bytearray()
+        super().close()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+    def __del__(self):
+        # An unclosed writer holds incomplete content -> never complete it
+        # (IOBase would call close()), and no abort request during garbage
+        # collection or interpreter shutdown, see the lifecycle rule above
+        if not self.closed:
+            self._buffer = bytearray()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            io.RawIOBase.close(self)
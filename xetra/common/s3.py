@@ -10,22 +10,27 @@
                 - Section 5 & 6
 """
 import os
-import logging
-from io import StringIO, BytesIO
+from bisect import bisect_left
 
 import boto3
-import pandas as pd
 
-from xetra.common.constants import S3FileTypes
-from xetra.common.custom_exceptions import WrongFormatException
+from xetra.common.metrics import RunMetrics
+from xetra.common.multipart import S3MultipartWriter
+from xetra.common.storage import StorageBackend, ObjectInfo, \
+    map_concurrently
+from xetra.common.custom_exceptions import ObjectNotFoundException, \
+    PreconditionFailedException
 
 
-class S3BucketConnector:
+class S3BucketConnector(StorageBackend):
     """
     Class for interacting with S3 buckets.
     """
     def __init__(self, access_key: str, secret_key: str, endpoint_url:str,
-                 bucket: str, region_name: str = 'us-east-2'):
+                 bucket: str, region_name: str = 'us-east-2',
+                 cache_dir: str = None, cache_max_mb: int = 1024,
+                 part_size_mb: int = 8, upload_workers: int = 4,
+                 metrics: RunMetrics = None):
         """
         Constructor for S3BucketConnector
 
@@ -34,8 +39,16 @@ class S3BucketConnector:
             secret_key (str): AWS Secret Key
             endpoint_url (str): Endpoint URL to S3
             bucket (str): S3 bucket name
+            cache_dir (str): Local cache directory for parsed CSV files
+                             (None -> no cache)
+            cache_max_mb (int): Max. size of the local cache in MB
+            part_size_mb (int): Part size of multipart uploads in MB (min. 5)
+            upload_workers (int): Max. number of concurrent part uploads
+            metrics (RunMetrics): Collects the list, download, parse,
+                                  serialize & upload metrics
+                                  (None -> metrics of this connector only)
         """
-        self._logger = logging.getLogger(__name__)  # Initialize the logger
+        super().__init__(bucket, cache_dir, cache_max_mb, metrics)
 
         # Assign our class endpoint_url
         self.endpoint_url = endpoint_url
@@ -53,83 +66,127 @@ class S3BucketConnector:
             endpoint_url=endpoint_url
         )
         self._bucket = self._s3.Bucket(bucket)
-
-
-    def list_files_in_prefix(self, prefix: str):
+        # The low-level client is used for all requests, as it is
+        # thread-safe (the resource isn't)
+        self._client = self._s3.meta.client
+        # Exception classes of the client (e.g. NoSuchKey)
+        self.exceptions = self._client.exceptions
+
+        # Files are written as streamed multipart uploads
+        self.part_size = part_size_mb * 2**20
+        self.upload_workers = upload_workers
+
+
+    def uri(self, key: str):
+        return f'{self.endpoint_url}/{self._bucket.name}/{key}'
+
+
+    def list(self, prefix: str):
+        paginator = self._client.get_paginator('list_objects_v2')
+        return [ObjectInfo(obj['Key'], obj['Size'], obj['ETag'])
+                for page in paginator.paginate(Bucket=self._bucket.name,
+                                               Prefix=prefix)
+                for obj in page.get('Contents', [])]
+
+
+    def stat(self, key: str):
+        try:
+            response = self._client.head_object(Bucket=self._bucket.name, Key=key)
+        except self.exceptions.ClientError as error:
+            if error.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise ObjectNotFoundException(key) from error
+            raise
+        return ObjectInfo(key, response['ContentLength'], response['ETag'])
+
+
+    def open(self, key: str):
+        try:
+            response = self._client.get_object(Bucket=self._bucket.name, Key=key)
+        except self.exceptions.NoSuchKey as error:
+            raise ObjectNotFoundException(key) from error
+        # The body is streamed while it's read
+        return response['Body'], response['ETag']
+
+
+    def write(self, key: str, data, if_match: str = None,
+              if_none_match: str = None):
+        # Conditional write -> S3 fails with PreconditionFailed otherwise
+        conditions = {}
+        if if_match:
+            conditions['IfMatch'] = if_match
+        if if_none_match:
+            conditions['IfNoneMatch'] = if_none_match
+        try:
+            with S3MultipartWriter(self._client, self._bucket.name, key,
+                                   self.part_size, self.upload_workers,
+                                   conditions, self.metrics) as out:
+                if callable(data):
+                    data(out)
+                else:
+                    out.write(data)
+        except self.exceptions.ClientError as error:
+            # ConditionalRequestConflict -> concurrent conditional write
+            if error.response['Error']['Code'] in ('PreconditionFailed',
+                                                   'ConditionalRequestConflict'):
+                raise PreconditionFailedException(key) from error
+            raise
+        return out.etag
+
+
+    def delete(self, key: str):
+        self._client.delete_object(Bucket=self._bucket.name, Key=key)
+        self._etags.pop(key, None)
+
+
+    def _list_prefixes(self, prefixes: list, max_workers: int, delimiter: str):
         """
-        Lists all files containing a prefix in the S3 bucket.
+        Helper function for self.list_files_in_prefixes()
 
-        Parameters:
-            prefix (str): Prefix to search for in the S3 bucket
+        The existing top-level prefixes are determined first with a single
+        delimiter listing, so only the prefixes that contain objects are
+        listed (in parallel, if max_workers is greater than 1).
 
         Returns:
-            List of keys of the files containing the prefix
+            Dict of prefix -> list of keys, in the order of prefixes
         """
-        files = [obj.key for obj in self._bucket.objects.filter(Prefix=prefix)]
+        files = {prefix: [] for prefix in prefixes}
+        if not prefixes:
+            return files
+
+        # Keeping only the prefixes that exist in the bucket, i.e. a
+        # top-level prefix starts with them (or they start with one).
+        # StartAfter is exclusive -> starting one character before the
+        # first segment, so a top-level key equal to it is listed as well
+        existing = self._list_common_prefixes(
+            delimiter, min(prefixes).split(delimiter)[0][:-1])
+        non_empty = []
+        for prefix in prefixes:
+            index = bisect_left(existing, prefix)
+            if (index < len(existing) and existing[index].startswith(prefix)) \
+                    or (index > 0 and prefix.startswith(existing[index - 1])):
+                non_empty.append(prefix)
+
+        files.update(zip(non_empty, map_concurrently(self._list_keys, non_empty,
+                                                     max_workers)))
         return files
 
 
-    def read_csv_to_df(self, key: str, encoding: str = 'utf-8', sep: str = ','):
+    def _list_common_prefixes(self, delimiter: str, start_after: str = ''):
         """
-        Reading a CSV file from an S3 Bucket into a DataFrame
+        Helper function for self.list_files_in_prefixes()
 
         Parameters:
-            key (str): Key of the file in the S3 bucket
-            encoding (str): Encoding of the file
-            sep (str): Separator of the file
-        
-        Returns:
-            data_frame: Pandas DataFrame containing the CSV file's data
-        """
-        self._logger.info('Reading file %s/%s/%s',
-                          self.endpoint_url, self._bucket.name, key)
-
-        csv_obj = self._bucket.Object(key=key).get()\
-                                .get('Body').read().decode(encoding)
-        data = StringIO(csv_obj)
-        data_frame = pd.read_csv(data, sep=sep)
-
-        return data_frame
-
+            delimiter (str): Delimiter grouping the keys into prefixes
+            start_after (str): Only prefixes after this string are listed
 
-    def write_df_to_s3(self, data_frame: pd.DataFrame, key: str, file_format: str):
-        """
-        Writes a Pandas DataFrame to S3.
-        Supported formats: .csv, . parquet
-        
-        Parameters:
-            data_frame (pd.DataFrame): DataFrame to write to S3
-            key (str): Key of the file in the S3 bucket
-            file_format (str): File format to write the DataFrame to
-        """
-        if data_frame.empty:
-            self._logger.info('The dataframe is empty! No file will be written!')
-            return None
-        if file_format == S3FileTypes.CSV.value:
-            out_buffer = StringIO()
-            data_frame.to_csv(out_buffer, index=False)
-            return self.__put_object(out_buffer, key)
-        if file_format == S3FileTypes.PARQUET.value:
-            out_buffer = BytesIO()
-            data_frame.to_parquet(out_buffer, index=False)
-            out_buffer.seek(0)  # Move the cursor to the beginning of the buffer
-            # Write the data to S3
-            return self.__put_object(out_buffer, key)
-
-        self._logger.info('The file format %s is not supported to be written '
-                          'to S3!', file_format)
-        raise WrongFormatException
-
-
-    def __put_object(self, out_buffer: StringIO | BytesIO, key: str):
-        """
-        Helper function for self.write_df_to_s3()
-
-        Parameters:
-            out_buffer (StringIO or BytesIO): Buffer containing the data
-            key (str): Key of the file in the S3 bucket
+        Returns:
+            Sorted list of the top-level prefixes (and top-level keys)
         """
-        self._logger.info('Writing file to %s/%s/%s',
-                          self.endpoint_url, self._bucket.name, key)
-        self._bucket.put_object(Body=out_buffer.getvalue(), Key=key)
-        return True
+        paginator = self._client.get_paginator('list_objects_v2')
+        existing = []
+        for page in paginator.paginate(Bucket=self._bucket.name,
+                                       Delimiter=delimiter,
+                                       StartAfter=start_after):
+            existing.extend(cp['Prefix'] for cp in page.get('CommonPrefixes', []))
+            existing.extend(obj['Key'] for obj in page.get('Contents', []))
+        return sorted(existing)
@@ -0,0 +1,801 @@
+"""
+    File: storage.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the StorageBackend base class, which reads and writes
+            DataFrames on top of a few storage primitives (list, open,
+            read, write, exists, stat), and its local filesystem and
+            in-memory implementations.
+"""
+import os
+import mmap
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from io import BytesIO, BufferedReader, RawIOBase
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from xetra.common.cache import LocalFileCache
+from xetra.common.metrics import RunMetrics
+from xetra.common.constants import S3FileTypes, CsvEngines
+from xetra.common.custom_exceptions import WrongFormatException, \
+    ObjectNotFoundException, PreconditionFailedException
+
+# Size of the start of a CSV file the pyarrow column types are inferred from
+CSV_SAMPLE_BYTES = 2**16
+
+
+def map_concurrently(func, items: list, max_workers: int):
+    """
+    Applies func to the items, in a thread pool if max_workers is
+    greater than 1
+
+    Parameters:
+        func: Function that is applied to each item
+        items (list): Items func is applied to
+        max_workers (int): Max. number of threads
+
+    Returns:
+        List of the results in the order of items
+    """
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
+
+
+class ObjectInfo(NamedTuple):
+    """
+    Class for the metadata of a stored object.
+
+    key: Key of the object
+    size: Size of the object in bytes
+    etag: Version identifier of the object (changes with the content)
+    """
+    key: str
+    size: int
+    etag: str
+
+
+class StorageBackend(ABC):
+    """
+    Base class of the storages of files (objects) addressed by keys with
+    '/' separated prefixes, e.g. an S3 bucket or a local directory.
+
+    Subclasses implement the abstract primitives list(), stat(), open(),
+    write() and delete(); the DataFrame reads & writes, the optional cache
+    of parsed CSV files and the metrics are shared by all backends.
+    """
+
+    def __init__(self, name: str, cache_dir: str = None, cache_max_mb: int = 1024,
+                 metrics: RunMetrics = None):
+        """
+        Constructor for StorageBackend
+
+        Parameters:
+            name (str): Name of the storage (e.g. bucket), part of the cache key
+            cache_dir (str): Local cache directory for parsed CSV files
+                             (None -> no cache)
+            cache_max_mb (int): Max. size of the local cache in MB
+            metrics (RunMetrics): Collects the list, download, parse,
+                                  serialize & upload metrics
+                                  (None -> metrics of this backend only)
+        """
+        self._logger = logging.getLogger(__name__)
+        self.name = name
+        # Opt-in cache of parsed source files, keyed by name, key & ETag.
+        # The ETags seen while listing are kept, so no extra request is
+        # needed to look up a file in the cache.
+        self._cache = LocalFileCache(cache_dir, cache_max_mb * 2**20) \
+            if cache_dir else None
+        self._etags = {}
+        self.metrics = metrics or RunMetrics()
+
+
+    def uri(self, key: str):
+        """
+        Returns the location of a key, as logged
+        """
+        return f'{self.name}/{key}'
+
+
+    @abstractmethod
+    def list(self, prefix: str):
+        """
+        Lists all objects whose key starts with prefix
+
+        Parameters:
+            prefix (str): Prefix of the keys
+
+        Returns:
+            List of ObjectInfo, sorted by key
+        """
+
+
+    @abstractmethod
+    def stat(self, key: str):
+        """
+        Returns the ObjectInfo of a key
+
+        Raises:
+            ObjectNotFoundException: The key doesn't exist
+        """
+
+
+    def exists(self, key: str):
+        """
+        Returns True if the key exists
+        """
+        try:
+            self.stat(key)
+        except ObjectNotFoundException:
+            return False
+        return True
+
+
+    @abstractmethod
+    def open(self, key: str):
+        """
+        Opens an object for reading
+
+        Parameters:
+            key (str): Key of the object
+
+        Returns:
+            Tuple of a readable binary file object (to be closed by the
+            caller) and the ETag of the opened version
+
+        Raises:
+            ObjectNotFoundException: The key doesn't exist
+        """
+
+
+    def read(self, key: str):
+        """
+        Returns the content of an object as bytes
+        """
+        body, etag = self.open(key)
+        try:
+            data = body.read()
+        finally:
+            body.close()
+        self._etags[key] = etag
+        return data
+
+
+    @abstractmethod
+    def write(self, key: str, data, if_match: str = None,
+              if_none_match: str = None):
+        """
+        Writes an object, replacing an existing one
+
+        Parameters:
+            key (str): Key of the object
+            data: Content (bytes) or a function writing the content to the
+                  given binary file object
+            if_match (str): Only write if the object still has this ETag
+            if_none_match (str): '*' -> only write if the object doesn't exist
+
+        Returns:
+            ETag of the written object
+
+        Raises:
+            PreconditionFailedException: A condition isn't met
+        """
+
+
+    @abstractmethod
+    def delete(self, key: str):
+        """
+        Deletes an object (no error if it doesn't exist)
+
+        Parameters:
+            key (str): Key of the object
+        """
+
+
+    def list_files_in_prefix(self, prefix: str):
+        """
+        Lists all files containing a prefix in the storage.
+
+        Parameters:
+            prefix (str): Prefix to search for in the storage
+
+        Returns:
+            List of keys of the files containing the prefix
+        """
+        with self.metrics.stage('list') as record:
+            files = self._list_keys(prefix)
+            record['objects'] = len(files)
+        return files
+
+
+    def list_files_in_prefixes(self, prefixes: list, max_workers: int = 1,
+                               delimiter: str = '/'):
+        """
+        Lists all files for several prefixes in the storage
+        (in parallel, if max_workers is greater than 1).
+
+        Parameters:
+            prefixes (list): Prefixes to search for in the storage
+            max_workers (int): Max. number of prefixes listed in parallel
+            delimiter (str): Delimiter of the key hierarchy
+
+        Returns:
+            Dict of prefix -> list of keys, in the order of prefixes
+        """
+        with self.metrics.stage('list') as record:
+            files = self._list_prefixes(prefixes, max_workers, delimiter)
+            record['objects'] = sum(len(keys) for keys in files.values())
+        return files
+
+
+    def _list_prefixes(self, prefixes: list, max_workers: int, delimiter: str):
+        """
+        Helper function for self.list_files_in_prefixes()
+
+        Returns:
+            Dict of prefix -> list of keys, in the order of prefixes
+        """
+        return dict(zip(prefixes, map_concurrently(self._list_keys, prefixes,
+                                                   max_workers)))
+
+
+    def _list_keys(self, prefix: str):
+        """
+        Helper function for the list methods
+        Lists the keys of a prefix and keeps their ETags
+
+        Parameters:
+            prefix (str): Prefix to search for in the storage
+
+        Returns:
+            List of keys of the files containing the prefix
+        """
+        files = []
+        for obj in self.list(prefix):
+            self._etags[obj.key] = obj.etag
+            files.append(obj.key)
+        return files
+
+
+    def read_csv_to_df(self, key: str, encoding: str = 'utf-8', sep: str = ',',
+                       dtype: dict = None, engine: str = CsvEngines.C.value,
+                       usecols: list = None, use_cache: bool = True):
+        """
+        Reading a CSV file from the storage into a DataFrame
+        Supported engines: c (pandas), pyarrow (multithreaded)
+
+        Parameters:
+            key (str): Key of the file in the storage
+            encoding (str): Encoding of the file
+            sep (str): Separator of the file
+            dtype (dict): Column name -> dtype (e.g. 'category', 'float64')
+            engine (str): CSV parser used for reading the file
+            usecols (list): Only these columns are parsed (None -> all)
+            use_cache (bool): False -> the cache is neither read nor written
+                              (e.g. for files that are read only once)
+
+        Returns:
+            data_frame: Pandas DataFrame containing the CSV file's data
+        """
+        if engine not in [e.value for e in CsvEngines]:
+            self._logger.info('The CSV engine %s is not supported!', engine)
+            raise WrongFormatException
+
+        self._logger.info('Reading file %s', self.uri(key))
+
+        # The read options are part of the cache key, as they change the result
+        options = (encoding, sep, sorted((dtype or {}).items()), engine, usecols)
+        use_cache = use_cache and self._cache is not None
+        if use_cache:
+            etag = self._etags.get(key) or self.stat(key).etag
+            data_frame = self._cache.get(self.name, key, etag, options)
+            if data_frame is not None:
+                self._logger.info('Cache hit for file %s', key)
+                return data_frame
+
+        start = time.perf_counter()
+        body, etag = self.open(key)
+        request_seconds = time.perf_counter() - start
+        body = _MeteredBody(body)
+        # The raw bytes are streamed into the CSV parser, which decodes them
+        # itself -> no decoded str and StringIO copy of the whole file
+        try:
+            if isinstance(body.raw, mmap.mmap):
+                # Memory-mapped file -> parsed in place, without copies into
+                # read buffers (the page faults are counted as parsing)
+                body.bytes = len(body.raw)
+                data = pa.BufferReader(pa.py_buffer(body.raw)) \
+                    if engine == CsvEngines.PYARROW.value else body.raw
+                sample = body.raw[:CSV_SAMPLE_BYTES]
+            else:
+                data = BufferedReader(body, CSV_SAMPLE_BYTES)
+                sample = data.peek(CSV_SAMPLE_BYTES)[:CSV_SAMPLE_BYTES] \
+                    if engine == CsvEngines.PYARROW.value else None
+            if engine == CsvEngines.PYARROW.value:
+                data_frame = self.__read_csv_pyarrow(data, encoding, sep, dtype,
+                                                     usecols, sample)
+            else:
+                data_frame = pd.read_csv(data, encoding=encoding, sep=sep,
+                                         dtype=dtype, usecols=usecols)
+        finally:
+            # Releasing the buffer of the map before it's closed
+            data = None
+            body.close()
+        # Download and parsing overlap -> the parser's time spent waiting
+        # for the body is counted as download
+        self.__add_read_metrics(time.perf_counter() - start, request_seconds,
+                                body, len(data_frame))
+
+        # ETag of the downloaded version, in case the object has changed
+        self._etags[key] = etag
+        if use_cache:
+            self._cache.put(data_frame, self.name, key, etag, options)
+        return data_frame
+
+
+    @staticmethod
+    def __read_csv_pyarrow(data, encoding: str, sep: str,
+                           dtype: dict = None, usecols: list = None,
+                           sample: bytes = None):
+        """
+        Helper function for self.read_csv_to_df()
+        Parses the CSV with pyarrow, using the dtypes as explicit column
+        types ('category' -> dictionary encoded string). Other columns
+        pyarrow would infer as date, time or timestamp are read as strings,
+        like with the C engine.
+
+        Parameters:
+            data (BufferedReader or pa.BufferReader): Raw CSV data
+            encoding (str): Encoding of the file
+            sep (str): Separator of the file
+            dtype (dict): Column name -> dtype
+            usecols (list): Only these columns are parsed (None -> all)
+            sample (bytes): Start of the file the column types are inferred
+                            from
+
+        Returns:
+            data_frame: Pandas DataFrame containing the CSV file's data
+        """
+        column_types = {}
+        for column, col_type in (dtype or {}).items():
+            if col_type == 'category':
+                column_types[column] = pa.dictionary(pa.int32(), pa.string())
+            elif col_type in ('str', 'string', 'object'):
+                column_types[column] = pa.string()
+            else:
+                column_types[column] = pa.from_numpy_dtype(np.dtype(col_type))
+
+        read_options = pa_csv.ReadOptions(encoding=encoding, use_threads=True)
+        parse_options = pa_csv.ParseOptions(delimiter=sep)
+        # The complete lines of the sample -> inferred types of the columns
+        lines = sample[:sample.rfind(b'\n') + 1] if sample else b''
+        if lines:
+            inferred = pa_csv.read_csv(
+                pa.BufferReader(lines), read_options=read_options,
+                parse_options=parse_options,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types, include_columns=usecols)).schema
+            for field in inferred:
+                if field.name not in column_types and pa.types.is_temporal(field.type):
+                    column_types[field.name] = pa.string()
+
+        table = pa_csv.read_csv(
+            data,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=pa_csv.ConvertOptions(column_types=column_types,
+                                                  include_columns=usecols)
+        )
+        return table.to_pandas()
+
+
+    def read_parquet_to_df(self, key: str, columns: list = None):
+        """
+        Reading a Parquet file from the storage into a DataFrame
+
+        Parameters:
+            key (str): Key of the file in the storage
+            columns (list): Columns to read (None -> all columns)
+
+        Returns:
+            data_frame: Pandas DataFrame containing the Parquet file's data
+        """
+        self._logger.info('Reading file %s', self.uri(key))
+        start = time.perf_counter()
+        body, etag = self.open(key)
+        request_seconds = time.perf_counter() - start
+        self._etags[key] = etag
+        body = _MeteredBody(body)
+        try:
+            if isinstance(body.raw, mmap.mmap):
+                # Memory-mapped file -> only the pages of the read columns
+                # are loaded
+                body.bytes = len(body.raw)
+                data = pa.BufferReader(pa.py_buffer(body.raw))
+            else:
+                data = BytesIO(body.read())
+            data_frame = pd.read_parquet(data, columns=columns)
+        finally:
+            # Releasing the buffer of the map before it's closed
+            data = None
+            body.close()
+        self.__add_read_metrics(time.perf_counter() - start, request_seconds,
+                                body, len(data_frame))
+        return data_frame
+
+
+    def __add_read_metrics(self, seconds: float, request_seconds: float,
+                           body: '_MeteredBody', rows: int):
+        """
+        Helper function for the read methods
+        Records a read as download (request + reading the body) and parse
+        (the rest of the read time)
+
+        Parameters:
+            seconds (float): Duration of the whole read
+            request_seconds (float): Duration of opening the object
+            body (_MeteredBody): Body of the read object
+            rows (int): Number of rows read
+        """
+        download_seconds = request_seconds + body.seconds
+        self.metrics.add('download', seconds=download_seconds,
+                         bytes=body.bytes, objects=1)
+        self.metrics.add('parse', seconds=max(seconds - download_seconds, 0.0),
+                         bytes=body.bytes, rows_out=rows)
+
+
+    def write_df_to_s3(self, data_frame: pd.DataFrame, key: str, file_format: str,
+                       parquet_options: dict = None, if_match: str = None,
+                       if_none_match: str = None):
+        """
+        Writes a Pandas DataFrame to the storage.
+        Supported formats: .csv, . parquet
+
+        Parameters:
+            data_frame (pd.DataFrame): DataFrame to write to the storage
+            key (str): Key of the file in the storage
+            file_format (str): File format to write the DataFrame to
+            parquet_options (dict): Options of the parquet writer, e.g.
+                compression ('zstd', 'snappy', 'lz4'), compression_level,
+                row_group_size, use_dictionary (bool or list of columns),
+                write_statistics (bool or list of columns) and sort_by
+                (list of columns to sort by before writing)
+            if_match (str): Only write if the file still has this ETag
+            if_none_match (str): '*' -> only write if the file doesn't exist
+        """
+        # Conditional write -> PreconditionFailedException otherwise
+        conditions = {'if_match': if_match, 'if_none_match': if_none_match}
+        if data_frame.empty:
+            self._logger.info('The dataframe is empty! No file will be written!')
+            return None
+        if file_format == S3FileTypes.CSV.value:
+            return self.__put_object(
+                lambda out: data_frame.to_csv(out, index=False, mode='wb',
+                                              encoding='utf-8'),
+                key, conditions, len(data_frame))
+        if file_format == S3FileTypes.PARQUET.value:
+            options = dict(parquet_options or {})
+            sort_by = options.pop('sort_by', None)
+            if sort_by:
+                # Sorted row groups -> tight min/max statistics for scans
+                data_frame = data_frame.sort_values(sort_by, kind='stable',
+                                                    ignore_index=True)
+            # Write the data to the storage while it's serialized
+            return self.__put_object(
+                lambda out: data_frame.to_parquet(out, index=False,
+                                                  engine='pyarrow', **options),
+                key, conditions, len(data_frame))
+
+        self._logger.info('The file format %s is not supported to be written '
+                          'to S3!', file_format)
+        raise WrongFormatException
+
+
+    def write_bytes_to_s3(self, data: bytes, key: str):
+        """
+        Writes raw bytes (e.g. a JSON document) to the storage
+
+        Parameters:
+            data (bytes): Content of the file
+            key (str): Key of the file in the storage
+        """
+        return self.__put_object(lambda out: out.write(data), key)
+
+
+    def __put_object(self, write_func, key: str, conditions: dict = None,
+                     rows: int = 0):
+        """
+        Helper function for the write methods
+        The data is written to the storage while it's serialized, so the
+        whole file is never held in memory (except by MemoryBackend).
+
+        Parameters:
+            write_func: Function writing the data to the given file object
+            key (str): Key of the file in the storage
+            conditions (dict): if_match / if_none_match of the write
+            rows (int): Number of rows written (metrics)
+        """
+        self._logger.info('Writing file to %s', self.uri(key))
+
+        def serialize(out):
+            # Serializing includes waiting for the storage (e.g. a free
+            # upload slot)
+            with self.metrics.stage('serialize', rows_in=rows) as record:
+                write_func(out)
+                record['bytes'] = out.tell()
+
+        self._etags[key] = self.write(key, serialize, **(conditions or {}))
+        return True
+
+
+    def get_etag(self, key: str):
+        """
+        Returns the ETag of a file as last listed, read or written by this
+        backend (None -> unknown)
+
+        Parameters:
+            key (str): Key of the file in the storage
+        """
+        return self._etags.get(key)
+
+
+class LocalFileSystemBackend(StorageBackend):
+    """
+    Storage in a local directory, keys are paths relative to root_dir.
+
+    Objects are read memory-mapped, so the parsers read straight from the
+    page cache without a copy into a read buffer. Writes go to a temporary
+    file that replaces the object when complete, so readers never see a
+    partial file. The ETag is derived from inode, size and modification
+    time.
+    if_none_match is atomic across processes, if_match only within one.
+    """
+
+    def __init__(self, root_dir: str, cache_dir: str = None,
+                 cache_max_mb: int = 1024, metrics: RunMetrics = None):
+        """
+        Constructor for LocalFileSystemBackend
+
+        Parameters:
+            root_dir (str): Directory containing the objects
+            cache_dir (str): Local cache directory for parsed CSV files
+                             (None -> no cache)
+            cache_max_mb (int): Max. size of the local cache in MB
+            metrics (RunMetrics): Collects the list, download, parse &
+                                  serialize metrics
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        super().__init__(self.root_dir, cache_dir, cache_max_mb, metrics)
+        self._lock = threading.Lock()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+
+    def uri(self, key: str):
+        return self._path(key)
+
+
+    def _path(self, key: str):
+        """
+        Returns the file path of a key (within root_dir)
+        """
+        path = os.path.normpath(os.path.join(self.root_dir, *key.split('/')))
+        if not path.startswith(self.root_dir + os.sep):
+            raise ValueError(f'The key {key} is outside of {self.root_dir}!')
+        return path
+
+
+    @staticmethod
+    def _etag(stat_result: os.stat_result):
+        # Every write creates a new file (inode), so two versions written
+        # within the timestamp granularity still get different ETags
+        return (f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-'
+                f'{stat_result.st_mtime_ns:x}"')
+
+
+    def list(self, prefix: str):
+        # Only the directory of the prefix is walked, and only into the
+        # subdirectories that can contain keys with the prefix
+        prefix_dir = os.path.join(self.root_dir, *prefix.split('/')[:-1])
+        objects = []
+        for dir_path, dir_names, file_names in os.walk(prefix_dir):
+            dir_key = os.path.relpath(dir_path, self.root_dir).replace(os.sep, '/')
+            dir_key = '' if dir_key == '.' else f'{dir_key}/'
+            dir_names[:] = [name for name in dir_names
+                            if f'{dir_key}{name}/'.startswith(prefix)
+                            or prefix.startswith(f'{dir_key}{name}/')]
+            for file_name in file_names:
+                # Temporary files of writes in progress
+                if file_name.startswith('.'):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                key = os.path.relpath(path, self.root_dir).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    stat_result = os.stat(path)
+                    objects.append(ObjectInfo(key, stat_result.st_size,
+                                              self._etag(stat_result)))
+        return sorted(objects)
+
+
+    def stat(self, key: str):
+        try:
+            stat_result = os.stat(self._path(key))
+        except FileNotFoundError as error:
+            raise ObjectNotFoundException(key) from error
+        return ObjectInfo(key, stat_result.st_size, self._etag(stat_result))
+
+
+    def open(self, key: str):
+        try:
+            with open(self._path(key), 'rb') as file:
+                stat_result = os.fstat(file.fileno())
+                # Empty files can't be mapped; the map stays valid after
+                # the file is closed
+                body = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+                    if stat_result.st_size else BytesIO()
+        except FileNotFoundError as error:
+            raise ObjectNotFoundException(key) from error
+        return body, self._etag(stat_result)
+
+
+    def write(self, key: str, data, if_match: str = None,
+              if_none_match: str = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_handle, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=f'.{os.path.basename(path)}.',
+            suffix='.tmp')
+        try:
+            with os.fdopen(file_handle, 'wb') as file:
+                if callable(data):
+                    data(file)
+                else:
+                    file.write(data)
+            with self._lock:
+                if if_none_match == '*':
+                    # Atomic: fails if the file has been created meanwhile
+                    try:
+                        os.link(temp_path, path)
+                    except FileExistsError as error:
+                        raise PreconditionFailedException(key) from error
+                    os.unlink(temp_path)
+                else:
+                    if if_match is not None:
+                        try:
+                            etag = self.stat(key).etag
+                        except ObjectNotFoundException:
+                            etag = None
+                        if etag != if_match:
+                            raise PreconditionFailedException(key)
+                    os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return self.stat(key).etag
+
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        self._etags.pop(key, None)
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Storage in a dict, e.g. for tests and benchmarks without any I/O.
+    ETags are MD5 hashes of the content, like those of single part S3
+    uploads. Thread-safe.
+    """
+
+    def __init__(self, metrics: RunMetrics = None):
+        """
+        Constructor for MemoryBackend
+
+        Parameters:
+            metrics (RunMetrics): Collects the list, download, parse &
+                                  serialize metrics
+        """
+        super().__init__('memory', metrics=metrics)
+        self._lock = threading.Lock()
+        self._objects = {}
+
+
+    def uri(self, key: str):
+        return f'memory://{key}'
+
+
+    def list(self, prefix: str):
+        with self._lock:
+            return sorted(ObjectInfo(key, len(data), etag)
+                          for key, (data, etag) in self._objects.items()
+                          if key.startswith(prefix))
+
+
+    def stat(self, key: str):
+        with self._lock:
+            if key not in self._objects:
+                raise ObjectNotFoundException(key)
+            data, etag = self._objects[key]
+        return ObjectInfo(key, len(data), etag)
+
+
+    def open(self, key: str):
+        with self._lock:
+            if key not in self._objects:
+                raise ObjectNotFoundException(key)
+            data, etag = self._objects[key]
+        # BytesIO shares the (immutable) bytes until it's written to
+        return BytesIO(data), etag
+
+
+    def write(self, key: str, data, if_match: str = None,
+              if_none_match: str = None):
+        if callable(data):
+            out = BytesIO()
+            data(out)
+            data = out.getvalue()
+        data = bytes(data)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            current = self._objects.get(key)
+            if (if_none_match == '*' and current is not None) or \
+                    (if_match is not None and (current is None or current[1] != if_match)):
+                raise PreconditionFailedException(key)
+            self._objects[key] = (data, etag)
+        return etag
+
+
+    def delete(self, key: str):
+        with self._lock:
+            self._objects.pop(key, None)
+        self._etags.pop(key, None)
+
+
+class _MeteredBody(RawIOBase):
+    """
+    Readable file object counting the bytes read from a body and the time
+    spent waiting for them
+    """
+
+    def __init__(self, body):
+        super().__init__()
+        self.raw = body
+        self.bytes = 0
+        self.seconds = 0.0
+
+
+    def readable(self):
+        return True
+
+
+    def readinto(self, buffer):
+        start = time.perf_counter()
+        data = self.raw.read(len(buffer))
+        self.seconds += time.perf_counter() - start
+        buffer[:len(data)] = data
+        self.bytes += len(data)
+        return len(data)
+
+
+    def close(self):
+        if not self.closed:
+            try:
+                self.raw.close()
+            except BufferError:
+                # A map still referenced (e.g. by a traceback) is closed
+                # when it's garbage collected
+                pass
+        super().close()
@@ -0,0 +1,88 @@
+"""
+    File: trading_calendar.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the TradingCalendar class, which tells trading days
+            (weekdays of the weekmask that aren't holidays) apart from
+            non-trading days.
+"""
+import numpy as np
+
+
+class TradingCalendar:
+    """
+    Exchange calendar based on numpy business days.
+
+    All methods take and return datetime64[D] values (scalars or arrays);
+    'YYYY-MM-DD' strings and dates are accepted as input.
+    """
+
+    def __init__(self, weekmask: str = 'Mon Tue Wed Thu Fri', holidays: list = None):
+        """
+        Constructor for TradingCalendar
+
+        Parameters:
+            weekmask (str): Trading weekdays, e.g. 'Mon Tue Wed Thu Fri'
+                            or '1111100'
+            holidays (list): Non-trading dates on trading weekdays
+        """
+        self.weekmask = weekmask
+        self.holidays = sorted(str(holiday) for holiday in holidays or [])
+        self._calendar = np.busdaycalendar(
+            weekmask=weekmask, holidays=np.array(self.holidays, dtype='datetime64[D]'))
+
+
+    def is_trading_day(self, dates):
+        """
+        Returns True for the trading days of dates
+        """
+        return np.is_busday(np.asarray(dates, dtype='datetime64[D]'),
+                            busdaycal=self._calendar)
+
+
+    def trading_days(self, start, end):
+        """
+        Returns all trading days from start to end (inclusive)
+        """
+        dates = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1,
+                          dtype='datetime64[D]')
+        return dates[self.is_trading_day(dates)]
+
+
+    def count(self, start, end):
+        """
+        Returns the number of trading days from start to end (inclusive)
+        """
+        start = np.asarray(start, dtype='datetime64[D]')
+        end = np.asarray(end, dtype='datetime64[D]')
+        return np.where(start <= end, np.busday_count(
+            start, np.maximum(start, end + 1), busdaycal=self._calendar), 0)
+
+
+    def roll_forward(self, dates):
+        """
+        Returns the dates, non-trading days replaced by the next trading day
+        """
+        return np.busday_offset(np.asarray(dates, dtype='datetime64[D]'), 0,
+                                roll='forward', busdaycal=self._calendar)
+
+
+    def roll_backward(self, dates):
+        """
+        Returns the dates, non-trading days replaced by the previous
+        trading day
+        """
+        return np.busday_offset(np.asarray(dates, dtype='datetime64[D]'), 0,
+                                roll='backward', busdaycal=self._calendar)
+
+
+    def previous_trading_day(self, dates):
+        """
+        Returns the last trading day before each date
+        """
+        return np.busday_offset(np.asarray(dates, dtype='datetime64[D]'), -1,
+                                roll='forward', busdaycal=self._calendar)
+
+
+# Every calendar day is a trading day -> behaviour without a trading calendar
+CALENDAR_DAYS = TradingCalendar(weekmask='1111111')
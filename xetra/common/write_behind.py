@@ -0,0 +1,109 @@
+"""
+    File: write_behind.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the WriteBehindQueue class, which runs load jobs in a
+            background thread while the next data is being processed.
+"""
+import queue
+import logging
+import threading
+
+
+class WriteBehindQueue:
+    """
+    Runs submitted jobs one after the other in a background thread, in the
+    order they were submitted.
+
+    The queue is bounded: put() blocks while max_size jobs are waiting, so
+    at most that many outputs are held in memory. As the jobs run in order,
+    a job (e.g. a meta update) only runs after all previous jobs (e.g. the
+    data writes it depends on) have finished. After a failed job the
+    remaining jobs are skipped and the error is raised by the next put(),
+    flush() or close().
+    """
+
+    def __init__(self, max_size: int = 2):
+        """
+        Constructor for WriteBehindQueue
+
+        Parameters:
+            max_size (int): Max. number of waiting jobs
+        """
+        self._logger = logging.getLogger(__name__)
+        self._queue = queue.Queue(maxsize=max(max_size, 1))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='write-behind')
+        self._thread.start()
+
+
+    def _run(self):
+        """
+        Worker loop, None stops the worker
+        """
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if self._error is None:
+                    func, args, kwargs = job
+                    func(*args, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                self._logger.error('Write-behind job failed: %s', error)
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+
+    def put(self, func, *args, **kwargs):
+        """
+        Submits a job (blocks while the queue is full)
+
+        Parameters:
+            func: Function to be called in the background thread
+            args, kwargs: Arguments of func
+        """
+        self._raise_error()
+        if not self._thread.is_alive():
+            raise RuntimeError('The write-behind queue is closed.')
+        self._queue.put((func, args, kwargs))
+
+
+    def flush(self):
+        """
+        Waits until all submitted jobs have finished
+        """
+        self._queue.join()
+        self._raise_error()
+
+
+    def close(self):
+        """
+        Runs the remaining jobs and stops the background thread
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The jobs submitted so far are still completed on an error
+        if exc_type is None:
+            self.close()
+        else:
+            try:
+                self.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
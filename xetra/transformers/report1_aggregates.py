@@ -0,0 +1,296 @@
+"""
+    File: report1_aggregates.py
+  Author: Ian Featherston
+    Date: 2026-10-17
+    Desc: Contains the Report1Aggregator class which computes and merges
+            partial aggregates for report 1.
+"""
+import logging
+from typing import TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from xetra.common.constants import AggEngines, Report1PartialFormat
+from xetra.common.custom_exceptions import WrongFormatException
+
+if TYPE_CHECKING:
+    from xetra.transformers.xetra_transformer import XetraSourceConfig, XetraTargetConfig
+
+
+class Report1Aggregator:
+    """
+    Partial aggregates of report 1 per ISIN and day.
+
+    A partial aggregate holds the first and last trading time with their
+    start price, the minimum and maximum price and the traded volume.
+    Partials can be computed per file (or any other chunk of source rows)
+    and merged in any grouping, as long as the order of the chunks is kept:
+    merge([merge([a, b]), c]) == merge([a, merge([b, c])]) == partial(a+b+c)
+
+    The partials are computed with pandas or NumPy, see src_agg_engine,
+    optionally in a process pool on ISIN shards, see partial_sharded().
+    """
+
+    def __init__(self, src_args: 'XetraSourceConfig', tgt_args: 'XetraTargetConfig'):
+        """
+        Constructor for Report1Aggregator
+
+        Parameters:
+            src_args (XetraSourceConfig): NamedTuple class w/ Source config data
+            tgt_args (XetraTargetConfig): NamedTuple class w/ Target config data
+        """
+        self._logger = logging.getLogger(__name__)
+        if src_args.src_agg_engine not in [e.value for e in AggEngines]:
+            self._logger.info('The aggregation engine %s is not supported!',
+                              src_args.src_agg_engine)
+            raise WrongFormatException
+        self.src_args = src_args
+        self.tgt_args = tgt_args
+        self.keys = [src_args.src_col_isin, src_args.src_col_date]
+        self.columns = self.keys + [
+            Report1PartialFormat.FIRST_TIME_COL.value, tgt_args.tgt_col_op_price,
+            Report1PartialFormat.LAST_TIME_COL.value, tgt_args.tgt_col_clos_price,
+            tgt_args.tgt_col_min_price, tgt_args.tgt_col_max_price,
+            tgt_args.tgt_col_dail_trad_vol]
+
+
+    def partial(self, data_frame: pd.DataFrame):
+        """
+        Computes the partial aggregates of source rows
+
+        Parameters:
+            data_frame (df): Pandas DataFrame with the source data
+
+        Returns:
+            partial (df): Partial aggregates per ISIN and day
+        """
+        src = self.src_args
+        data_frame = data_frame.loc[:, [src.src_col_isin, src.src_col_date,
+                                        src.src_col_time, src.src_col_start_price,
+                                        src.src_col_min_price, src.src_col_max_price,
+                                        src.src_col_traded_vol]].dropna()
+
+        if self.src_args.src_agg_engine == AggEngines.NUMPY.value \
+                and not data_frame.empty:
+            partial = self._partial_numpy(data_frame)
+        else:
+            partial = self._partial_pandas(data_frame)
+
+        # Categorical columns (see src_dtypes) -> back to their plain values
+        for column in self.keys + [Report1PartialFormat.FIRST_TIME_COL.value,
+                                   Report1PartialFormat.LAST_TIME_COL.value]:
+            if isinstance(partial[column].dtype, pd.CategoricalDtype):
+                partial[column] = partial[column] \
+                    .astype(partial[column].cat.categories.dtype)
+        return partial
+
+
+    def partial_sharded(self, data_frame: pd.DataFrame, processes: int):
+        """
+        Computes the partial aggregates in a process pool. The rows are
+        split into shards by a hash of the ISIN (so the shards share no
+        ISIN and day) and each shard is passed to its worker as Arrow IPC
+        stream in shared memory instead of a pickled DataFrame.
+
+        Parameters:
+            data_frame (df): Pandas DataFrame with the source data
+            processes (int): Number of worker processes / shards
+
+        Returns:
+            partial (df): Partial aggregates per ISIN and day
+        """
+        src = self.src_args
+        data_frame = data_frame.loc[:, [src.src_col_isin, src.src_col_date,
+                                        src.src_col_time, src.src_col_start_price,
+                                        src.src_col_min_price, src.src_col_max_price,
+                                        src.src_col_traded_vol]]
+        shard_ids = pd.util.hash_pandas_object(
+            data_frame[src.src_col_isin], index=False).to_numpy() % processes
+
+        blocks = []
+        try:
+            for shard_id in range(processes):
+                blocks.append(_write_shared_table(pa.Table.from_pandas(
+                    data_frame[shard_ids == shard_id], preserve_index=False)))
+            with ProcessPoolExecutor(max_workers=processes,
+                                     mp_context=get_context('spawn')) as executor:
+                partials = list(executor.map(
+                    _partial_shared_table, [self] * processes,
+                    [block.name for block in blocks]))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        # The shards are disjoint -> concatenating them is the merge
+        return pd.concat(partials, ignore_index=True)
+
+
+    def _partial_pandas(self, data_frame: pd.DataFrame):
+        """
+        Helper function for self.partial()
+        One stable sort by time and one grouped aggregation
+
+        Parameters:
+            data_frame (df): Source rows without missing values
+
+        Returns:
+            partial (df): Partial aggregates per ISIN and day
+        """
+        src = self.src_args
+        # Stable sort -> rows with the same time keep their source order
+        return data_frame.sort_values(by=[src.src_col_time], kind='stable') \
+            .groupby(self.keys, as_index=False, observed=True) \
+                .agg(**{
+                    Report1PartialFormat.FIRST_TIME_COL.value: (src.src_col_time, 'first'),
+                    self.tgt_args.tgt_col_op_price: (src.src_col_start_price, 'first'),
+                    Report1PartialFormat.LAST_TIME_COL.value: (src.src_col_time, 'last'),
+                    self.tgt_args.tgt_col_clos_price: (src.src_col_start_price, 'last'),
+                    self.tgt_args.tgt_col_min_price: (src.src_col_min_price, 'min'),
+                    self.tgt_args.tgt_col_max_price: (src.src_col_max_price, 'max'),
+                    self.tgt_args.tgt_col_dail_trad_vol: (src.src_col_traded_vol, 'sum')})
+
+
+    def _partial_numpy(self, data_frame: pd.DataFrame):
+        """
+        Helper function for self.partial()
+        ISIN, day and time are factorized into integer codes, the rows are
+        ordered by (group, time) with one stable lexsort and the aggregates
+        are taken with NumPy reductions over the group boundaries
+
+        Parameters:
+            data_frame (df): Source rows without missing values (not empty)
+
+        Returns:
+            partial (df): Partial aggregates per ISIN and day
+        """
+        src = self.src_args
+        isin_codes, isins = pd.factorize(data_frame[src.src_col_isin], sort=True)
+        date_codes, dates = pd.factorize(data_frame[src.src_col_date], sort=True)
+        time_codes, times = pd.factorize(data_frame[src.src_col_time], sort=True)
+
+        # One integer code per ISIN and day, ordered like (ISIN, day)
+        group_codes = isin_codes.astype(np.int64) * len(dates) + date_codes
+
+        # lexsort is stable -> rows with the same time keep their source order
+        order = np.lexsort((time_codes, group_codes))
+        group_codes = group_codes[order]
+        starts = np.flatnonzero(np.r_[True, group_codes[1:] != group_codes[:-1]])
+        ends = np.r_[starts[1:], len(order)] - 1
+
+        start_price = data_frame[src.src_col_start_price].to_numpy()[order]
+        time_codes = time_codes[order]
+        group_codes = group_codes[starts]
+
+        return pd.DataFrame({
+            src.src_col_isin: isins.take(group_codes // len(dates)),
+            src.src_col_date: dates.take(group_codes % len(dates)),
+            Report1PartialFormat.FIRST_TIME_COL.value: times.take(time_codes[starts]),
+            self.tgt_args.tgt_col_op_price: start_price[starts],
+            Report1PartialFormat.LAST_TIME_COL.value: times.take(time_codes[ends]),
+            self.tgt_args.tgt_col_clos_price: start_price[ends],
+            self.tgt_args.tgt_col_min_price: np.minimum.reduceat(
+                data_frame[src.src_col_min_price].to_numpy()[order], starts),
+            self.tgt_args.tgt_col_max_price: np.maximum.reduceat(
+                data_frame[src.src_col_max_price].to_numpy()[order], starts),
+            self.tgt_args.tgt_col_dail_trad_vol: np.add.reduceat(
+                data_frame[src.src_col_traded_vol].to_numpy()[order], starts)
+        })
+
+
+    def merge(self, partials: list):
+        """
+        Merges partial aggregates, given in the order of their source rows
+
+        Parameters:
+            partials (list): Pandas DataFrames of partial aggregates
+
+        Returns:
+            partial (df): Merged partial aggregates per ISIN and day
+        """
+        data_frame = pd.concat(partials, ignore_index=True)
+        first_time = Report1PartialFormat.FIRST_TIME_COL.value
+        last_time = Report1PartialFormat.LAST_TIME_COL.value
+
+        # Earliest first time / latest last time, earlier partials win ties
+        opening = data_frame.sort_values(by=[first_time], kind='stable') \
+            .groupby(self.keys)[[first_time, self.tgt_args.tgt_col_op_price]] \
+                .first()
+        closing = data_frame.sort_values(by=[last_time], kind='stable') \
+            .groupby(self.keys)[[last_time, self.tgt_args.tgt_col_clos_price]] \
+                .last()
+        rest = data_frame.groupby(self.keys).agg({
+            self.tgt_args.tgt_col_min_price: 'min',
+            self.tgt_args.tgt_col_max_price: 'max',
+            self.tgt_args.tgt_col_dail_trad_vol: 'sum'})
+
+        return pd.concat([opening, closing, rest], axis=1) \
+            .reset_index().loc[:, self.columns]
+
+
+    def finalize(self, partial: pd.DataFrame):
+        """
+        Turns partial aggregates into the aggregated report 1 columns ->
+        opening price, closing price, minimum price, maximum price,
+        & daily traded volume per ISIN and day
+
+        Parameters:
+            partial (df): Partial aggregates per ISIN and day
+
+        Returns:
+            data_frame (df): Aggregated Pandas DataFrame (not rounded)
+        """
+        return partial.drop(columns=[Report1PartialFormat.FIRST_TIME_COL.value,
+                                     Report1PartialFormat.LAST_TIME_COL.value]) \
+            .sort_values(by=self.keys).reset_index(drop=True)
+
+
+def _write_shared_table(table: pa.Table):
+    """
+    Writes an Arrow table as IPC stream into a new shared memory block
+
+    Parameters:
+        table (pa.Table): Arrow table to be shared
+
+    Returns:
+        SharedMemory block containing the IPC stream
+    """
+    # Measuring the stream size first, so it's written only once
+    mock_sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock_sink, table.schema) as writer:
+        writer.write_table(table)
+
+    block = shared_memory.SharedMemory(create=True, size=max(mock_sink.size(), 1))
+    sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf))
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    sink.close()
+    return block
+
+
+def _partial_shared_table(aggregator: Report1Aggregator, name: str):
+    """
+    Worker function of Report1Aggregator.partial_sharded()
+    Reads the (zero-copy) Arrow table from shared memory and aggregates it
+
+    Parameters:
+        aggregator (Report1Aggregator): Aggregator of the parent process
+        name (str): Name of the shared memory block
+
+    Returns:
+        partial (df): Partial aggregates of the shard
+    """
+    block = shared_memory.SharedMemory(name=name)
+    buffer = pa.py_buffer(block.buf)
+    data_frame = pa.ipc.open_stream(buffer).read_all().to_pandas()
+    partial = aggregator.partial(data_frame)
+
+    # to_pandas() may not copy the data -> all references into the shared
+    # buffer have to be released before close()
+    del data_frame, buffer
+    block.close()
+    return partial
@@ -9,8 +9,10 @@
                 - by Jan Schwarzlose
                 - Section 5 & 6
 """
+import hashlib
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # NamedTuple is a class that allows you to create a tuple with named fields
 #  - This is a useful way to create a simple data structure like a class,
@@ -19,9 +21,15 @@ from datetime import datetime
 from typing import NamedTuple
 import pandas as pd
 
-# Import our S3BucketConnector class
-from xetra.common.s3 import S3BucketConnector
+# Import our storage backend (e.g. S3BucketConnector) base class
+from xetra.common.constants import MetaProcessFormat, S3FileTypes
+from xetra.common.storage import StorageBackend
 from xetra.common.meta_process import MetaProcess
+from xetra.common.metrics import RunMetrics
+from xetra.common.mirror import StorageMirror
+from xetra.common.trading_calendar import TradingCalendar
+from xetra.common.write_behind import WriteBehindQueue
+from xetra.transformers.report1_aggregates import Report1Aggregator
 
 
 class XetraSourceConfig(NamedTuple):
@@ -37,6 +45,18 @@ class XetraSourceConfig(NamedTuple):
     src_col_min_price: Column name for Minimum Price in source
     src_col_max_price: Column name for Maximum Price in source
     src_col_traded_vol: Column name for Traded Volume in source
+    src_max_workers: Max. number of source files/prefixes read in parallel
+    src_dtypes {}: Explicit column types of the source files (None -> inferred)
+    src_csv_engine: CSV parser for the source files ('c' or 'pyarrow')
+    src_streaming: Extract & transform one trading day at a time
+    src_agg_engine: Engine for the report 1 aggregation ('pandas' or 'numpy')
+    src_agg_processes: Number of processes (ISIN shards) for the aggregation
+    src_mirror_dir: Local directory the source dates are synced to before
+                    they are extracted from it (None -> read from the source)
+    src_staging_prefix: Prefix in the target storage of the staging files:
+                        the CSVs of a trading day converted into one
+                        Parquet file sorted by ISIN & Time, read instead
+                        of the CSVs (None -> no staging)
     """
     src_first_extract_date: str
     src_columns: list
@@ -47,6 +67,14 @@ class XetraSourceConfig(NamedTuple):
     src_col_min_price: str
     src_col_max_price: str
     src_col_traded_vol: str
+    src_max_workers: int = 1
+    src_dtypes: dict = None
+    src_csv_engine: str = 'c'
+    src_streaming: bool = False
+    src_agg_engine: str = 'pandas'
+    src_agg_processes: int = 1
+    src_mirror_dir: str = None
+    src_staging_prefix: str = None
 
 
 class XetraTargetConfig(NamedTuple):
@@ -64,6 +92,18 @@ class XetraTargetConfig(NamedTuple):
     tgt_key: Basic key for Target file
     tgt_key_date_format: Date format of target file key
     tgt_format: File format of the target file
+    tgt_partitioned: One file per date (<dir>/date=YYYY-MM-DD/) instead of
+                     one file per run
+    tgt_parquet_options: Options of the parquet writer
+                         (see StorageBackend.write_df_to_s3)
+    tgt_write_behind: Max. number of days waiting to be written in the
+                      background while the next days are processed
+                      (0 -> load after all days; needs streaming and
+                      partitioned output)
+    tgt_run_report: Write a JSON run report (metrics per stage) to
+                    <tgt_key dir>/_run_reports/
+    tgt_metrics_textfile: Local path of a Prometheus textfile the run
+                          metrics are written to (None -> not written)
     """
     tgt_col_isin: str
     tgt_col_date: str
@@ -76,6 +116,11 @@ class XetraTargetConfig(NamedTuple):
     tgt_key: str
     tgt_key_date_format: str
     tgt_format: str
+    tgt_partitioned: bool = False
+    tgt_parquet_options: dict = None
+    tgt_write_behind: int = 0
+    tgt_run_report: bool = False
+    tgt_metrics_textfile: str = None
 
 
 class XetraETL:
@@ -83,18 +128,34 @@ class XetraETL:
     Reads the Xetra data, transforms it and writes it to the target.
     """
 
-    def __init__(self, s3_bucket_src: S3BucketConnector,
-                 s3_bucket_tgt: S3BucketConnector, meta_key: str,
-                 src_args: XetraSourceConfig, tgt_args: XetraTargetConfig):
+    def __init__(self, s3_bucket_src: StorageBackend,
+                 s3_bucket_tgt: StorageBackend, meta_key: str,
+                 src_args: XetraSourceConfig, tgt_args: XetraTargetConfig,
+                 state_key: str = None,
+                 meta_format: str = MetaProcessFormat.META_FILE_FORMAT.value,
+                 calendar: TradingCalendar = None,
+                 metrics: RunMetrics = None):
         """
         Constructor for XetraTransformer
 
         Parameters:
-            s3_bucket_src (S3BucketConnector): Connector for source bucket
-            s3_bucket_tgt (S3BucketConnector): Connector for target bucket
+            s3_bucket_src (StorageBackend): Source storage, e.g. an
+                                            S3BucketConnector or a local mirror
+            s3_bucket_tgt (StorageBackend): Target storage
             meta_key (str): Used as 'self.meta_key' -> key of meta file
             src_args (XetraSourceConfig): NamedTuple class w/ Source config data
             tgt_args (XetraTargetConfig): NamedTuple class w/ Target config data
+            state_key (str): Key of the persisted previous prices per ISIN
+                             (None -> the day before extract_date is extracted)
+            meta_format (str): Format of the meta file ('csv' -> one row per
+                               date, 'parquet' -> processed date ranges)
+            calendar (TradingCalendar): Only trading days are extracted and
+                                        recorded in the meta file
+                                        (None -> every day)
+            metrics (RunMetrics): Collects the metrics per stage of the run;
+                                  shared with the connectors, the run report
+                                  includes their list/download/parse/
+                                  serialize/upload stages
         """
         self._logger = logging.getLogger(__name__)  # Initialize the logger
 
@@ -103,11 +164,62 @@ class XetraETL:
         self.meta_key = meta_key
         self.src_args = src_args
         self.tgt_args = tgt_args
-        self.extract_date, self.extract_date_list = \
-            MetaProcess.return_date_list(src_args.src_first_extract_date,
-                                         self.meta_key, self.s3_bucket_tgt)
+        self.metrics = metrics or RunMetrics()
+        # Local mirror of the source dates, read instead of the source
+        self.mirror = StorageMirror(s3_bucket_src, src_args.src_mirror_dir,
+                                    self.metrics) \
+            if src_args.src_mirror_dir else None
+        # The meta file is read once and written back by load()
+        self.meta = MetaProcess(self.meta_key, self.s3_bucket_tgt, meta_format,
+                                calendar)
+        with self.metrics.stage('meta'):
+            self.extract_date, self.extract_date_list = \
+                self.meta.date_list(src_args.src_first_extract_date)
         self.meta_update_list = [date for date in self.extract_date_list \
                                  if date >= self.extract_date]
+        # Source columns that are actually used by report 1
+        report1_columns = {src_args.src_col_isin, src_args.src_col_date,
+                           src_args.src_col_time, src_args.src_col_start_price,
+                           src_args.src_col_min_price, src_args.src_col_max_price,
+                           src_args.src_col_traded_vol}
+        self.report1_columns = [column for column in src_args.src_columns \
+                                if column in report1_columns]
+        self.aggregator = Report1Aggregator(src_args, tgt_args)
+
+        # Prices persisted by the previous run, if it ended with the day
+        # before extract_date -> that day doesn't need to be extracted again
+        self.state_key = state_key
+        self.prev_prices = None
+        self.last_prices = None
+        # Source files per date listed by stage_source(), reused by the
+        # extraction
+        self._source_files = None
+        if state_key and self.extract_date_list:
+            with self.metrics.stage('meta'):
+                as_of_date, prev_prices = MetaProcess.read_prev_prices(
+                    state_key, self.s3_bucket_tgt)
+            if as_of_date == self.extract_date_list[0]:
+                self._logger.info('Using the persisted prices of %s', as_of_date)
+                self.prev_prices = prev_prices
+                self.extract_date_list = self.extract_date_list[1:]
+
+
+    def sync_source(self):
+        """
+        Syncs the dates to extract to the local mirror, which is the source
+        of the extraction afterwards
+
+        Returns:
+            Dict with the numbers of downloaded, skipped & deleted files
+            (None -> no mirror configured)
+        """
+        if self.mirror is None:
+            return None
+        result = self.mirror.sync(self.extract_date_list,
+                                  self.src_args.src_max_workers)
+        self.s3_bucket_src = self.mirror.local
+        self._source_files = None
+        return result
 
 
     def extract(self):
@@ -119,23 +231,239 @@ class XetraETL:
         """
         self._logger.info('Extracting Xetra source files started...')
 
-        # Get the list of files in the source bucket
-        files = [
-            key for date in self.extract_date_list \
-                for key in self.s3_bucket_src.list_files_in_prefix(date)
-        ]
+        with self.metrics.stage('extract') as record:
+            # Get the list of files in the source bucket
+            files = [key for keys in self._list_source_files().values()
+                     for key in keys]
 
-        # If there are no files to be extracted -> return an empty DataFrame
-        if not files:
-            data_frame = pd.DataFrame()
-        else:
-            data_frame = pd.concat([self.s3_bucket_src.read_csv_to_df(file) \
-                                    for file in files], ignore_index=True)
+            # If there are no files to be extracted -> return an empty DataFrame
+            if not files:
+                data_frame = pd.DataFrame()
+            else:
+                data_frame = self._concat_frames(self._read_files(files))
+            record.update(objects=len(files), rows_out=len(data_frame))
 
         self._logger.info('Extracting Xetra source files finished.')
         return data_frame
 
 
+    def _list_source_files(self):
+        """
+        Lists the source files of the dates to extract. The files of a date
+        are replaced by its staging file if that's up to date.
+        After stage_source() its listing is used.
+
+        Returns:
+            Dict of date -> list of keys, in the order of the dates
+        """
+        if self._source_files is not None:
+            return self._source_files
+        files_by_date = self.s3_bucket_src.list_files_in_prefixes(
+            self.extract_date_list, self.src_args.src_max_workers)
+        if not self.src_args.src_staging_prefix:
+            return files_by_date
+        staged = self._list_staging_files(files_by_date)
+        for date, files in files_by_date.items():
+            staging_key = self._staging_key(date, files) if files else None
+            if staging_key in staged.get(date, []):
+                files_by_date[date] = [staging_key]
+        return files_by_date
+
+
+    def _list_staging_files(self, files_by_date: dict):
+        """
+        Lists the staging files of the dates with source files
+
+        Returns:
+            Dict of date -> list of keys of staging files
+        """
+        dates = [date for date, files in files_by_date.items() if files]
+        staged = self.s3_bucket_tgt.list_files_in_prefixes(
+            [f'{self.src_args.src_staging_prefix}{date}/' for date in dates],
+            self.src_args.src_max_workers)
+        return dict(zip(dates, staged.values()))
+
+
+    def _staging_key(self, date: str, files: list):
+        """
+        Returns the key of the staging file of a date. The key contains a
+        hash of the keys & ETags of the source files, so a date is staged
+        again if its source files change (e.g. the hourly files of a day
+        that's still being traded).
+
+        Parameters:
+            date (str): Date of the source files
+            files (list): Keys of the source files of the date
+        """
+        digest = hashlib.sha256('\n'.join(
+            f'{file} {self.s3_bucket_src.get_etag(file)}' for file in files
+        ).encode('utf-8')).hexdigest()[:16]
+        return f'{self.src_args.src_staging_prefix}{date}/{date}_{digest}.parquet'
+
+
+    def _is_staged(self, file: str):
+        """
+        Returns True if the key is one of a staging file
+        """
+        return bool(self.src_args.src_staging_prefix) \
+            and file.startswith(self.src_args.src_staging_prefix)
+
+
+    def stage_source(self):
+        """
+        Converts the CSV files of each date to extract into one Parquet
+        file (typed, sorted by ISIN & Time) in the staging prefix.
+        Dates with an up to date staging file are skipped, outdated
+        staging files are deleted. The extraction reads the staging files
+        without listing the source again.
+
+        Returns:
+            Dict with the numbers of staged & skipped dates
+            (None -> no staging prefix configured)
+        """
+        if not self.src_args.src_staging_prefix:
+            return None
+        self._logger.info('Staging Xetra source files started...')
+        files_by_date = self.s3_bucket_src.list_files_in_prefixes(
+            self.extract_date_list, self.src_args.src_max_workers)
+        staged = self._list_staging_files(files_by_date)
+
+        result = {'staged': 0, 'skipped': 0}
+        for date, files in files_by_date.items():
+            # Dates without any files (weekends, holidays) -> nothing to do
+            if not files:
+                continue
+            staging_key = self._staging_key(date, files)
+            if staging_key in staged[date]:
+                files_by_date[date] = [staging_key]
+                result['skipped'] += 1
+                continue
+            self._logger.info('Staging Xetra source files of %s', date)
+            with self.metrics.stage('stage', objects=len(files)) as record:
+                # All source columns are staged, so other reports can read
+                # their own projection. The CSVs are read only once here ->
+                # not cached
+                data_frame = self._concat_frames(self._map_files(
+                    lambda file: self.s3_bucket_src.read_csv_to_df(
+                        file, dtype=self.src_args.src_dtypes,
+                        engine=self.src_args.src_csv_engine,
+                        use_cache=False), files))
+                record['rows_out'] = len(data_frame)
+                # Empty files only -> nothing is written, the CSVs are read
+                if self.s3_bucket_tgt.write_df_to_s3(
+                        data_frame, staging_key, S3FileTypes.PARQUET.value,
+                        dict(self.tgt_args.tgt_parquet_options or {},
+                             sort_by=[self.src_args.src_col_isin,
+                                      self.src_args.src_col_time])):
+                    files_by_date[date] = [staging_key]
+            for key in staged[date]:
+                self.s3_bucket_tgt.delete(key)
+            result['staged'] += 1
+        self._source_files = files_by_date
+        self._logger.info('Staging Xetra source files finished: %s', result)
+        return result
+
+
+    def _read_files(self, files: list):
+        """
+        Reads the source files into DataFrames, using a thread pool if
+        src_max_workers is greater than 1
+
+        Parameters:
+            files (list): Keys of the source files
+
+        Returns:
+            List of Pandas DataFrames in the same order as files
+        """
+        return self._map_files(self._read_file, files)
+
+
+    def _read_partials(self, files: list):
+        """
+        Reads the source files and aggregates each of them into partial
+        aggregates right away, so the raw rows of a file are not kept
+
+        Parameters:
+            files (list): Keys of the source files
+
+        Returns:
+            List of partial aggregates in the same order as files
+        """
+        def read_partial(file: str):
+            with self.metrics.stage('extract', objects=1) as record:
+                data_frame = self._read_file(file)
+                record['rows_out'] = len(data_frame)
+            with self.metrics.stage('transform', rows_in=len(data_frame)):
+                return self.aggregator.partial(data_frame)
+
+        return self._map_files(read_partial, files)
+
+
+    def _map_files(self, func, files: list):
+        """
+        Applies func to each of the files, using a thread pool if
+        src_max_workers is greater than 1
+
+        Parameters:
+            func: Function called with the key of a source file
+            files (list): Keys of the source files
+
+        Returns:
+            List of the results in the same order as files
+        """
+        if self.src_args.src_max_workers <= 1:
+            return [func(file) for file in files]
+
+        # executor.map() keeps the order of the input keys, so the
+        # concatenated DataFrame is the same as with the serial read
+        with ThreadPoolExecutor(
+                max_workers=self.src_args.src_max_workers) as executor:
+            return list(executor.map(func, files))
+
+
+    def _read_file(self, file: str):
+        """
+        Reads one source file using the configured column types and engine,
+        or a staging file. Only the source columns needed for report 1 are
+        parsed.
+
+        Parameters:
+            file (str): Key of the source (or staging) file
+
+        Returns:
+            data_frame (df): Pandas DataFrame containing the file's data
+        """
+        if self._is_staged(file):
+            return self.s3_bucket_tgt.read_parquet_to_df(
+                file, columns=self.report1_columns)
+        return self.s3_bucket_src.read_csv_to_df(
+            file, dtype=self.src_args.src_dtypes,
+            engine=self.src_args.src_csv_engine,
+            usecols=self.report1_columns)
+
+
+    @staticmethod
+    def _concat_frames(frames: list):
+        """
+        Concatenates the source DataFrames. Categorical columns get the same
+        (sorted) categories first, so they stay categorical after the concat.
+
+        Parameters:
+            frames (list): Pandas DataFrames to be concatenated
+
+        Returns:
+            data_frame (df): Concatenated Pandas DataFrame
+        """
+        for column, col_type in frames[0].dtypes.items():
+            if isinstance(col_type, pd.CategoricalDtype):
+                categories = sorted(set().union(
+                    *(frame[column].cat.categories for frame in frames)))
+                cat_type = pd.CategoricalDtype(categories)
+                for frame in frames:
+                    frame[column] = frame[column].astype(cat_type)
+        return pd.concat(frames, ignore_index=True)
+
+
     def transform_report1(self, data_frame: pd.DataFrame):
         """
         Applies the necessary transformation to create report 1
@@ -153,72 +481,160 @@ class XetraETL:
 
         self._logger.info('Applying transformations to Xetra source data for report 1 started...')
 
-        # Filtering necessary source columns
-        data_frame = data_frame.loc[:, self.src_args.src_columns]
-
-        # Removing rows with missing values
-        data_frame.dropna(inplace=True)
-
-        # Calculating opening price per ISIN and day
-        data_frame[self.tgt_args.tgt_col_op_price] = data_frame \
-            .sort_values(by=[self.src_args.src_col_time]) \
-                .groupby([
-                    self.src_args.src_col_isin,
-                    self.src_args.src_col_date
-                    ])[self.src_args.src_col_start_price] \
-                        .transform('first')
-
-        # Calculating the closing price per ISIN and day
-        data_frame[self.tgt_args.tgt_col_clos_price] = data_frame \
-            .sort_values(by=[self.src_args.src_col_time]) \
-                .groupby([
-                    self.src_args.src_col_isin,
-                    self.src_args.src_col_date
-                    ])[self.src_args.src_col_start_price] \
-                        .transform('last')
-
-        # Renaming columns per target configuration
-        data_frame.rename(columns={
-            self.src_args.src_col_min_price: self.tgt_args.tgt_col_min_price,
-            self.src_args.src_col_max_price: self.tgt_args.tgt_col_max_price,
-            self.src_args.src_col_traded_vol: self.tgt_args.tgt_col_dail_trad_vol
-            }, inplace=True)
-
-        # Aggregating per ISIN and day -> opening price, closing price,
-        # minimum price, maximum price, & daily traded volume
-        data_frame = data_frame.groupby([
-            self.src_args.src_col_isin,
-            self.src_args.src_col_date], as_index=False)\
-                .agg({
-                    self.tgt_args.tgt_col_op_price: 'min',
-                    self.tgt_args.tgt_col_clos_price: 'min',
-                    self.tgt_args.tgt_col_min_price: 'min',
-                    self.tgt_args.tgt_col_max_price: 'max',
-                    self.tgt_args.tgt_col_dail_trad_vol: 'sum'})
-
-        # Change of the current day's closing price compared to the
-        # previous day's closing price (in %)
-        data_frame[self.tgt_args.tgt_col_ch_prev_clos] = data_frame \
-            .sort_values(by=[self.src_args.src_col_date]) \
-                .groupby([self.src_args.src_col_isin]) \
-                    [self.tgt_args.tgt_col_op_price] \
-                        .shift(1)
-        data_frame[self.tgt_args.tgt_col_ch_prev_clos] = (
-            data_frame[self.tgt_args.tgt_col_op_price] \
-            - data_frame[self.tgt_args.tgt_col_ch_prev_clos]) \
-            / data_frame[self.tgt_args.tgt_col_ch_prev_clos ] \
-            * 100   # Change into %
+        with self.metrics.stage('transform', rows_in=len(data_frame)) as record:
+            data_frame = self._aggregate_report1(data_frame)
+            data_frame = self._change_prev_closing(data_frame, self.prev_prices)
+            self.last_prices = self._last_prices(data_frame, self.prev_prices)
+            data_frame = self._finalize_report1(data_frame)
+            record['rows_out'] = len(data_frame)
+
+        self._logger.info('Applying transformations to Xetra source data finished...')
+        return data_frame
+
+
+    def extract_transform_report1_by_day(self, on_day=None):
+        """
+        Streaming version of extract() + transform_report1():
+        The source files are read and aggregated one trading day at a time
+        (each file into partial aggregates, merged per day), only the
+        previous prices per ISIN are carried over to the next day.
+        Peak memory is therefore independent of the number of days.
+
+        Parameters:
+            on_day: Called with (date, report of the date, latest prices per
+                    ISIN) after each date instead of collecting the reports
+
+        Returns:
+            data_frame (df): Transformed Pandas DataFrame as Output
+                             (empty if on_day is given)
+        """
+        self._logger.info('Extracting and transforming Xetra source files '
+                          'by day started...')
+        with self.metrics.stage('extract'):
+            files_by_date = self._list_source_files()
+
+        prev_prices = self.prev_prices
+        reports = []
+        for date, files in files_by_date.items():
+            # Dates without any files (weekends, holidays) -> nothing to do
+            if files:
+                self._logger.info('Processing Xetra source files of %s', date)
+                partials = self._read_partials(files)
+                # Rows in were counted per file by _read_partials()
+                with self.metrics.stage('transform') as record:
+                    data_frame = self.aggregator.finalize(
+                        self.aggregator.merge(partials))
+                    data_frame = self._change_prev_closing(data_frame, prev_prices)
+                    prev_prices = self._last_prices(data_frame, prev_prices)
+                    data_frame = self._finalize_report1(data_frame)
+                    record['rows_out'] = len(data_frame)
+            else:
+                data_frame = pd.DataFrame()
+            if on_day is not None:
+                on_day(date, data_frame, prev_prices)
+            elif not data_frame.empty:
+                reports.append(data_frame)
+        self.last_prices = prev_prices
+
+        if not reports:
+            data_frame = pd.DataFrame()
+        else:
+            data_frame = pd.concat(reports, ignore_index=True)
+
+        self._logger.info('Extracting and transforming Xetra source files '
+                          'by day finished.')
+        return data_frame
+
+
+    def _aggregate_report1(self, data_frame: pd.DataFrame):
+        """
+        Aggregates the source data per ISIN and day -> opening price,
+        closing price, minimum price, maximum price, & daily traded volume
+        (one sort by time and one grouped aggregation)
+
+        Parameters:
+            data_frame (df): Pandas DataFrame with the source data
+
+        Returns:
+            data_frame (df): Aggregated Pandas DataFrame (not rounded),
+                             sorted by ISIN and day
+        """
+        if self.src_args.src_agg_processes > 1:
+            partial = self.aggregator.partial_sharded(
+                data_frame, self.src_args.src_agg_processes)
+        else:
+            partial = self.aggregator.partial(data_frame)
+        return self.aggregator.finalize(partial)
+
+
+    def _change_prev_closing(self, data_frame: pd.DataFrame,
+                             prev_prices: pd.Series = None):
+        """
+        Change of the current day's closing price compared to the
+        previous day's closing price (in %)
+
+        Parameters:
+            data_frame (df): Aggregated Pandas DataFrame, sorted by ISIN and day
+            prev_prices (Series): ISIN -> price of the last day before
+                                  data_frame (None -> no previous day)
+
+        Returns:
+            data_frame (df): Pandas DataFrame with the change column
+        """
+        isin = data_frame[self.src_args.src_col_isin]
+        price = data_frame[self.tgt_args.tgt_col_op_price]
+
+        # As the rows are sorted, the previous day of an ISIN is the row
+        # before, unless that row belongs to another ISIN
+        new_isin = isin.ne(isin.shift(1))
+        prev_price = price.shift(1).mask(new_isin)
+        if prev_prices is not None:
+            # First day of an ISIN in data_frame -> price carried over
+            prev_price = prev_price.fillna(isin.map(prev_prices).where(new_isin))
+
+        data_frame[self.tgt_args.tgt_col_ch_prev_clos] = \
+            (price - prev_price) / prev_price * 100   # Change into %
+        return data_frame
+
+
+    def _last_prices(self, data_frame: pd.DataFrame,
+                     prev_prices: pd.Series = None):
+        """
+        Returns the price of the latest day per ISIN, used as previous
+        price by _change_prev_closing() for the following days
+
+        Parameters:
+            data_frame (df): Aggregated Pandas DataFrame, sorted by ISIN and day
+            prev_prices (Series): Prices of the days before data_frame
+
+        Returns:
+            prev_prices (Series): ISIN -> price of the latest day
+        """
+        last_prices = data_frame \
+            .drop_duplicates(subset=[self.src_args.src_col_isin], keep='last') \
+                .set_index(self.src_args.src_col_isin)[self.tgt_args.tgt_col_op_price]
+        if prev_prices is None:
+            return last_prices
+        return last_prices.combine_first(prev_prices)
+
+
+    def _finalize_report1(self, data_frame: pd.DataFrame):
+        """
+        Rounds the report and removes the day before extract_date
+
+        Parameters:
+            data_frame (df): Pandas DataFrame with the change column
 
+        Returns:
+            data_frame (df): Final report 1 DataFrame
+        """
         # Round it to 2 decimal places
         data_frame = data_frame.round(decimals=2)
 
         # Removing the day before extract_date
-        data_frame = data_frame[data_frame.Date >= self.extract_date] \
+        return data_frame[data_frame.Date >= self.extract_date] \
             .reset_index(drop=True)
 
-        self._logger.info('Applying transformations to Xetra source data finished...')
-        return data_frame
-
 
     def load(self, data_frame: pd.DataFrame):
         """
@@ -227,35 +643,184 @@ class XetraETL:
         Parameters:
             data_frame (df): Pandas DataFrame as Input
         """
-        # Creating target key
-        target_key = (
-            f'{self.tgt_args.tgt_key}'
-            f'{datetime.today().strftime(self.tgt_args.tgt_key_date_format)}.'
-            f'{self.tgt_args.tgt_format}'
-        )
-
-        # Writing to target
-        self.s3_bucket_tgt.write_df_to_s3(data_frame, target_key,
-                                          self.tgt_args.tgt_format)
+        with self.metrics.stage('load', rows_in=len(data_frame)):
+            if self.tgt_args.tgt_partitioned:
+                self._load_partitions(data_frame)
+            else:
+                # Creating target key
+                target_key = (
+                    f'{self.tgt_args.tgt_key}'
+                    f'{datetime.today().strftime(self.tgt_args.tgt_key_date_format)}.'
+                    f'{self.tgt_args.tgt_format}'
+                )
+
+                # Writing to target
+                self.s3_bucket_tgt.write_df_to_s3(data_frame, target_key,
+                                                  self.tgt_args.tgt_format,
+                                                  self.tgt_args.tgt_parquet_options)
         self._logger.info('Xetra target data successfully written.')
 
-        # Updating meta file
-        MetaProcess.update_meta_file(self.meta_update_list,
-                                     self.meta_key, self.s3_bucket_tgt)
+        with self.metrics.stage('meta'):
+            # Persisting the latest prices per ISIN for the next run
+            if self.state_key and self.meta_update_list:
+                last_prices = self.last_prices if self.last_prices is not None \
+                    else self.prev_prices
+                if last_prices is None:
+                    last_prices = pd.Series(dtype='float64')
+                MetaProcess.write_prev_prices(last_prices, self.meta_update_list[-1],
+                                              self.state_key, self.s3_bucket_tgt)
+                self._logger.info('Xetra previous prices successfully updated.')
+
+            # Updating meta file
+            self.meta.add_dates(self.meta_update_list)
+            self.meta.commit()
         self._logger.info('Xetra meta file successfully updated.')
         return True
 
 
+    def load_day(self, date: str, data_frame: pd.DataFrame,
+                 last_prices: pd.Series = None):
+        """
+        Saves the report of one date to its partition and then commits the
+        date: previous prices as of the date and meta file entry.
+        Used by the write-behind load, so a date is only marked as processed
+        once its data has been written.
+
+        Parameters:
+            date (str): Processed date
+            data_frame (df): Report 1 of the date (may be empty)
+            last_prices (Series): Latest prices per ISIN as of the date
+        """
+        if not data_frame.empty:
+            with self.metrics.stage('load', rows_in=len(data_frame)):
+                self._load_partitions(data_frame)
+        if date not in self.meta_update_list:
+            return True
+
+        with self.metrics.stage('meta'):
+            if self.state_key:
+                if last_prices is None:
+                    last_prices = pd.Series(dtype='float64')
+                MetaProcess.write_prev_prices(last_prices, date, self.state_key,
+                                              self.s3_bucket_tgt)
+            self.meta.add_dates([date])
+            self.meta.commit()
+        self._logger.info('Xetra data of %s successfully loaded.', date)
+        return True
+
+
+    def _load_partitions(self, data_frame: pd.DataFrame):
+        """
+        Writes one file per processed date into a Hive-style partition,
+        e.g. report1/date=2021-04-17/xetra_daily_report1_2021-04-17.parquet
+        The keys don't depend on the run time, so re-processing a date
+        replaces its file.
+
+        Parameters:
+            data_frame (df): Pandas DataFrame as Input
+        """
+        if data_frame.empty:
+            self._logger.info('The dataframe is empty! No file will be written!')
+            return
+        key_dir, key_base = self._split_tgt_key()
+
+        # Only the newly processed dates are written
+        for date, df_date in data_frame.groupby(self.src_args.src_col_date,
+                                                observed=True):
+            if date not in self.meta_update_list:
+                continue
+            target_key = (f'{key_dir}date={date}/{key_base}{date}.'
+                          f'{self.tgt_args.tgt_format}')
+            self.s3_bucket_tgt.write_df_to_s3(df_date.reset_index(drop=True),
+                                              target_key, self.tgt_args.tgt_format,
+                                              self.tgt_args.tgt_parquet_options)
+
+
+    def _split_tgt_key(self):
+        """
+        Returns the directory (with trailing '/', or '') and the file name
+        prefix of tgt_key
+        """
+        key_dir, _, key_base = self.tgt_args.tgt_key.rpartition('/')
+        return (f'{key_dir}/' if key_dir else ''), key_base
+
+
+    def report_run(self, status: str):
+        """
+        Writes the metrics of the run as a JSON run report next to the
+        target files and/or as a Prometheus textfile, as configured.
+        Errors are logged only, as they don't affect the loaded data.
+
+        Parameters:
+            status (str): Outcome of the run ('succeeded' or 'failed')
+
+        Returns:
+            Dict with the run report
+        """
+        info = {'report': 'report1', 'status': status,
+                'extract_date': self.extract_date,
+                'dates': self.meta_update_list}
+        report = self.metrics.report(**info)
+        self._logger.info('Xetra run %s in %.2f s, peak RSS %.1f MB', status,
+                          report['seconds'], report['peak_rss_mb'])
+        try:
+            if self.tgt_args.tgt_run_report:
+                key_dir, _ = self._split_tgt_key()
+                report_key = (
+                    f'{key_dir}_run_reports/run_'
+                    f'{self.metrics.started.strftime(self.tgt_args.tgt_key_date_format)}'
+                    f'.json'
+                )
+                self.s3_bucket_tgt.write_bytes_to_s3(self.metrics.to_json(**info),
+                                                     report_key)
+            if self.tgt_args.tgt_metrics_textfile:
+                self.metrics.write_prometheus_textfile(
+                    self.tgt_args.tgt_metrics_textfile, report='report1')
+        except Exception as error:     # pylint: disable=broad-except
+            self._logger.warning('Writing the run report failed: %s', error)
+        return report
+
+
     def etl_report1(self):
         """
         ETL
-        Extract, Transform and Load the data to create report 1
+        Extract, Transform and Load the data to create report 1,
+        followed by the run report
         """
-        # Extraction
-        data_frame = self.extract()
+        try:
+            self._etl_report1()
+        except Exception:
+            self.report_run('failed')
+            raise
+        self.report_run('succeeded')
+        return True
+
+
+    def _etl_report1(self):
+        """
+        Helper function for self.etl_report1()
+        """
+        # Only the changed source files are downloaded to the mirror
+        self.sync_source()
+        # Only the dates that have changed are staged
+        self.stage_source()
+        if self.src_args.src_streaming and self.tgt_args.tgt_partitioned \
+                and self.tgt_args.tgt_write_behind > 0:
+            # Each day is loaded in the background while the next days are
+            # extracted & transformed
+            with WriteBehindQueue(self.tgt_args.tgt_write_behind) as loader:
+                self.extract_transform_report1_by_day(
+                    on_day=lambda *day: loader.put(self.load_day, *day))
+            return True
+        if self.src_args.src_streaming:
+            # Extraction & transformation one trading day at a time
+            data_frame = self.extract_transform_report1_by_day()
+        else:
+            # Extraction
+            data_frame = self.extract()
 
-        # Transformation
-        data_frame = self.transform_report1(data_frame)
+            # Transformation
+            data_frame = self.transform_report1(data_frame)
 
         # Load
         self.load(data_frame)